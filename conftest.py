@@ -185,6 +185,43 @@ def setup_config_file_fs(tmp_path: Path, setup_tmp_local):
     yield fs_manager
 
 
+@pytest.fixture(scope="function")
+def setup_config_file_index(tmp_path: Path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir(exist_ok=True)
+
+    yaml_content = f"""sources:
+  - name: "TestsIndexedMem"
+    path: "memory://indexed"
+    index:
+      path: "{tmp_path / "index"}"
+  - name: "empty_test_mem"
+    path: "memory://empty"
+    """
+    yaml_file = config_dir / "jupyter-fsspec.yaml"
+    yaml_file.write_text(yaml_content)
+
+    with patch(
+        "jupyter_fsspec.file_manager.jupyter_config_dir", return_value=str(config_dir)
+    ):
+        fs_manager = FileSystemManager(config_file="jupyter-fsspec.yaml")
+
+    yield fs_manager
+
+
+@pytest.fixture(scope="function")
+async def fs_manager_instance_indexed(setup_config_file_index):
+    fs_manager = setup_config_file_index
+    fs_info = fs_manager.get_filesystem("TestsIndexedMem")
+    mem_fs = fs_info["instance"]
+    mem_fs_path = fs_info["path"]
+    if await mem_fs._exists(mem_fs_path):
+        await mem_fs._rm(mem_fs_path, recursive=True)
+
+    await mem_fs._pipe(f"{mem_fs_path}/test_dir/file1.txt", b"Test content")
+    return fs_manager
+
+
 @pytest.fixture(scope="function")
 async def fs_manager_instance_empty_mem(setup_config_file_fs, s3_client):
     fs_manager = setup_config_file_fs
@@ -0,0 +1,176 @@
+"""In-memory block cache with sequential readahead for ranged content reads"""
+
+import asyncio
+import logging
+import time
+
+from jupyter_fsspec.utils import LRUCache, info_etag
+
+
+logger = logging.getLogger(__name__)
+
+
+class BlockCache:
+    """Fixed-size blocks of source files shared by all ranged reads of the server.
+
+    Blocks are keyed by ``(source, path, etag, block)``, so a changed file is
+    never served from stale blocks once its info is fetched again. File info is
+    reused for ``info_ttl`` seconds to avoid a metadata request per read.
+    Contiguous missing blocks are fetched with a single aligned ``_cat_file``.
+    When a read continues where the previous read of the same file stopped, the
+    following blocks are fetched in the background, ``readahead`` at a time.
+    """
+
+    def __init__(
+        self,
+        block_size=1024 * 1024,
+        max_bytes=128 * 1024 * 1024,
+        readahead=4,
+        info_ttl=5,
+    ):
+        self.block_size = block_size
+        self.readahead = readahead
+        self.info_ttl = info_ttl
+        self.hits = 0
+        self.misses = 0
+        self.backend_reads = 0
+        self._blocks = LRUCache(max_bytes, getsizeof=len)
+        self._infos = LRUCache(4096)
+        # (source, path, etag) -> block following the last read
+        self._next_block = LRUCache(4096)
+        self._pending = {}
+
+    async def _info(self, source, fs_instance, path):
+        key = (source, fs_instance._strip_protocol(path))
+        cached = self._infos.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.info_ttl:
+            return cached[0]
+        info = await fs_instance._info(path)
+        self._infos.set(key, (info, time.monotonic()))
+        return info
+
+    def invalidate(self, source, path):
+        """Forget the info of ``path`` and of anything below it in ``source``.
+
+        ``path`` is expected as normalized by the filesystem's ``_strip_protocol``.
+        """
+        path = path.rstrip("/")
+        for cache in (self._infos, self._next_block):
+            for key in cache.keys():
+                if key[0] == source and (
+                    key[1].rstrip("/") == path or key[1].startswith(path + "/")
+                ):
+                    cache.pop(key)
+
+    async def _fetch(self, fs_instance, path, file_key, first, last, size):
+        start = first * self.block_size
+        end = min((last + 1) * self.block_size, size)
+        data = await fs_instance._cat_file(path, start, end)
+        self.backend_reads += 1
+        blocks = {}
+        for block in range(first, last + 1):
+            offset = (block - first) * self.block_size
+            blocks[block] = data[offset : offset + self.block_size]
+            self._blocks.set((*file_key, block), blocks[block])
+        return blocks
+
+    def _done(self, future, keys):
+        for key in keys:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if not future.cancelled() and future.exception() is not None:
+            # Readahead failures are only logged, readers see their own errors
+            logger.debug("Block fetch failed: %s", future.exception())
+
+    def _schedule(self, fs_instance, path, file_key, blocks, size):
+        """Start fetches of the missing ``blocks``, one per contiguous run.
+
+        Returns a future per block that is not in the cache yet.
+        """
+        futures = {}
+        run = []
+
+        def flush():
+            if not run:
+                return
+            future = asyncio.ensure_future(
+                self._fetch(fs_instance, path, file_key, run[0], run[-1], size)
+            )
+            keys = [(*file_key, block) for block in run]
+            for key, block in zip(keys, run):
+                self._pending[key] = future
+                futures[block] = future
+            future.add_done_callback(lambda f: self._done(f, keys))
+            run.clear()
+
+        for block in blocks:
+            key = (*file_key, block)
+            if key in self._blocks:
+                flush()
+            elif key in self._pending:
+                flush()
+                futures[block] = self._pending[key]
+            else:
+                run.append(block)
+        flush()
+        return futures
+
+    def _read_ahead(self, fs_instance, path, file_key, block, size):
+        """Fetch the next window of blocks once half of the current one is consumed."""
+        last_block = (size - 1) // self.block_size
+        available = 0
+        while block + available <= last_block and (
+            (*file_key, block + available) in self._blocks
+            or (*file_key, block + available) in self._pending
+        ):
+            available += 1
+        if available > self.readahead // 2:
+            return
+        first = block + available
+        ahead = range(first, min(first + self.readahead, last_block + 1))
+        self._schedule(fs_instance, path, file_key, ahead, size)
+
+    async def read(self, source, fs_instance, path, start, end):
+        """Return bytes ``start`` to ``end`` (exclusive) of ``path``."""
+        info = await self._info(source, fs_instance, path)
+        size = info.get("size")
+        if size is None:
+            return await fs_instance._cat_file(path, start, end)
+        start = start or 0
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return b""
+
+        first = start // self.block_size
+        last = (end - 1) // self.block_size
+        if (last - first + 1) * self.block_size > self._blocks.maxsize // 4:
+            # Large reads would flush the cache for little benefit
+            return await fs_instance._cat_file(path, start, end)
+
+        file_key = (source, fs_instance._strip_protocol(path), info_etag(info))
+        requested = range(first, last + 1)
+        futures = self._schedule(fs_instance, path, file_key, requested, size)
+        self.misses += len(futures)
+        self.hits += len(requested) - len(futures)
+
+        expected = self._next_block.get(file_key)
+        self._next_block.set(file_key, last + 1)
+        if expected is not None and expected - 1 <= first <= expected:
+            self._read_ahead(fs_instance, path, file_key, last + 1, size)
+
+        blocks = {}
+        for block in requested:
+            if block not in futures:
+                blocks[block] = self._blocks.get((*file_key, block))
+        for future in set(futures.values()):
+            # A cancelled request must not cancel fetches shared with others
+            blocks.update(await asyncio.shield(future))
+        for block in requested:
+            if blocks.get(block) is None:
+                # Evicted between the cache check and now
+                futures = self._schedule(fs_instance, path, file_key, [block], size)
+                blocks.update(await asyncio.shield(futures[block]))
+
+        data = b"".join(blocks[block] for block in requested)
+        offset = first * self.block_size
+        return data[start - offset : end - offset]
@@ -1,20 +1,266 @@
+import asyncio
+import bisect
+import json
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import weakref
 
 import fsspec.utils
 from fsspec import AbstractFileSystem
+from fsspec.asyn import (
+    AsyncFileSystem,
+    FSTimeoutError,
+    _run_coros_in_chunks,
+    sync,
+    sync_wrapper,
+)
 from fsspec.spec import AbstractBufferedFile
+from fsspec.utils import merge_offset_ranges
 import requests  # to patch
 
+from jupyter_fsspec.utils import decode_frames
+
 logger = logging.getLogger("jupyter_fsspec.client")
 fsspec.utils.setup_logging(logger=logger)
 
+# Ranges of a file closer than this are read with one request
+MAX_GAP = 64 * 2**10
+# Merged ranges do not grow beyond this
+MAX_BLOCK = 32 * 2**20
+# Reads sent in one batched request, holding about MAX_BLOCK bytes at most
+MAX_BATCH_READS = 1000
+
+
+def _range_header(start, end):
+    # The server expects ``start-end`` with an exclusive, optional end
+    return f"{start}-{'' if end is None else end}"
+
+
+def _normalize_range(start, end, size=None):
+    """Return a non-negative ``start`` and ``end``, counting negative offsets from ``size``."""
+    start = start or 0
+    if start < 0:
+        start = max(size + start, 0)
+    if end is not None and end < 0:
+        end = max(size + end, 0)
+    return start, end
+
+
+def _needs_size(start, end):
+    return (start is not None and start < 0) or (end is not None and end < 0)
+
+
+def _split_merged(paths, starts, ends, merged, blobs):
+    """Cut each requested range out of the merged block that covers it."""
+    blocks = {}
+    for path, start, end, blob in zip(*merged, blobs):
+        blocks.setdefault(path, ([], []))
+        blocks[path][0].append(start)
+        blocks[path][1].append((end, blob))
+    out = []
+    for path, start, end in zip(paths, starts, ends):
+        block_starts, block_data = blocks[path]
+        # Blocks are sorted by start, overlapping ones may need a step back
+        i = bisect.bisect_right(block_starts, start) - 1
+        while True:
+            block_end, blob = block_data[i]
+            if block_end is None or (end is not None and end <= block_end) or i == 0:
+                break
+            i -= 1
+        if isinstance(blob, Exception):
+            out.append(blob)
+            continue
+        offset = block_starts[i]
+        out.append(blob[start - offset : None if end is None else end - offset])
+    return out
+
+
+def _cached_info(fs, path):
+    """Entry of ``path`` in a cached listing of its parent, None when not cached."""
+    if not path:
+        return {"name": "", "type": "directory", "size": 0}
+    listing = fs.dircache.get(fs._parent(path))
+    if listing is None:
+        return None
+    for entry in listing:
+        if entry["name"].rstrip("/") == path:
+            return entry
+    raise FileNotFoundError(path)
+
+
+def _cached_listing(fs, path):
+    """Cached listing of ``path``, the entry of a cached file, or None."""
+    listing = fs.dircache.get(path)
+    if listing is not None:
+        return listing
+    entry = _cached_info(fs, path)
+    if entry is not None and entry["type"] != "directory":
+        return [entry]
+    return None
+
+
+def _tree_listings(path, entries, maxdepth=None):
+    """Split the entries found below ``path`` into the listing of each directory.
+
+    Directories ``maxdepth`` levels below ``path`` were not listed themselves,
+    and nothing is returned when ``path`` is not a directory.
+    """
+    if not any(
+        entry["name"].rstrip("/") == path and entry["type"] == "directory"
+        for entry in entries
+    ):
+        return {}
+    depth = path.count("/")
+    listings = {path: []}
+    for entry in entries:
+        name = entry["name"].rstrip("/")
+        if name == path:
+            continue
+        if entry["type"] == "directory" and (
+            maxdepth is None or name.count("/") - depth < maxdepth
+        ):
+            listings.setdefault(name, [])
+        listings.setdefault(name.rsplit("/", 1)[0], []).append(entry)
+    return listings
+
+
+def _invalidate_listings(fs, path):
+    """Drop the cached listings of ``path``, its parent and everything below it."""
+    fs.dircache.pop(path, None)
+    fs.dircache.pop(fs._parent(path), None)
+    for cached in [cached for cached in fs.dircache if cached.startswith(path + "/")]:
+        fs.dircache.pop(cached, None)
+
+
+def _found(entries, withdirs, detail):
+    out = {
+        entry["name"]: entry
+        for entry in sorted(entries, key=lambda entry: entry["name"])
+        if withdirs or entry["type"] != "directory"
+    }
+    return out if detail else list(out)
+
+
+def _remote_error(path, entry):
+    if entry["error"] == "FileNotFoundError":
+        return FileNotFoundError(path)
+    return OSError(f"{path}: {entry['description']}")
+
+
+def _plan_ranges(paths, starts, ends, max_gap=None):
+    """Plan the reads answering byte ranges of files.
+
+    Nearby ranges are merged into blocks, ranges counted from the end of a
+    file are read as they are. Returns the ``(path, start, end)`` reads and a
+    function turning their results into those of the ranges.
+    """
+    relative = [i for i in range(len(paths)) if _needs_size(starts[i], ends[i])]
+    absolute = [i for i in range(len(paths)) if not _needs_size(starts[i], ends[i])]
+    abs_paths = [paths[i] for i in absolute]
+    abs_starts = [starts[i] or 0 for i in absolute]
+    abs_ends = [ends[i] for i in absolute]
+    merged = merge_offset_ranges(
+        abs_paths,
+        abs_starts,
+        abs_ends,
+        max_gap=MAX_GAP if max_gap is None else max_gap,
+        max_block=MAX_BLOCK,
+    )
+    reads = list(zip(*merged)) + [(paths[i], starts[i], ends[i]) for i in relative]
+
+    def split(results):
+        out = [None] * len(paths)
+        blocks = results[: len(merged[0])]
+        cut = _split_merged(abs_paths, abs_starts, abs_ends, merged, blocks)
+        for i, result in zip(absolute, cut):
+            out[i] = result
+        for i, result in zip(relative, results[len(merged[0]) :]):
+            out[i] = result
+        return out
+
+    return reads, split
+
+
+def _batches(reads):
+    """Split ``(path, start, end)`` reads into the reads of each batched request."""
+    batch, nbytes = [], 0
+    for read in reads:
+        _, start, end = read
+        size = end - start if end is not None and start is not None else 0
+        if batch and (len(batch) >= MAX_BATCH_READS or nbytes + size > MAX_BLOCK):
+            yield batch
+            batch, nbytes = [], 0
+        batch.append(read)
+        nbytes += max(size, 0)
+    if batch:
+        yield batch
+
+
+def _batch_body(fs, reads):
+    body = []
+    for path, start, end in reads:
+        key, relpath = fs._split_path(path)
+        body.append({"key": key, "item_path": relpath, "start": start, "end": end})
+    return json.dumps({"reads": body})
+
+
+def _batch_results(reads, body):
+    return [
+        _remote_error(path, frame) if isinstance(frame, dict) else frame
+        for (path, _, _), frame in zip(reads, decode_frames(body))
+    ]
+
+
+def _cat_results(path, paths, results, on_error):
+    """Shape the results of reading whole files as ``cat`` returns them."""
+    if len(paths) == 1 and not isinstance(path, list) and paths[0] == path:
+        return _raise_first(results)[0]
+    out = {}
+    for p, result in zip(paths, results):
+        if isinstance(result, Exception):
+            if on_error == "raise":
+                raise result
+            if on_error == "omit":
+                continue
+        out[p] = result
+    return out
+
+
+def _raise_first(out):
+    for item in out:
+        if isinstance(item, Exception):
+            raise item
+    return out
+
 
 class JFS(AbstractFileSystem):
+    """Files of the sources of a Jupyter server running jupyter_fsspec.
+
+    Reads of open files fetch ``default_block_size`` bytes at a time with ranged
+    requests, cached according to ``default_cache_type``. ``cat`` and
+    ``cat_ranges`` send their reads, of any sources, together in batched
+    requests, ranges of a file less than ``MAX_GAP`` apart merged into one read.
+    ``info``, ``exists`` and ``size`` look up one path without listing its
+    directory, ``sizes`` looks up many paths of a source in one request.
+
+    Listings are cached, for ``listings_expiry_time`` seconds if given. ``find``
+    lists a whole tree with one request, filling the cache so that a ``walk``
+    of the tree makes no further requests.
+    """
+
     protocol = "jfs"
 
-    def __init__(self, base_url):
-        super().__init__()
+    def __init__(
+        self,
+        base_url,
+        default_block_size=None,
+        default_cache_type="readahead",
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
         self.base_url = base_url
+        self.default_block_size = default_block_size or self.blocksize
+        self.default_cache_type = default_cache_type
         self.session = requests.Session()
 
     def _split_path(self, path):
@@ -25,7 +271,7 @@ class JFS(AbstractFileSystem):
         logger.debug("request: %s %s %s", path, method, kw)
         headers = {"X-JFS-Client": "non-browser"}
         if range:
-            headers["Range"] = f"bytes={range[0]}-{range[1]}"
+            headers["Range"] = _range_header(*range)
         r = self.session.request(
             method, f"{self.base_url}/{path}", params=kw, headers=headers, data=data
         )
@@ -36,23 +282,103 @@ class JFS(AbstractFileSystem):
             return r.content
         return r.json()["content"]
 
-    def ls(self, path, detail=True, **kwargs):
+    def ls(self, path, detail=True, refresh=False, **kwargs):
         path = self._strip_protocol(path)
-        out = self._ls_from_cache(path)
-        if not out:
+        out = None if refresh else _cached_listing(self, path)
+        if out is None:
             if not path:
                 # list root - list of filesystem configs
                 bits = self._call("jupyter_fsspec/config")
                 out = [{"name": _["key"], "type": "directory", "size": 0} for _ in bits]
-                self.dircache[""] = out
             else:
                 key, relpath = self._split_path(path)
                 out = self._call("jupyter_fsspec/files", key=key, item_path=relpath)
+            self.dircache[path] = out
 
         if detail:
             return out
         return sorted(_["name"] for _ in out)
 
+    def info(self, path, **kwargs):
+        path = self._strip_protocol(path)
+        out = _cached_info(self, path)
+        if out is None:
+            key, relpath = self._split_path(path)
+            out = self._call("jupyter_fsspec/files/info", key=key, item_path=relpath)
+        return out
+
+    def _find_tree(self, path, maxdepth=None):
+        key, relpath = self._split_path(path)
+        kw = {} if maxdepth is None else {"maxdepth": maxdepth}
+        entries = self._call(
+            "jupyter_fsspec/files", key=key, item_path=relpath, type="find", **kw
+        )
+        self.dircache.update(_tree_listings(path, entries, maxdepth))
+        return entries
+
+    def find(self, path, maxdepth=None, withdirs=False, detail=False, **kwargs):
+        path = self._strip_protocol(path)
+        if not path:
+            # Sources are found one at a time
+            return super().find(path, maxdepth, withdirs, detail, **kwargs)
+        return _found(self._find_tree(path, maxdepth), withdirs, detail)
+
+    def walk(self, path, maxdepth=None, topdown=True, on_error="omit", **kwargs):
+        path = self._strip_protocol(path)
+        if path and self.dircache.use_listings_cache and path not in self.dircache:
+            try:
+                self._find_tree(path, maxdepth)
+            except FileNotFoundError:
+                pass
+        yield from super().walk(path, maxdepth, topdown, on_error, **kwargs)
+
+    def invalidate_cache(self, path=None):
+        if path is None:
+            self.dircache.clear()
+        else:
+            _invalidate_listings(self, self._strip_protocol(path))
+        super().invalidate_cache(path)
+
+    def _rm(self, path, recursive=False):
+        path = self._strip_protocol(path)
+        key, relpath = self._split_path(path)
+        self._call(
+            "jupyter_fsspec/files",
+            method="DELETE",
+            binary=True,
+            data=json.dumps({"key": key, "item_path": relpath, "recursive": recursive}),
+        )
+        self.invalidate_cache(path)
+
+    def rm(self, path, recursive=False, maxdepth=None):
+        if maxdepth is not None:
+            return super().rm(path, recursive=recursive, maxdepth=maxdepth)
+        # The server removes each directory with its contents in one request
+        for p in self.expand_path(path):
+            self._rm(p, recursive=recursive)
+
+    def sizes(self, paths):
+        """Size in bytes of each file in a list of paths, with one request per source."""
+        paths = [self._strip_protocol(path) for path in paths]
+        by_key = {}
+        for i, path in enumerate(paths):
+            key, relpath = self._split_path(path)
+            by_key.setdefault(key, []).append((i, relpath))
+        out = [None] * len(paths)
+        for key, items in by_key.items():
+            entries = self._call(
+                "jupyter_fsspec/files/info",
+                method="POST",
+                data=json.dumps(
+                    {"key": key, "paths": [relpath for _, relpath in items]}
+                ),
+            )
+            for (i, _), entry in zip(items, entries):
+                if "error" in entry:
+                    raise _remote_error(paths[i], entry)
+                out[i] = entry["size"]
+        return out
+
     def _open(
         self,
         path,
@@ -62,14 +388,77 @@ class JFS(AbstractFileSystem):
         cache_options=None,
         **kwargs,
     ):
-        return JFile(self, path, mode, block_size, autocommit, cache_options, **kwargs)
+        return JFile(
+            self,
+            path,
+            mode,
+            block_size or self.default_block_size,
+            autocommit,
+            cache_type=kwargs.pop("cache_type", self.default_cache_type),
+            cache_options=cache_options,
+            **kwargs,
+        )
 
-    def cat_file(self, path, start=None, end=None):
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        path = self._strip_protocol(path)
         key, relpath = self._split_path(path)
+        if start is None and end is None:
+            return self._call(
+                "jupyter_fsspec/files/contents", key=key, item_path=relpath, binary=True
+            )
+        size = self.size(path) if _needs_size(start, end) else None
+        start, end = _normalize_range(start, end, size)
+        if end is not None and start >= end:
+            return b""
         return self._call(
-            "jupyter_fsspec/files/contents", key=key, item_path=relpath, binary=True
+            "jupyter_fsspec/files/contents",
+            key=key,
+            item_path=relpath,
+            range=(start, end),
+            binary=True,
         )
 
+    def cat_ranges(
+        self, paths, starts, ends, max_gap=None, on_error="return", **kwargs
+    ):
+        """Read byte ranges of files, merging nearby ones, in batched requests."""
+        if not isinstance(starts, list):
+            starts = [starts] * len(paths)
+        if not isinstance(ends, list):
+            ends = [ends] * len(paths)
+        if len(starts) != len(paths) or len(ends) != len(paths):
+            raise ValueError
+        paths = [self._strip_protocol(path) for path in paths]
+        reads, split = _plan_ranges(paths, starts, ends, max_gap)
+        out = split(self._cat_batch(reads))
+        return out if on_error == "return" else _raise_first(out)
+
+    def cat(self, path, recursive=False, on_error="raise", **kwargs):
+        """Read whole files, of any sources, in batched requests."""
+        paths = self.expand_path(path, recursive=recursive)
+        results = self._cat_batch([(p, None, None) for p in paths])
+        if not isinstance(path, list):
+            path = self._strip_protocol(path)
+        return _cat_results(path, paths, results, on_error)
+
+    def _cat_batch(self, reads):
+        """Results of ``(path, start, end)`` reads, bytes or exceptions."""
+        out = []
+        for batch in _batches(reads):
+            try:
+                body = self._call(
+                    "jupyter_fsspec/files/batch",
+                    method="POST",
+                    binary=True,
+                    data=_batch_body(self, batch),
+                )
+            except Exception as e:
+                # A failed request fails each of its reads
+                out.extend([e] * len(batch))
+                continue
+            out.extend(_batch_results(batch, body))
+        return out
+
     def pipe_file(self, path, value, mode="overwrite", **kwargs):
         key, relpath = self._split_path(path)
         self._call(
@@ -80,14 +469,427 @@ class JFS(AbstractFileSystem):
             binary=True,
             data=value,
         )
+        self.invalidate_cache(path)
+
+    def start_upload(self, path):
+        """Start a chunked upload of ``path`` and return its upload id."""
+        key, relpath = self._split_path(self._strip_protocol(path))
+        out = self._call(
+            "jupyter_fsspec/files/upload", key=key, item_path=relpath, method="POST"
+        )
+        return out["upload_id"]
+
+    def upload_part(self, path, upload_id, offset, data):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        self._call(
+            "jupyter_fsspec/files/upload",
+            key=key,
+            item_path=relpath,
+            upload_id=upload_id,
+            offset=offset,
+            method="PUT",
+            data=data,
+        )
+
+    def commit_upload(self, path, upload_id):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        self._call(
+            "jupyter_fsspec/files/upload",
+            key=key,
+            item_path=relpath,
+            upload_id=upload_id,
+            method="POST",
+        )
+
+    def abort_upload(self, path, upload_id):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        self._call(
+            "jupyter_fsspec/files/upload",
+            key=key,
+            item_path=relpath,
+            upload_id=upload_id,
+            method="DELETE",
+        )
+
+
+class AsyncJFS(AsyncFileSystem):
+    """Async variant of `JFS` sharing a pooled aiohttp session between requests.
+
+    Bulk operations such as ``info`` over many paths, or the batched requests
+    of ``cat`` and ``cat_ranges``, run concurrently, ``batch_size`` at a time,
+    over up to ``pool_size`` connections. Concurrent listings of the same
+    directory share one request. Reads otherwise behave as in `JFS`.
+    """
+
+    protocol = "jfs"
+
+    def __init__(
+        self,
+        base_url,
+        pool_size=64,
+        default_block_size=None,
+        default_cache_type="readahead",
+        asynchronous=False,
+        loop=None,
+        **kwargs,
+    ):
+        super().__init__(asynchronous=asynchronous, loop=loop, **kwargs)
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.default_block_size = default_block_size or self.blocksize
+        self.default_cache_type = default_cache_type
+        self._session = None
+        self._listings = {}
+
+    _split_path = JFS._split_path
+
+    @staticmethod
+    def close_session(loop, session):
+        if loop is not None and loop.is_running():
+            try:
+                sync(loop, session.close, timeout=0.1)
+                return
+            except (TimeoutError, FSTimeoutError, NotImplementedError):
+                pass
+        connector = getattr(session, "_connector", None)
+        if connector is not None:
+            # close after loop is dead
+            connector._close()
+
+    async def set_session(self):
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size)
+            )
+            if not self.asynchronous:
+                weakref.finalize(self, self.close_session, self.loop, self._session)
+        return self._session
+
+    async def _call(
+        self, path, method="GET", range=None, binary=False, data=None, **kw
+    ):
+        logger.debug("request: %s %s %s", path, method, kw)
+        headers = {"X-JFS-Client": "non-browser"}
+        if range:
+            headers["Range"] = _range_header(*range)
+        session = await self.set_session()
+        async with session.request(
+            method, f"{self.base_url}/{path}", params=kw, headers=headers, data=data
+        ) as r:
+            if r.status == 404:
+                raise FileNotFoundError(path)
+            r.raise_for_status()
+            if binary:
+                return await r.read()
+            return (await r.json())["content"]
+
+    async def _ls_uncached(self, path):
+        if not path:
+            # list root - list of filesystem configs
+            bits = await self._call("jupyter_fsspec/config")
+            return [{"name": _["key"], "type": "directory", "size": 0} for _ in bits]
+        key, relpath = self._split_path(path)
+        return await self._call("jupyter_fsspec/files", key=key, item_path=relpath)
+
+    async def _ls(self, path, detail=True, refresh=False, **kwargs):
+        path = self._strip_protocol(path)
+        out = None if refresh else _cached_listing(self, path)
+        if out is None:
+            listing = self._listings.get(path)
+            if listing is None:
+                listing = self._listings[path] = asyncio.ensure_future(
+                    self._ls_uncached(path)
+                )
+                listing.add_done_callback(lambda _: self._listings.pop(path, None))
+            out = await asyncio.shield(listing)
+            self.dircache[path] = out
+
+        if detail:
+            return out
+        return sorted(_["name"] for _ in out)
+
+    async def _info(self, path, **kwargs):
+        path = self._strip_protocol(path)
+        out = _cached_info(self, path)
+        if out is None:
+            key, relpath = self._split_path(path)
+            out = await self._call(
+                "jupyter_fsspec/files/info", key=key, item_path=relpath
+            )
+        return out
+
+    async def _find_tree(self, path, maxdepth=None):
+        key, relpath = self._split_path(path)
+        kw = {} if maxdepth is None else {"maxdepth": maxdepth}
+        entries = await self._call(
+            "jupyter_fsspec/files", key=key, item_path=relpath, type="find", **kw
+        )
+        self.dircache.update(_tree_listings(path, entries, maxdepth))
+        return entries
+
+    async def _find(self, path, maxdepth=None, withdirs=False, detail=False, **kwargs):
+        path = self._strip_protocol(path)
+        if not path:
+            return await super()._find(
+                path, maxdepth, withdirs, detail=detail, **kwargs
+            )
+        return _found(await self._find_tree(path, maxdepth), withdirs, detail)
+
+    async def _walk(self, path, maxdepth=None, topdown=True, on_error="omit", **kwargs):
+        path = self._strip_protocol(path)
+        if path and self.dircache.use_listings_cache and path not in self.dircache:
+            try:
+                await self._find_tree(path, maxdepth)
+            except FileNotFoundError:
+                pass
+        async for item in super()._walk(path, maxdepth, topdown, on_error, **kwargs):
+            yield item
+
+    def invalidate_cache(self, path=None):
+        if path is None:
+            self.dircache.clear()
+        else:
+            _invalidate_listings(self, self._strip_protocol(path))
+        super().invalidate_cache(path)
+
+    async def _rm_file(self, path, recursive=False, **kwargs):
+        path = self._strip_protocol(path)
+        key, relpath = self._split_path(path)
+        await self._call(
+            "jupyter_fsspec/files",
+            method="DELETE",
+            binary=True,
+            data=json.dumps({"key": key, "item_path": relpath, "recursive": recursive}),
+        )
+        self.invalidate_cache(path)
+
+    async def _rm(self, path, recursive=False, maxdepth=None, **kwargs):
+        if maxdepth is not None:
+            paths = await self._expand_path(
+                path, recursive=recursive, maxdepth=maxdepth
+            )
+            # Contents sort after their directory, and are removed first
+            for path in reversed(paths):
+                await self._rm_file(path)
+            return
+        # The server removes each directory with its contents in one request
+        for path in await self._expand_path(path):
+            await self._rm_file(path, recursive=recursive)
+
+    async def _cat_file(self, path, start=None, end=None, **kwargs):
+        path = self._strip_protocol(path)
+        key, relpath = self._split_path(path)
+        if start is None and end is None:
+            return await self._call(
+                "jupyter_fsspec/files/contents", key=key, item_path=relpath, binary=True
+            )
+        size = await self._size(path) if _needs_size(start, end) else None
+        start, end = _normalize_range(start, end, size)
+        if end is not None and start >= end:
+            return b""
+        return await self._call(
+            "jupyter_fsspec/files/contents",
+            key=key,
+            item_path=relpath,
+            range=(start, end),
+            binary=True,
+        )
+
+    async def _cat_ranges(
+        self,
+        paths,
+        starts,
+        ends,
+        max_gap=None,
+        batch_size=None,
+        on_error="return",
+        **kwargs,
+    ):
+        if not isinstance(starts, list):
+            starts = [starts] * len(paths)
+        if not isinstance(ends, list):
+            ends = [ends] * len(paths)
+        if len(starts) != len(paths) or len(ends) != len(paths):
+            raise ValueError
+        paths = [self._strip_protocol(path) for path in paths]
+        reads, split = _plan_ranges(paths, starts, ends, max_gap)
+        out = split(await self._cat_batch(reads, batch_size))
+        return out if on_error == "return" else _raise_first(out)
+
+    async def _cat(
+        self, path, recursive=False, on_error="raise", batch_size=None, **kwargs
+    ):
+        paths = await self._expand_path(path, recursive=recursive)
+        results = await self._cat_batch([(p, None, None) for p in paths], batch_size)
+        if not isinstance(path, list):
+            path = self._strip_protocol(path)
+        return _cat_results(path, paths, results, on_error)
+
+    async def _cat_batch(self, reads, batch_size=None):
+        """Results of ``(path, start, end)`` reads, batched requests running concurrently."""
+
+        async def fetch(batch):
+            body = await self._call(
+                "jupyter_fsspec/files/batch",
+                method="POST",
+                binary=True,
+                data=_batch_body(self, batch),
+            )
+            return _batch_results(batch, body)
+
+        batches = list(_batches(reads))
+        results = await _run_coros_in_chunks(
+            [fetch(batch) for batch in batches],
+            batch_size=batch_size or self.batch_size,
+            nofiles=True,
+            return_exceptions=True,
+        )
+        out = []
+        for batch, result in zip(batches, results):
+            # A failed request fails each of its reads
+            out.extend(
+                [result] * len(batch) if isinstance(result, Exception) else result
+            )
+        return out
+
+    async def _pipe_file(self, path, value, mode="overwrite", **kwargs):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        await self._call(
+            "jupyter_fsspec/files/contents",
+            key=key,
+            item_path=relpath,
+            method="POST",
+            binary=True,
+            data=value,
+        )
+        self.invalidate_cache(path)
+
+    async def _start_upload(self, path):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        out = await self._call(
+            "jupyter_fsspec/files/upload", key=key, item_path=relpath, method="POST"
+        )
+        return out["upload_id"]
+
+    async def _upload_part(self, path, upload_id, offset, data):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        await self._call(
+            "jupyter_fsspec/files/upload",
+            key=key,
+            item_path=relpath,
+            upload_id=upload_id,
+            offset=offset,
+            method="PUT",
+            data=data,
+        )
+
+    async def _commit_upload(self, path, upload_id):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        await self._call(
+            "jupyter_fsspec/files/upload",
+            key=key,
+            item_path=relpath,
+            upload_id=upload_id,
+            method="POST",
+        )
+        self.invalidate_cache(path)
+
+    async def _abort_upload(self, path, upload_id):
+        key, relpath = self._split_path(self._strip_protocol(path))
+        await self._call(
+            "jupyter_fsspec/files/upload",
+            key=key,
+            item_path=relpath,
+            upload_id=upload_id,
+            method="DELETE",
+        )
+
+    start_upload = sync_wrapper(_start_upload)
+    upload_part = sync_wrapper(_upload_part)
+    commit_upload = sync_wrapper(_commit_upload)
+    abort_upload = sync_wrapper(_abort_upload)
+
+    def _open(
+        self,
+        path,
+        mode="rb",
+        block_size=None,
+        autocommit=True,
+        cache_options=None,
+        **kwargs,
+    ):
+        return JFile(
+            self,
+            path,
+            mode,
+            block_size or self.default_block_size,
+            autocommit,
+            cache_type=kwargs.pop("cache_type", self.default_cache_type),
+            cache_options=cache_options,
+            **kwargs,
+        )
 
 
 class JFile(AbstractBufferedFile):
+    """File of a `JFS` or `AsyncJFS` source.
+
+    Writes are sent through a chunked upload as blocks fill: each full block is
+    sent in the background while the caller fills the next one, so at most two
+    blocks are held in memory. A file that fits in one block is sent with a
+    single request.
+    """
+
+    _upload_id = None
+    _part = None
+    _executor = None
+
     def _fetch_range(self, start, end):
         return self.fs.cat_file(self.path, start, end)
 
+    def _wait_for_part(self):
+        if self._part is not None:
+            part, self._part = self._part, None
+            part.result()
+
+    def _send_part(self, data):
+        # Only one block is in flight, the next waits for it to be received
+        self._wait_for_part()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._part = self._executor.submit(
+            self.fs.upload_part, self.path, self._upload_id, self.offset, data
+        )
+
     def _upload_chunk(self, final=False):
-        if final:
-            self.fs.pipe_file(self.path, self.buffer.getvalue())
+        data = self.buffer.getvalue()
+        if final and self._upload_id is None:
+            self.fs.pipe_file(self.path, data)
             return True
-        return False
+        try:
+            if self._upload_id is None:
+                self._upload_id = self.fs.start_upload(self.path)
+            if data:
+                self._send_part(data)
+            if final:
+                self._wait_for_part()
+                self.fs.commit_upload(self.path, self._upload_id)
+                self._upload_id = None
+                self._executor.shutdown()
+        except Exception:
+            self.discard()
+            raise
+        return True
+
+    def discard(self):
+        """Abort the upload in progress, leaving the target file untouched."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._part = None
+        if self._upload_id is not None:
+            upload_id, self._upload_id = self._upload_id, None
+            try:
+                self.fs.abort_upload(self.path, upload_id)
+            except Exception as e:
+                logger.debug("failed to abort upload of %s: %s", self.path, e)
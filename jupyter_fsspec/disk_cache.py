@@ -0,0 +1,135 @@
+"""Local disk caching of source files with size-bounded LRU eviction"""
+
+import logging
+import os
+import time
+
+from fsspec.implementations.cached import CachingFileSystem, WholeFileCacheFileSystem
+
+
+logger = logging.getLogger(__name__)
+
+
+# CachingFileSystem forwards every attribute it does not whitelist to the target
+# filesystem, so bookkeeping lives in functions rather than in extra methods.
+def _record_access(cache_fs, path):
+    path = cache_fs._strip_protocol(path)
+    if cache_fs._check_file(path):
+        cache_fs.hits += 1
+    else:
+        cache_fs.misses += 1
+    cache_fs._last_access[path] = time.time()
+
+
+def _cached_files(cache_fs):
+    """Map remote paths to the local files holding their cached data.
+
+    fsspec keeps metadata of popped files when it merges the metadata on disk,
+    so entries without a local file are skipped.
+    """
+    files = {}
+    for path, detail in cache_fs._metadata.cached_files[-1].items():
+        fn = os.path.join(cache_fs.storage[-1], detail["fn"])
+        if os.path.exists(fn):
+            files[path] = (fn, detail)
+    return files
+
+
+def _pop(cache_fs, path):
+    cache_fs.pop_from_cache(path)
+    cache_fs._last_access.pop(path, None)
+
+
+def _evict(cache_fs):
+    """Remove least recently used files until the cache fits in ``max_bytes``."""
+    if not cache_fs.max_bytes:
+        return
+    size = cache_fs.cache_size()
+    if size <= cache_fs.max_bytes:
+        return
+
+    cached = _cached_files(cache_fs)
+    by_last_access = sorted(
+        cached, key=lambda p: cache_fs._last_access.get(p, cached[p][1]["time"])
+    )
+    for path in by_last_access:
+        if size <= cache_fs.max_bytes:
+            break
+        freed = os.path.getsize(cached[path][0])
+        _pop(cache_fs, path)
+        cache_fs.evictions += 1
+        size -= freed
+        logger.debug("Evicted %s (%d bytes) from the local cache", path, freed)
+
+
+def invalidate(cache_fs, path):
+    """Drop cached copies of ``path`` and of any file below it."""
+    path = cache_fs._strip_protocol(path).rstrip("/")
+    for cached in _cached_files(cache_fs):
+        if cached == path or cached.startswith(path + "/"):
+            _pop(cache_fs, cached)
+
+
+def cache_stats(cache_fs):
+    """Hit, miss and eviction counters and the current size of a cache."""
+    return {
+        "mode": type(cache_fs)._cache_mode,
+        "hits": cache_fs.hits,
+        "misses": cache_fs.misses,
+        "evictions": cache_fs.evictions,
+        "size": cache_fs.cache_size(),
+        "max_bytes": cache_fs.max_bytes,
+    }
+
+
+class _BoundedCacheMixin:
+    def __init__(self, *args, max_bytes=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._last_access = {}
+
+    def _open(self, path, mode="rb", **kwargs):
+        if "r" in mode:
+            _record_access(self, path)
+        return super()._open(path, mode=mode, **kwargs)
+
+    def save_cache(self):
+        super().save_cache()
+        _evict(self)
+
+
+class BlockCacheFileSystem(_BoundedCacheMixin, CachingFileSystem):
+    """Caches the blocks of remote files that are read, in sparse local files."""
+
+    _cache_mode = "blockcache"
+
+
+class FileCacheFileSystem(_BoundedCacheMixin, WholeFileCacheFileSystem):
+    """Downloads whole remote files to the local cache on first read."""
+
+    _cache_mode = "filecache"
+
+    def cat(self, path, recursive=False, **kwargs):
+        if isinstance(path, str) and not recursive:
+            _record_access(self, path)
+        return super().cat(path, recursive=recursive, **kwargs)
+
+
+CACHE_CLASSES = {
+    "blockcache": BlockCacheFileSystem,
+    "filecache": FileCacheFileSystem,
+}
+
+
+def wrap_with_cache(fs, cache_config, cache_storage):
+    """Layer the cache described by a source's ``cache`` config over ``fs``."""
+    cache_class = CACHE_CLASSES[cache_config.mode.value]
+    return cache_class(
+        fs=fs,
+        cache_storage=cache_storage,
+        expiry_time=cache_config.expiry,
+        max_bytes=cache_config.max_bytes,
+    )
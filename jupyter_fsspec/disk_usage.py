@@ -0,0 +1,202 @@
+"""Directory size (du) aggregation for filesystem sources"""
+
+import asyncio
+import logging
+import time
+
+from fsspec.asyn import AsyncFileSystem
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.spec import AbstractFileSystem
+
+from jupyter_fsspec.resilience import ResilientFileSystem
+
+
+logger = logging.getLogger(__name__)
+
+
+def has_native_du(fs_instance):
+    """Whether the filesystem implements ``du`` itself instead of using fsspec's find-based default."""
+    if isinstance(fs_instance, ResilientFileSystem):
+        fs_instance = fs_instance.fs
+    if isinstance(fs_instance, AsyncFileSystemWrapper):
+        return type(fs_instance.sync_fs).du is not AbstractFileSystem.du
+    if fs_instance.async_impl:
+        return type(fs_instance)._du is not AsyncFileSystem._du
+    return type(fs_instance).du is not AbstractFileSystem.du
+
+
+async def native_disk_usage(fs_instance, path):
+    """Return ``(total_bytes, file_count)`` using the filesystem's own ``du``."""
+    sizes = (
+        await fs_instance._du(path, total=False)
+        if fs_instance.async_impl
+        else fs_instance.du(path, total=False)
+    )
+    return sum(size or 0 for size in sizes.values()), len(sizes)
+
+
+class DiskUsageCache:
+    """Directory subtotals of a source, expiring after ``ttl`` seconds.
+
+    Keys are directory paths as normalized by the filesystem's ``_strip_protocol``.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._subtotals = {}
+
+    def get(self, path):
+        entry = self._subtotals.get(path)
+        if entry is None:
+            return None
+        if time.time() - entry["timestamp"] > self.ttl:
+            del self._subtotals[path]
+            return None
+        return entry
+
+    def set(self, path, total_bytes, file_count, dir_count):
+        self._subtotals[path] = {
+            "total_bytes": total_bytes,
+            "file_count": file_count,
+            "dir_count": dir_count,
+            "timestamp": time.time(),
+        }
+
+    def invalidate(self, path):
+        """Drop subtotals of ``path``, its ancestors and its descendants."""
+        path = path.rstrip("/")
+        for cached in list(self._subtotals):
+            if (
+                cached == path
+                or path.startswith(cached.rstrip("/") + "/")
+                or cached.startswith(path + "/")
+                or not cached.strip("/")
+            ):
+                del self._subtotals[cached]
+
+    def clear(self):
+        self._subtotals.clear()
+
+
+class DiskUsageWalk:
+    """Concurrent breadth-first walk summing the file sizes below a directory.
+
+    At most ``max_concurrency`` listings are in flight at once. Running totals
+    are available while the walk is in progress, and the subtotal of every
+    visited directory is stored in ``cache`` once the walk completes. Cached
+    subtotals are used in place of listing those directories again.
+    """
+
+    def __init__(self, fs_instance, path, max_concurrency=16, cache=None):
+        self.fs_instance = fs_instance
+        self.path = fs_instance._strip_protocol(path).rstrip("/") or path
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.total_bytes = 0
+        self.file_count = 0
+        self.dir_count = 0
+        self.pending = 0
+        # directory -> [bytes, files, dirs] directly inside it (or cached subtotal)
+        self._own = {}
+        self._parents = {}
+        self._from_cache = set()
+
+    @property
+    def progress(self):
+        return {
+            "total_bytes": self.total_bytes,
+            "file_count": self.file_count,
+            "dir_count": self.dir_count,
+            "pending": self.pending,
+        }
+
+    async def _list(self, path):
+        if self.fs_instance.async_impl:
+            return await self.fs_instance._ls(path, detail=True)
+        return self.fs_instance.ls(path, detail=True)
+
+    async def _visit(self, path, queue):
+        cached = self.cache.get(path) if self.cache is not None else None
+        if cached is not None:
+            own = [cached["total_bytes"], cached["file_count"], cached["dir_count"]]
+            self._own[path] = own
+            self._from_cache.add(path)
+            self.total_bytes += own[0]
+            self.file_count += own[1]
+            self.dir_count += own[2]
+            return
+
+        own = self._own[path] = [0, 0, 0]
+        for entry in await self._list(path):
+            name = entry["name"].rstrip("/")
+            if entry.get("type") == "directory":
+                if name == path:
+                    continue
+                own[2] += 1
+                self.dir_count += 1
+                self._parents[name] = path
+                self.pending += 1
+                queue.put_nowait(name)
+            else:
+                size = entry.get("size") or 0
+                own[0] += size
+                own[1] += 1
+                self.total_bytes += size
+                self.file_count += 1
+
+    async def _worker(self, queue):
+        while True:
+            path = await queue.get()
+            try:
+                await self._visit(path, queue)
+            finally:
+                self.pending -= 1
+                queue.task_done()
+
+    async def run(self):
+        """Walk the tree and return ``(total_bytes, file_count, dir_count)``."""
+        root_cached = self.cache.get(self.path) if self.cache is not None else None
+        if root_cached is not None:
+            self.total_bytes = root_cached["total_bytes"]
+            self.file_count = root_cached["file_count"]
+            self.dir_count = root_cached["dir_count"]
+            return self.total_bytes, self.file_count, self.dir_count
+
+        queue = asyncio.Queue()
+        queue.put_nowait(self.path)
+        self.pending = 1
+        workers = [
+            asyncio.ensure_future(self._worker(queue))
+            for _ in range(self.max_concurrency)
+        ]
+        join = asyncio.ensure_future(queue.join())
+        try:
+            # Surface the first failing listing instead of waiting forever
+            done, _ = await asyncio.wait(
+                [join, *workers], return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task is not join:
+                    task.result()
+        finally:
+            join.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(join, *workers, return_exceptions=True)
+
+        self._store_subtotals()
+        return self.total_bytes, self.file_count, self.dir_count
+
+    def _store_subtotals(self):
+        if self.cache is None:
+            return
+        subtotals = {path: list(own) for path, own in self._own.items()}
+        # Deepest directories first so children are folded into their parents
+        for path in sorted(subtotals, key=lambda p: p.count("/"), reverse=True):
+            parent = self._parents.get(path)
+            if parent in subtotals:
+                for i in range(3):
+                    subtotals[parent][i] += subtotals[path][i]
+        for path, (total_bytes, file_count, dir_count) in subtotals.items():
+            if path not in self._from_cache:
+                self.cache.set(path, total_bytes, file_count, dir_count)
@@ -1,5 +1,13 @@
-from jupyter_core.paths import jupyter_config_dir
+from jupyter_core.paths import jupyter_config_dir, jupyter_data_dir
 from .models import Source, Config
+from .metadata_index import MetadataIndex
+from .disk_usage import DiskUsageCache
+from .block_cache import BlockCache
+from .watcher import ChangeFeed, ListingVersions
+from .uploads import UploadRegistry
+from .resilience import CircuitBreaker, ResilientFileSystem
+from .disk_cache import invalidate as invalidate_cached, wrap_with_cache
+from .utils import LRUCache
 from fsspec.utils import infer_storage_options
 from fsspec.core import strip_protocol
 from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
@@ -21,6 +29,11 @@ class FileSystemManager:
         self.allow_absolute_paths = allow_absolute_paths
         self.filesystems = {}
         self.name_to_prefix = {}
+        self._reset_translators()
+        self.block_cache = BlockCache()
+        self.change_feed = ChangeFeed()
+        self.listing_versions = ListingVersions()
+        self.uploads = UploadRegistry()
         self.base_dir = jupyter_config_dir()
         logger.info(f"Using Jupyter config directory: {self.base_dir}")
         self.config_path = os.path.join(self.base_dir, config_file)
@@ -137,15 +150,58 @@ class FileSystemManager:
         if fs_name in self.filesystems:
             fs_info = self.filesystems[fs_name]
             fs_protocol = fs_info["protocol"]
-            return FileSystemManager.construct_fs(
-                fs_protocol, asynchronous, *fs_info["args"], **fs_info["kwargs"]
+            cache_config = fs_info.get("cache_config")
+            if cache_config is None:
+                fs_class = fsspec.get_filesystem_class(fs_protocol)
+                if asynchronous and not fs_class.async_impl:
+                    # Backends without an async implementation run in a thread
+                    return AsyncFileSystemWrapper(
+                        FileSystemManager.construct_fs(
+                            fs_protocol, False, *fs_info["args"], **fs_info["kwargs"]
+                        ),
+                        asynchronous=True,
+                    )
+                return FileSystemManager.construct_fs(
+                    fs_protocol, asynchronous, *fs_info["args"], **fs_info["kwargs"]
+                )
+            # The caching layer is synchronous, it wraps a synchronous target
+            fs = wrap_with_cache(
+                FileSystemManager.construct_fs(
+                    fs_protocol, False, *fs_info["args"], **fs_info["kwargs"]
+                ),
+                cache_config,
+                self._cache_storage_path(
+                    fs_info["name"], fs_info["path_url"], cache_config
+                ),
             )
+            return AsyncFileSystemWrapper(fs, asynchronous=True) if asynchronous else fs
         return None
 
+    @staticmethod
+    def _index_db_path(fs_name, fs_path, index_config):
+        index_dir = index_config.path or os.path.join(
+            jupyter_data_dir(), "jupyter_fsspec", "index"
+        )
+        # Changing the source URL must not reuse an index of other contents
+        path_hash = hashlib.md5(fs_path.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(index_dir, f"{fs_name}-{path_hash}.sqlite")
+
+    @staticmethod
+    def _cache_storage_path(fs_name, fs_path, cache_config):
+        cache_dir = cache_config.directory or os.path.join(
+            jupyter_data_dir(), "jupyter_fsspec", "cache"
+        )
+        path_hash = hashlib.md5(fs_path.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(cache_dir, f"{fs_name}-{path_hash}")
+
     def initialize_filesystems(self):
         new_filesystems = {}
         name_to_prefix = {}
 
+        for fs_info in getattr(self, "filesystems", {}).values():
+            if fs_info.get("index") is not None:
+                fs_info["index"].close()
+
         # Init filesystem
         for fs_config in self.config.get("sources", []):
             config = Source(**fs_config)
@@ -202,21 +258,48 @@ class FileSystemManager:
                 "canonical_path": canonical_path,
                 "args": args,
                 "kwargs": kwargs,
+                "index": None,
+                "du_cache": DiskUsageCache(),
+                "preview_cache": LRUCache(64),
+                "cache_config": config.cache,
+                "cache": None,
+                "breaker": CircuitBreaker(
+                    fs_name,
+                    failure_threshold=config.retry.failure_threshold,
+                    reset_timeout=config.retry.reset_timeout,
+                ),
             }
             try:
                 fs_class = fsspec.get_filesystem_class(fs_protocol)
 
-                if fs_class.async_impl:
+                if config.cache is not None:
+                    sync_fs = FileSystemManager.construct_fs(
+                        fs_protocol, False, *args, **kwargs
+                    )
+                    fs_info["cache"] = wrap_with_cache(
+                        sync_fs,
+                        config.cache,
+                        self._cache_storage_path(fs_name, fs_path, config.cache),
+                    )
+                    fs = AsyncFileSystemWrapper(fs_info["cache"])
+                elif fs_class.async_impl:
                     fs = FileSystemManager.construct_fs(
                         fs_protocol, True, *args, **kwargs
                     )
-                    fs_info["instance"] = fs
                 else:
                     sync_fs = FileSystemManager.construct_fs(
                         fs_protocol, False, *args, **kwargs
                     )
                     fs = AsyncFileSystemWrapper(sync_fs)
-                    fs_info["instance"] = fs
+                fs_info["instance"] = ResilientFileSystem(
+                    fs, config.retry, fs_info["breaker"]
+                )
+
+                if config.index is not None:
+                    fs_info["index"] = MetadataIndex(
+                        self._index_db_path(fs_name, fs_path, config.index),
+                        refresh_interval=config.index.refresh_interval,
+                    )
 
                 logger.debug(
                     f"Initialized filesystem '{fs_name}' with protocol '{fs_protocol}' at path '{fs_path}'"
@@ -246,37 +329,185 @@ class FileSystemManager:
 
         self.filesystems = new_filesystems
         self.name_to_prefix = name_to_prefix
+        self._reset_translators()
 
     # Same as client.py
     def split_path(self, path):
         key, *relpath = path.split("/", 1)
         return key, relpath[0] if relpath else ""
 
-    def map_paths(self, root_path, key, file_obj_list):
+    @staticmethod
+    def _make_path_translator(key, root):
+        """Build a function mapping backend names under ``root`` to ``key/...`` names.
+
+        The root is normalized once so each name is mapped with a single
+        prefix comparison and slice.
+        """
+        root = root.strip("/")
+        root_slash = root + "/"
+        root_len = len(root_slash)
+
+        def translate(name):
+            name = name.lstrip("/")
+            if name == root:
+                return key
+            if not root or not name.startswith(root_slash):
+                # Not under the source root, keep the full backend name
+                return f"{key}/{name}"
+            return f"{key}/{name[root_len:]}"
+
+        return translate
+
+    @staticmethod
+    def _make_items_mapper(key, root):
+        """Build a function mapping the ``name`` of each entry of a listing in place.
+
+        Names under the root are mapped inline, without a function call per
+        entry, by replacing the leading root with a single ``str.replace``
+        (one allocation, where splitting and joining make three); other names
+        go through the single-name translator.
+        """
+        translate = FileSystemManager._make_path_translator(key, root)
+        root_slash = root.strip("/") + "/"
+        abs_prefix = "/" + root_slash
+        key_slash = key + "/"
+
+        def map_items(items):
+            for item in items:
+                name = item.get("name")
+                if name is None:
+                    continue
+                # The prefix checks make the first occurrence the leading one
+                if name.startswith(abs_prefix):
+                    item["name"] = name.replace(abs_prefix, key_slash, 1)
+                elif name.startswith(root_slash):
+                    item["name"] = name.replace(root_slash, key_slash, 1)
+                else:
+                    item["name"] = translate(name)
+            return items
+
+        return map_items
+
+    def get_source_root(self, root_path, key):
+        """Return the backend path that names of a source are relative to."""
+        if self.get_filesystem_protocol(key) == "file://":
+            return strip_protocol(root_path)
+        return self.name_to_prefix[key]
+
+    def _reset_translators(self):
+        # Name translators of the sources, one cache per kind
+        self._path_translators = {}  # (key, root_path) -> translator or None
+        self._relative_translators = {}  # key -> translator
+        self._items_mappers = {}  # (key, root_path) -> mapper or None
+
+    def get_path_translator(self, root_path, key):
+        """Return the cached name translator for a source, creating it if needed.
+
+        Returns None when names should be passed through unchanged.
+        """
+        cache_key = (key, root_path)
+        if cache_key in self._path_translators:
+            return self._path_translators[cache_key]
+
         protocol = self.get_filesystem_protocol(key)
         logger.debug("protocol: %s", protocol)
         logger.debug("initial root path: %s", root_path)
 
         if not root_path and not (protocol == "file://"):
+            translator = None
+        else:
+            root = self.get_source_root(root_path, key)
+            logger.debug("filesystem root: %s", root)
+            translator = self._make_path_translator(key, root)
+
+        self._path_translators[cache_key] = translator
+        return translator
+
+    def get_relative_translator(self, key):
+        """Return a cached function mapping backend names to paths relative to the source root."""
+        if key not in self._relative_translators:
+            root = self.get_source_root(self.name_to_prefix[key], key)
+            to_root = self._make_path_translator("", root)
+
+            def translate(name):
+                return to_root(name).lstrip("/")
+
+            self._relative_translators[key] = translate
+        return self._relative_translators[key]
+
+    def to_relative_path(self, key, path):
+        if self.get_filesystem_protocol(key) == "file://":
+            path = strip_protocol(path)
+        return self.get_relative_translator(key)(path)
+
+    def get_items_mapper(self, root_path, key):
+        """Return the cached listing mapper for a source, None if names are kept."""
+        cache_key = (key, root_path)
+        if cache_key not in self._items_mappers:
+            mapper = None
+            if self.get_path_translator(root_path, key) is not None:
+                root = self.get_source_root(root_path, key)
+                mapper = self._make_items_mapper(key, root)
+            self._items_mappers[cache_key] = mapper
+        return self._items_mappers[cache_key]
+
+    def map_paths(self, root_path, key, file_obj_list):
+        map_items = self.get_items_mapper(root_path, key)
+        if map_items is None:
             return file_obj_list
+        return map_items(file_obj_list)
+
+    def start_index_crawl(self, key):
+        """Start a background crawl of the source into its metadata index."""
+        fs_info = self.get_filesystem(key)
+        if not fs_info or fs_info["index"] is None or fs_info["instance"] is None:
+            return None
+        return fs_info["index"].start_crawl(
+            fs_info["instance"], fs_info["path"], self.get_relative_translator(key)
+        )
 
-        if protocol == "file://":
-            root = strip_protocol(root_path)
-        else:
-            root = self.name_to_prefix[key]
-        logger.debug("filesystem root: %s", root)
-
-        # TODO: error handling for relative_path
-        for item in file_obj_list:
-            if "name" in item:
-                file_name = item["name"]
-                split_paths = file_name.split(root, 1)
-                logger.debug("split file name: %s", split_paths)
-                relative_path = (
-                    split_paths[1] if len(split_paths) > 1 else split_paths[0]
-                )
-                item["name"] = key + relative_path
-        return file_obj_list
+    def start_index_crawls(self):
+        for key, fs_info in self.filesystems.items():
+            if fs_info.get("index") is not None and fs_info["index"].is_stale():
+                self.start_index_crawl(key)
+
+    async def paths_changed(self, key, *paths):
+        """Write changes to the given backend paths through to the source's caches and index."""
+        fs_info = self.get_filesystem(key)
+        if not fs_info or fs_info["instance"] is None:
+            return
+
+        fs_instance = fs_info["instance"]
+        for path in paths:
+            fs_info["du_cache"].invalidate(fs_instance._strip_protocol(path))
+            self.block_cache.invalidate(key, fs_instance._strip_protocol(path))
+            if fs_info["cache"] is not None:
+                invalidate_cached(fs_info["cache"], path)
+        self.change_feed.notify(key, fs_instance, *paths)
+
+        index = fs_info["index"]
+        if index is None:
+            return
+
+        translate = self.get_relative_translator(key)
+        try:
+            for path in paths:
+                relative_path = self.to_relative_path(key, path)
+                await index.remove(relative_path)
+                try:
+                    info = await fs_instance._info(path)
+                except FileNotFoundError:
+                    continue
+
+                entries = [(relative_path, info)]
+                if info["type"] == "directory":
+                    found = await fs_instance._find(path, withdirs=True, detail=True)
+                    entries.extend(
+                        (translate(name), item) for name, item in found.items()
+                    )
+                await index.upsert(entries)
+        except Exception as e:
+            logger.error(f"Failed to update metadata index for '{key}': {e}")
 
     def check_reload_config(self):
         new_config_content = self.load_config()
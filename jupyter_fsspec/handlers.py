@@ -1,31 +1,69 @@
 import asyncio
 import base64
 import binascii
+import collections
+import functools
+import inspect
+import re
 import traceback
 import json
 import logging
+import time
 import tornado
+import tornado.websocket
 from contextlib import contextmanager
+from fsspec.utils import glob_translate
 
 
-from jupyter_server.base.handlers import APIHandler
+from jupyter_server.base.handlers import APIHandler, JupyterHandler
 from jupyter_server.utils import url_path_join
 
 from jupyter_fsspec.file_manager import FileSystemManager
 from jupyter_fsspec.models import (
+    BatchReadRequest,
     GetRequest,
     PostRequest,
+    RequestType,
     DeleteRequest,
     TransferRequest,
     Direction,
+    SearchRequest,
+    SearchType,
+    IndexRequest,
+    InfoRequest,
+    DiskUsageRequest,
+    PreviewRequest,
+    TabularPreviewRequest,
+    UploadRequest,
+    WatchAction,
+    WatchRequest,
+)
+from jupyter_fsspec.preview import build_preview
+from jupyter_fsspec.disk_cache import cache_stats
+from jupyter_fsspec.tabular import detect_format, tabular_preview
+from jupyter_fsspec.watcher import listing_snapshot
+from jupyter_fsspec.resilience import CircuitOpenError
+from jupyter_fsspec.disk_usage import (
+    DiskUsageWalk,
+    has_native_du,
+    native_disk_usage,
+)
+from jupyter_fsspec.utils import (
+    parse_range,
+    glob_literal_prefix,
+    regex_literal_prefix,
+    split_literal_prefix,
+    info_etag,
+    encode_frame,
 )
-from jupyter_fsspec.utils import parse_range
 from jupyter_fsspec.exceptions import JupyterFsspecException
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DETAIL_TO_KEEP = ["name", "type", "size", "ino", "mode"]
+
 
 @contextmanager
 def handle_exception(
@@ -40,6 +78,9 @@ def handle_exception(
         logger.error(error_message)
         traceback.print_exc()
 
+        if isinstance(e, CircuitOpenError):
+            # The source is known to be down, let clients back off
+            status_code = 503
         handler.set_status(status_code)
         handler.write(
             {
@@ -53,14 +94,63 @@ def handle_exception(
         raise JupyterFsspecException
 
 
+def cancel_on_disconnect(method):
+    """Run a handler method in a task of its own, cancelled if the client disconnects.
+
+    Only for methods that read: a disconnect never stops a method changing a source,
+    it runs to completion and its response is dropped.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        task = asyncio.ensure_future(method(self, *args, **kwargs))
+        self._cancellable_tasks.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self._client_closed and task.cancelled():
+                # Nobody is waiting for the response
+                raise tornado.web.Finish()
+            raise
+        finally:
+            self._cancellable_tasks.discard(task)
+
+    return wrapper
+
+
 class JupyterFsspecHandler(APIHandler):
+    def __init__(self, *args, **kwargs):
+        # Tasks of the methods run with cancel_on_disconnect
+        self._cancellable_tasks = set()
+        self._client_closed = False
+        super().__init__(*args, **kwargs)
+
     def check_xsrf_cookie(self):
         if self.request.headers.get("X-JFS-Client") == "non-browser":
             return  # Skip XSRF check for non-browser client
         super().check_xsrf_cookie()
 
+    def on_connection_close(self):
+        """Stop the backend operation of a read request whose client went away."""
+        super().on_connection_close()
+        self._client_closed = True
+        for task in self._cancellable_tasks:
+            if not task.done():
+                logger.info(
+                    f"Client disconnected, cancelling {self.request.method} {self.request.uri}"
+                )
+                task.cancel()
+
+
+class JupyterFsspecWebSocketHandler(JupyterHandler, tornado.websocket.WebSocketHandler):
+    async def get(self, *args, **kwargs):
+        # Refuse the upgrade instead of redirecting to the login page
+        if self.current_user is None:
+            raise tornado.web.HTTPError(403)
+        await super().get(*args, **kwargs)
+
 
-class FsspecConfigHandler(APIHandler):
+class FsspecConfigHandler(JupyterFsspecHandler):
     """
 
     Args:
@@ -71,6 +161,7 @@ class FsspecConfigHandler(APIHandler):
         self.fs_manager = fs_manager
 
     @tornado.web.authenticated
+    @cancel_on_disconnect
     async def get(self):
         """Retrieve filesystems information from configuration file.
 
@@ -98,6 +189,10 @@ class FsspecConfigHandler(APIHandler):
             }
             if fs_info.get("error", None):
                 instance["error"] = fs_info["error"]
+            if fs_info.get("cache") is not None:
+                instance["cache"] = cache_stats(fs_info["cache"])
+            if fs_info.get("breaker") is not None:
+                instance["breaker"] = fs_info["breaker"].stats()
             file_systems.append(instance)
 
         self.set_status(200)
@@ -163,6 +258,7 @@ class FileActionHandler(JupyterFsspecHandler):
                 except JupyterFsspecException:
                     return
 
+                await self.fs_manager.paths_changed(key, item_path, destination)
                 response["description"] = f"Moved {item_path} to {destination}."
             else:
                 # if provided paths are not expanded fsspec expands them
@@ -177,6 +273,7 @@ class FileActionHandler(JupyterFsspecHandler):
                 except JupyterFsspecException:
                     return
 
+                await self.fs_manager.paths_changed(key, destination)
                 response["description"] = f"Copied {item_path} to {destination}."
             response["status"] = "success"
             self.set_status(200)
@@ -249,6 +346,7 @@ class FileTransferHandler(JupyterFsspecHandler):
                         )
                 except JupyterFsspecException:
                     return
+                await self.fs_manager.paths_changed(dest_fs_key, remote_path)
                 response["description"] = f"Uploaded {local_path} to {remote_path}."
             else:
                 logger.debug("Download file")
@@ -269,6 +367,7 @@ class FileTransferHandler(JupyterFsspecHandler):
                 except JupyterFsspecException:
                     return
 
+                await self.fs_manager.paths_changed(dest_fs_key, local_path)
                 response["description"] = f"Downloaded {remote_path} to {local_path}."
 
             response["status"] = "success"
@@ -322,6 +421,7 @@ class RenameFileHandler(JupyterFsspecHandler):
             except JupyterFsspecException:
                 return
 
+            await self.fs_manager.paths_changed(key, item_path, content)
             response["status"] = "success"
             response["description"] = f"Renamed {item_path} to {content}."
             self.set_status(200)
@@ -339,6 +439,7 @@ class FileContentsHandler(JupyterFsspecHandler):
         self.fs_manager = fs_manager
 
     @tornado.web.authenticated
+    @cancel_on_disconnect
     async def get(self):
         request_data = {k: self.get_argument(k) for k in self.request.arguments}
         try:
@@ -365,7 +466,6 @@ class FileContentsHandler(JupyterFsspecHandler):
             # TODO: check size of read before executing
             range_header = self.request.headers["Range"]
             start, end = parse_range(range_header)
-            self.set_header("Content-Range", f"bytes {start}-{end}")
         else:
             # TODO: this reads whole file in one shot and can kill process
             start = end = None
@@ -373,14 +473,23 @@ class FileContentsHandler(JupyterFsspecHandler):
         logger.debug("Get contents %s (%s %s)", item_path, start, end)
         try:
             with handle_exception(self):
-                result = (
-                    await fs_instance._cat_file(item_path, start, end)
-                    if is_async
-                    else fs_instance.cat_file(item_path, start, end)
-                )
+                if start is not None and is_async:
+                    # Small sequential ranges are served from the shared block cache
+                    result = await self.fs_manager.block_cache.read(
+                        key, fs_instance, item_path, start, end
+                    )
+                else:
+                    result = (
+                        await fs_instance._cat_file(item_path, start, end)
+                        if is_async
+                        else fs_instance.cat_file(item_path, start, end)
+                    )
         except JupyterFsspecException:
             return
 
+        if start is not None:
+            # Open and overlong ranges end where the data did
+            self.set_header("Content-Range", f"bytes {start}-{start + len(result)}")
         self.set_header("Content-Length", str(len(result)))
         self.set_header("Content-Type", "application/octet-stream")
         self.set_status(200)
@@ -403,7 +512,999 @@ class FileContentsHandler(JupyterFsspecHandler):
         except JupyterFsspecException:
             return
 
+        await self.fs_manager.paths_changed(key, item_path)
+
+        self.set_status(201)
+        await self.finish()
+
+
+# ====================================================================================
+# Read many files or byte ranges in one request
+# ====================================================================================
+class FileBatchReadHandler(JupyterFsspecHandler):
+    # reads accepted in one request
+    max_reads = 10000
+    # bytes returned by one request, larger batches are rejected with 413
+    max_bytes = 1024 * 2**20
+    # reads of one source fetched with one backend call
+    chunk_reads = 64
+    # chunks read ahead of the frames written
+    read_ahead = 8
+    # file size lookups running at once
+    concurrency = 32
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    async def _read_sizes(self, key, reads):
+        """Return the number of bytes each ``(index, read)`` pair of one source returns.
+
+        Whole files and offsets from the end are resolved through the file size,
+        reads whose size cannot be looked up count for nothing and fail when read.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def size(read):
+            start, end = read.start, read.end
+            if start is not None and end is not None and start >= 0 and end >= 0:
+                return max(end - start, 0)
+            try:
+                fs, item_path = self.fs_manager.validate_fs("get", key, read.item_path)
+                async with semaphore:
+                    info = await fs["instance"]._info(item_path)
+            except Exception:
+                return 0
+            # slicing applies the same clamping and negative offsets as the read
+            return len(range(info.get("size") or 0)[start:end])
+
+        return await asyncio.gather(*(size(read) for _, read in reads))
+
+    async def _read_source(self, key, reads):
+        """Read ``(index, read)`` pairs of one source concurrently."""
+        results = {}
+        paths, starts, ends, indices = [], [], [], []
+        for i, read in reads:
+            try:
+                fs, item_path = self.fs_manager.validate_fs("get", key, read.item_path)
+            except Exception as e:
+                results[i] = e
+                continue
+            paths.append(item_path)
+            starts.append(read.start)
+            ends.append(read.end)
+            indices.append(i)
+        if paths:
+            try:
+                blobs = await fs["instance"]._cat_ranges(
+                    paths, starts, ends, on_error="return"
+                )
+            except Exception as e:
+                blobs = [e] * len(paths)
+            results.update(zip(indices, blobs))
+        return results
+
+    # POST /jupyter_fsspec/files/batch
+    # JSON Payload
+    # reads: list of key, item_path, start, end
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def post(self):
+        """Read whole files or byte ranges of files of any sources, concurrently.
+
+        :param [reads]: [Request body property list of reads, each with a key,
+            an item_path and an optional start and end]
+
+        :return: the result of each read in order, framed as a kind byte (0 for data,
+            1 for a JSON error), an 8 byte big-endian length and the payload, each
+            frame sent as soon as it and the ones before it are read. 413 when the
+            reads add up to more than ``max_bytes``
+        :rtype: bytes
+        """
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                request_data = json.loads(self.request.body.decode("utf-8"))
+                batch_request = BatchReadRequest(**request_data)
+                if len(batch_request.reads) > self.max_reads:
+                    raise ValueError(
+                        f"At most {self.max_reads} reads are accepted in one request"
+                    )
+        except JupyterFsspecException:
+            return
+
+        by_key = {}
+        for i, read in enumerate(batch_request.reads):
+            by_key.setdefault(read.key, []).append((i, read))
+
+        sizes = await asyncio.gather(
+            *(self._read_sizes(key, reads) for key, reads in by_key.items())
+        )
+        total = sum(sum(source_sizes) for source_sizes in sizes)
+        try:
+            with handle_exception(self, status_code=413):
+                if total > self.max_bytes:
+                    raise ValueError(
+                        f"The reads add up to {total} bytes, "
+                        f"at most {self.max_bytes} are returned in one request"
+                    )
+        except JupyterFsspecException:
+            return
+
+        # Chunks start in request order, so the frames are written as they arrive
+        chunks = iter(
+            sorted(
+                (
+                    (key, reads[n : n + self.chunk_reads])
+                    for key, reads in by_key.items()
+                    for n in range(0, len(reads), self.chunk_reads)
+                ),
+                key=lambda item: item[1][0][0],
+            )
+        )
+        tasks = {}
+        unwritten = {}
+
+        def read_next_chunk():
+            key, reads = next(chunks, (None, None))
+            if reads is None:
+                return False
+            task = asyncio.ensure_future(self._read_source(key, reads))
+            unwritten[task] = len(reads)
+            tasks.update((i, task) for i, _ in reads)
+            return True
+
+        self.set_status(200)
+        self.set_header("Content-Type", "application/octet-stream")
+        try:
+            for i in range(len(batch_request.reads)):
+                while i not in tasks or len(unwritten) < self.read_ahead:
+                    if not read_next_chunk():
+                        break
+                task = tasks.pop(i)
+                result = (await task).pop(i)
+                unwritten[task] -= 1
+                if not unwritten[task]:
+                    del unwritten[task]
+                for chunk in encode_frame(result):
+                    self.write(chunk)
+                await self.flush()
+        finally:
+            for task in unwritten:
+                task.cancel()
+        await self.finish()
+
+
+# ====================================================================================
+# File information of single paths
+# ====================================================================================
+class FileInfoHandler(JupyterFsspecHandler):
+    # backend lookups running at once for a batch of paths
+    concurrency = 32
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    async def _stat(self, key, paths):
+        """Return the information of each path, or the error looking it up."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def stat(path):
+            async with semaphore:
+                fs, item_path = self.fs_manager.validate_fs("get", key, path)
+                fs_instance = fs["instance"]
+                info = await fs_instance._info(item_path)
+                filtered = {k: info[k] for k in DETAIL_TO_KEEP if k in info}
+                root_path = self.fs_manager.name_to_prefix[key]
+                return self.fs_manager.map_paths(root_path, key, [filtered])[0]
+
+        return await asyncio.gather(
+            *(stat(path) for path in paths), return_exceptions=True
+        )
+
+    # GET /jupyter_fsspec/files/info?key=my-key&item_path=/some_directory/file.txt
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def get(self):
+        """Retrieve the information of a single path, without listing its directory.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [item_path]: [Query arg string path of the file or directory]
+
+        :return: dict with the name, type and size of the path, 404 when it does not exist
+        :rtype: dict
+        """
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                info_request = InfoRequest(**request_data)
+                if info_request.item_path is None:
+                    raise ValueError("Missing required parameter `item_path`")
+        except JupyterFsspecException:
+            return
+
+        (result,) = await self._stat(info_request.key, [info_request.item_path])
+        if isinstance(result, Exception):
+            status_code = 404 if isinstance(result, FileNotFoundError) else 500
+            try:
+                with handle_exception(self, status_code=status_code):
+                    raise result
+            except JupyterFsspecException:
+                return
+
+        self.set_status(200)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Retrieved information of {info_request.item_path}",
+                "content": result,
+            }
+        )
+        await self.finish()
+
+    # POST /jupyter_fsspec/files/info
+    # JSON Payload
+    # key, paths
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def post(self):
+        """Retrieve the information of many paths, looked up concurrently.
+
+        :param [key]: [Request body property string of the filesystem instance]
+        :param [paths]: [Request body property list of paths]
+
+        :return: dict with a list in the order of paths, holding the information
+            of each path, or its name with the error and description of a failed lookup
+        :rtype: dict
+        """
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                request_data = json.loads(self.request.body.decode("utf-8"))
+                info_request = InfoRequest(**request_data)
+                if info_request.paths is None:
+                    raise ValueError("Missing required parameter `paths`")
+        except JupyterFsspecException:
+            return
+
+        results = await self._stat(info_request.key, info_request.paths)
+        content = [
+            (
+                {
+                    "name": path,
+                    "error": type(result).__name__,
+                    "description": str(result),
+                }
+                if isinstance(result, Exception)
+                else result
+            )
+            for path, result in zip(info_request.paths, results)
+        ]
+
+        self.set_status(200)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Retrieved information of {len(content)} paths",
+                "content": content,
+            }
+        )
+        await self.finish()
+
+
+# ====================================================================================
+# Upload a file in chunks
+# ====================================================================================
+class FileUploadHandler(JupyterFsspecHandler):
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    def _parse_request(self):
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        with handle_exception(
+            self, status_code=400, default_msg="Error processing request payload."
+        ):
+            upload_request = UploadRequest(**request_data)
+            fs, item_path = self.fs_manager.validate_fs(
+                "post", upload_request.key, upload_request.item_path
+            )
+        return upload_request, fs, item_path
+
+    def _get_upload(self, upload_request, item_path):
+        with handle_exception(self, status_code=404):
+            if upload_request.upload_id is None:
+                raise ValueError("Missing required parameter `upload_id`")
+            return self.fs_manager.uploads.get(
+                upload_request.upload_id, upload_request.key, item_path
+            )
+
+    # POST /jupyter_fsspec/files/upload?key=my-key&item_path=/some_directory/file.bin
+    @tornado.web.authenticated
+    async def post(self):
+        """Start a chunked upload, or commit it when given its upload_id.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [item_path]: [Query arg string path of the uploaded file]
+        :param [upload_id]: [Optional query arg id of the upload to commit]
+
+        :return: dict with the upload_id of a started upload
+        :rtype: dict
+        """
+        try:
+            upload_request, fs, item_path = self._parse_request()
+            if upload_request.upload_id is None:
+                with handle_exception(self):
+                    # Chunks are written with blocking file calls in a worker thread
+                    sync_fs = self.fs_manager.construct_named_fs(upload_request.key)
+                    upload = await self.fs_manager.uploads.start(
+                        upload_request.key, item_path, sync_fs
+                    )
+                self.set_status(201)
+                self.write(
+                    {
+                        "status": "success",
+                        "description": f"Started upload of {item_path}",
+                        "content": {"upload_id": upload.id},
+                    }
+                )
+                await self.finish()
+                return
+
+            upload = self._get_upload(upload_request, item_path)
+            with handle_exception(self):
+                try:
+                    await upload.commit()
+                finally:
+                    await self.fs_manager.uploads.finish(upload.id)
+        except JupyterFsspecException:
+            return
+
+        await self.fs_manager.paths_changed(upload_request.key, item_path)
+
         self.set_status(201)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Uploaded {upload.size} bytes to {item_path}",
+                "content": {"size": upload.size},
+            }
+        )
+        await self.finish()
+
+    # PUT /jupyter_fsspec/files/upload?key=my-key&item_path=/file.bin&upload_id=...&offset=0
+    @tornado.web.authenticated
+    async def put(self):
+        """Append the request body to an upload, at byte offset of the file.
+
+        A chunk that does not continue the upload gets a 409 response with the
+        number of bytes received so far.
+        """
+        try:
+            upload_request, fs, item_path = self._parse_request()
+            upload = self._get_upload(upload_request, item_path)
+            with handle_exception(self, status_code=409):
+                size = await upload.write(upload_request.offset, self.request.body)
+        except JupyterFsspecException:
+            return
+
+        self.set_status(200)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Received {size} bytes of {item_path}",
+                "content": {"size": size},
+            }
+        )
+        await self.finish()
+
+    @tornado.web.authenticated
+    async def delete(self):
+        """Abort an upload, discarding the chunks received."""
+        try:
+            upload_request, fs, item_path = self._parse_request()
+            upload = self._get_upload(upload_request, item_path)
+        except JupyterFsspecException:
+            return
+
+        await self.fs_manager.uploads.finish(upload.id)
+        self.set_status(200)
+        self.write(
+            {"status": "success", "description": f"Aborted upload of {item_path}"}
+        )
+        await self.finish()
+
+
+# ====================================================================================
+# Search a filesystem by glob or regex
+# ====================================================================================
+class FileSearchHandler(JupyterFsspecHandler):
+    # number of matches written between flushes of the streamed response
+    batch_size = 100
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    @staticmethod
+    def _build_search(search_request):
+        """Compile the matcher and derive the listing directory, name prefix and depth."""
+        pattern = search_request.pattern
+        maxdepth = None
+        if search_request.type == SearchType.regex:
+            matcher = re.compile(pattern).search
+            literal = regex_literal_prefix(pattern)
+        else:
+            pattern = pattern.lstrip("/")
+            matcher = re.compile(glob_translate(pattern)).match
+            literal = glob_literal_prefix(pattern)
+        directory, name_prefix = split_literal_prefix(literal.lstrip("/"))
+
+        if search_request.type == SearchType.glob and "**" not in pattern:
+            remainder = pattern[len(directory) + 1 :] if directory else pattern
+            maxdepth = remainder.count("/") + 1
+        return matcher, directory, name_prefix, maxdepth
+
+    @staticmethod
+    async def _iter_tree(fs_instance, path, listing, name_prefix, maxdepth):
+        """Yield the entries of a tree one directory listing at a time.
+
+        ``listing`` is the listing of ``path`` itself. Directories are only
+        listed as the caller keeps iterating, so a search that reaches its
+        limit stops listing the backend. Unreadable subdirectories are skipped,
+        as ``find`` does.
+        """
+        pending = collections.deque([(path.rstrip("/"), 1, listing)])
+        while pending:
+            directory, depth, listing = pending.popleft()
+            if listing is None:
+                try:
+                    listing = await fs_instance._ls(directory, detail=True)
+                except (FileNotFoundError, OSError) as e:
+                    logger.debug(f"Search skipped {directory}: {e}")
+                    continue
+            for info in listing:
+                name = info["name"].rstrip("/")
+                if name == directory:
+                    continue
+                if (
+                    depth == 1
+                    and name_prefix
+                    and not name.rsplit("/", 1)[-1].startswith(name_prefix)
+                ):
+                    continue
+                yield info
+                if info["type"] == "directory" and (
+                    maxdepth is None or depth < maxdepth
+                ):
+                    pending.append((name, depth + 1, None))
+
+    @staticmethod
+    async def _iter_values(entries):
+        for info in entries.values():
+            yield info
+
+    @staticmethod
+    async def _find(fs_instance, base_path, name_prefix, maxdepth):
+        """List the whole tree in one call, passing the name prefix to backends that take it."""
+        find_kwargs = {}
+        find_method = fs_instance._find if fs_instance.async_impl else fs_instance.find
+        if name_prefix and "prefix" in inspect.signature(find_method).parameters:
+            find_kwargs["prefix"] = name_prefix
+        if fs_instance.async_impl:
+            return await fs_instance._find(
+                base_path, maxdepth=maxdepth, withdirs=True, detail=True, **find_kwargs
+            )
+        return fs_instance.find(
+            base_path, maxdepth=maxdepth, withdirs=True, detail=True, **find_kwargs
+        )
+
+    # GET /jupyter_fsspec/files/search?key=my-key&pattern=logs/2024-*.txt
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def get(self):
+        """Stream paths in a filesystem matching a glob or regex pattern.
+
+        Only the longest literal prefix of the pattern is listed, so backends
+        that support prefix listing (e.g. S3) avoid walking the whole source.
+        With a limit, the tree is listed one directory at a time and listing
+        stops once the limit is reached.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [pattern]: [Query arg glob or regex matched against paths relative to the filesystem root]
+        :param [type]: [Optional query arg 'glob' (default) or 'regex']
+        :param [limit]: [Optional query arg maximum number of matches]
+
+        :return: newline delimited JSON, one file information object per match,
+            followed by a final status object with the match count
+        :rtype: str
+        """
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                search_request = SearchRequest(**request_data)
+                matcher, directory, name_prefix, maxdepth = self._build_search(
+                    search_request
+                )
+        except JupyterFsspecException:
+            return
+
+        key = search_request.key
+        limit = search_request.limit
+
+        try:
+            with handle_exception(self):
+                fs = self.fs_manager.get_filesystem(key)
+                if fs is None:
+                    raise ValueError(f"No filesystem found for key: {key}")
+                fs_instance = fs["instance"]
+                root = fs["path"].rstrip("/")
+                base_path = "/".join(part for part in (root, directory) if part)
+
+                logger.debug(
+                    "Search %s under %s (prefix %s, maxdepth %s)",
+                    key,
+                    base_path,
+                    name_prefix,
+                    maxdepth,
+                )
+                if limit is not None and fs_instance.async_impl:
+                    # List directory by directory, stopping once the limit is reached
+                    try:
+                        listing = await fs_instance._ls(base_path, detail=True)
+                    except FileNotFoundError:
+                        listing = []
+                    entries = self._iter_tree(
+                        fs_instance, base_path, listing, name_prefix, maxdepth
+                    )
+                else:
+                    entries = self._iter_values(
+                        await self._find(fs_instance, base_path, name_prefix, maxdepth)
+                    )
+        except JupyterFsspecException:
+            return
+
+        relative_to_root = self.fs_manager.get_relative_translator(key)
+        map_items = self.fs_manager.get_items_mapper(
+            self.fs_manager.name_to_prefix[key], key
+        )
+
+        self.set_status(200)
+        self.set_header("Content-Type", "application/x-ndjson")
+        count = 0
+        truncated = False
+        async for item_dict in entries:
+            relative_path = relative_to_root(item_dict["name"])
+            if not relative_path or not matcher(relative_path):
+                continue
+            if limit is not None and count >= limit:
+                truncated = True
+                break
+            item = {
+                info: item_dict[info] for info in DETAIL_TO_KEEP if info in item_dict
+            }
+            if map_items is not None:
+                map_items([item])
+            self.write(json.dumps(item) + "\n")
+            count += 1
+            if count % self.batch_size == 0:
+                await self.flush()
+        await entries.aclose()
+
+        self.write(
+            json.dumps(
+                {
+                    "status": "success",
+                    "description": f"Found {count} matches for {search_request.pattern}.",
+                    "count": count,
+                    "truncated": truncated,
+                }
+            )
+            + "\n"
+        )
+        await self.finish()
+
+
+# ====================================================================================
+# Query the persistent metadata index of a filesystem
+# ====================================================================================
+class FileIndexHandler(JupyterFsspecHandler):
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    # GET /jupyter_fsspec/files/index?key=my-key&item_path=some_directory&sort=size
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def get(self):
+        """Retrieve file information from the metadata index of a filesystem.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [item_path]: [Query arg string directory to query], defaults to [root path of the filesystem]
+        :param [pattern]: [Optional query arg glob matched against entry names]
+        :param [sort]: [Optional query arg 'name' (default), 'size', 'mtime' or 'type']
+        :param [descending]: [Optional query arg reverse the sort order]
+        :param [recursive]: [Optional query arg include all entries below item_path]
+        :param [limit]: [Optional query arg maximum number of entries]
+        :param [refresh]: [Optional query arg list the live backend before answering]
+
+        :return: dict with a status, description, content and the index freshness
+            timestamp (indexed_at, None until the first crawl completes)
+        :rtype: dict
+        """
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                index_request = IndexRequest(**request_data)
+        except JupyterFsspecException:
+            return
+
+        key = index_request.key
+        recursive = index_request.recursive
+
+        try:
+            with handle_exception(self):
+                fs = self.fs_manager.get_filesystem(key)
+                if fs is None:
+                    raise ValueError(f"No filesystem found for key: {key}")
+                index = fs["index"]
+                if index is None:
+                    raise ValueError(f"No metadata index configured for key: {key}")
+
+                item_path = fs["path"]
+                if index_request.item_path:
+                    _, item_path = self.fs_manager.validate_fs(
+                        "get", key, index_request.item_path
+                    )
+                relative_path = self.fs_manager.to_relative_path(key, item_path)
+
+                if index_request.refresh:
+                    fs_instance = fs["instance"]
+                    if recursive:
+                        found = await fs_instance._find(
+                            item_path, withdirs=True, detail=True
+                        )
+                        infos = found.values()
+                    else:
+                        infos = await fs_instance._ls(
+                            item_path, detail=True, refresh=True
+                        )
+                    translate = self.fs_manager.get_relative_translator(key)
+                    await index.replace(
+                        relative_path,
+                        ((translate(info["name"]), info) for info in infos),
+                        recursive=recursive,
+                    )
+                elif index.is_stale():
+                    self.fs_manager.start_index_crawl(key)
+
+                entries = await index.query(
+                    relative_path,
+                    pattern=index_request.pattern,
+                    sort=index_request.sort.value,
+                    descending=index_request.descending,
+                    recursive=recursive,
+                    limit=index_request.limit,
+                )
+        except JupyterFsspecException:
+            return
+
+        for entry in entries:
+            entry["name"] = f"{key}/{entry['name']}"
+
+        self.set_status(200)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Retrieved {len(entries)} entries from the index of {key}.",
+                "content": entries,
+                "indexed_at": index.indexed_at,
+                "refreshed_at": time.time() if index_request.refresh else None,
+                "crawling": index.crawling,
+            }
+        )
+        await self.finish()
+
+
+# ====================================================================================
+# Directory size (du) of a filesystem path
+# ====================================================================================
+class FileDiskUsageHandler(JupyterFsspecHandler):
+    # maximum concurrent listings during a walk
+    max_concurrency = 16
+    # seconds between progress lines while walking
+    progress_interval = 1.0
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    def _write_line(self, payload):
+        self.write(json.dumps(payload) + "\n")
+
+    # GET /jupyter_fsspec/files/du?key=my-key&item_path=some_directory
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def get(self):
+        """Compute the total bytes and file count below a path.
+
+        Uses the filesystem's own ``du`` when it has one, otherwise walks the
+        tree concurrently, streaming running totals every ``progress_interval``
+        seconds. Directory subtotals are cached until a change below them.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [item_path]: [Query arg string directory to measure], defaults to [root path of the filesystem]
+        :param [refresh]: [Optional query arg ignore cached subtotals]
+
+        :return: newline delimited JSON, zero or more progress objects with
+            status "running" followed by a final status object with the totals
+        :rtype: str
+        """
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                du_request = DiskUsageRequest(**request_data)
+        except JupyterFsspecException:
+            return
+
+        key = du_request.key
+
+        walk_task = None
+        try:
+            try:
+                with handle_exception(self):
+                    fs = self.fs_manager.get_filesystem(key)
+                    if fs is None:
+                        raise ValueError(f"No filesystem found for key: {key}")
+                    item_path = fs["path"]
+                    if du_request.item_path:
+                        _, item_path = self.fs_manager.validate_fs(
+                            "get", key, du_request.item_path
+                        )
+                    fs_instance = fs["instance"]
+                    du_cache = fs["du_cache"]
+                    if du_request.refresh:
+                        du_cache.invalidate(fs_instance._strip_protocol(item_path))
+
+                    native = has_native_du(fs_instance)
+                    if native:
+                        total_bytes, file_count = await native_disk_usage(
+                            fs_instance, item_path
+                        )
+                        dir_count = None
+                    else:
+                        walk = DiskUsageWalk(
+                            fs_instance,
+                            item_path,
+                            max_concurrency=self.max_concurrency,
+                            cache=du_cache,
+                        )
+                        walk_task = asyncio.ensure_future(walk.run())
+                        done, _ = await asyncio.wait(
+                            [walk_task], timeout=self.progress_interval
+                        )
+                        if walk_task in done:
+                            total_bytes, file_count, dir_count = walk_task.result()
+            except JupyterFsspecException:
+                return
+
+            self.set_status(200)
+            self.set_header("Content-Type", "application/x-ndjson")
+
+            if not native and walk_task not in done:
+                # Large tree: stream running totals until the walk completes
+                while not walk_task.done():
+                    self._write_line({"status": "running", **walk.progress})
+                    await self.flush()
+                    await asyncio.wait([walk_task], timeout=self.progress_interval)
+                try:
+                    total_bytes, file_count, dir_count = walk_task.result()
+                except Exception as e:
+                    traceback.print_exc()
+                    logger.error(f"Error computing disk usage: {e}")
+                    self._write_line(
+                        {
+                            "status": "failed",
+                            "description": f"{type(e).__name__}: {str(e)}",
+                            "error_code": type(e).__name__,
+                            **walk.progress,
+                        }
+                    )
+                    await self.finish()
+                    return
+        finally:
+            # A cancelled request must not leave the walk listing the backend
+            if walk_task is not None:
+                walk_task.cancel()
+
+        self._write_line(
+            {
+                "status": "success",
+                "description": f"Computed disk usage of {item_path}.",
+                "content": {
+                    "path": item_path,
+                    "total_bytes": total_bytes,
+                    "file_count": file_count,
+                    "dir_count": dir_count,
+                    "native": native,
+                },
+            }
+        )
+        await self.finish()
+
+
+# ====================================================================================
+# Bounded preview of file contents
+# ====================================================================================
+class FilePreviewHandler(JupyterFsspecHandler):
+    # bytes read when the request does not specify max_bytes
+    default_preview_bytes = 8 * 1024
+    # upper bound on the bytes a single preview may read
+    max_preview_bytes = 64 * 1024
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    # GET /jupyter_fsspec/files/preview?key=my-key&item_path=/some_directory/file.txt
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def get(self):
+        """Preview the first bytes of a file without reading all of it.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [item_path]: [Query arg string path to file to be previewed]
+        :param [max_bytes]: [Optional query arg number of leading bytes to read, capped at max_preview_bytes]
+
+        :return: dict with a status, description and content with the sniffed
+            mime_type and encoding, and either a decoded text snippet or a hex dump
+        :rtype: dict
+        """
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                preview_request = PreviewRequest(**request_data)
+        except JupyterFsspecException:
+            return
+
+        key = preview_request.key
+        max_bytes = min(
+            preview_request.max_bytes or self.default_preview_bytes,
+            self.max_preview_bytes,
+        )
+
+        try:
+            with handle_exception(self):
+                fs, item_path = self.fs_manager.validate_fs(
+                    "get", key, preview_request.item_path
+                )
+                fs_instance = fs["instance"]
+                is_async = fs_instance.async_impl
+                info = (
+                    await fs_instance._info(item_path)
+                    if is_async
+                    else fs_instance.info(item_path)
+                )
+                if info["type"] == "directory":
+                    raise IsADirectoryError(f"{item_path} is a directory.")
+                data = (
+                    await fs_instance._cat_file(item_path, 0, max_bytes)
+                    if is_async
+                    else fs_instance.cat_file(item_path, 0, max_bytes)
+                )
+        except JupyterFsspecException:
+            return
+
+        self.set_status(200)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Previewed {len(data)} bytes of {item_path}.",
+                "content": build_preview(data, item_path, info.get("size")),
+            }
+        )
+        await self.finish()
+
+
+class FileTabularPreviewHandler(JupyterFsspecHandler):
+    # upper bound on the sample rows a single preview may return
+    max_preview_rows = 1000
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+
+    # GET /jupyter_fsspec/files/tabular?key=my-key&item_path=/some_directory/data.parquet
+    @tornado.web.authenticated
+    @cancel_on_disconnect
+    async def get(self):
+        """Preview the schema and first rows of a Parquet, Arrow, CSV or JSONL file.
+
+        Parquet and Arrow files are read with ranged requests for the footer and
+        the first row group only. Results are cached per source by file ETag.
+
+        :param [key]: [Query arg string corresponding to the appropriate filesystem instance]
+        :param [item_path]: [Query arg string path to file to be previewed]
+        :param [rows]: [Optional query arg number of sample rows, capped at max_preview_rows]
+        :param [columns]: [Optional query arg comma separated column names to sample]
+        :param [format]: [Optional query arg file format, detected from the extension by default]
+
+        :return: dict with a status, description and content with the schema,
+            sample rows and the number of bytes read
+        :rtype: dict
+        """
+        request_data = {k: self.get_argument(k) for k in self.request.arguments}
+        try:
+            with handle_exception(
+                self, status_code=400, default_msg="Error processing request payload."
+            ):
+                tabular_request = TabularPreviewRequest(**request_data)
+                file_format = (
+                    tabular_request.format.value
+                    if tabular_request.format
+                    else detect_format(tabular_request.item_path)
+                )
+                if file_format is None:
+                    raise ValueError(
+                        f"Cannot detect the format of {tabular_request.item_path}, "
+                        "specify it with the format argument."
+                    )
+        except JupyterFsspecException:
+            return
+
+        key = tabular_request.key
+        rows = min(tabular_request.rows, self.max_preview_rows)
+        columns = tabular_request.column_list
+
+        try:
+            with handle_exception(self):
+                fs, item_path = self.fs_manager.validate_fs(
+                    "get", key, tabular_request.item_path
+                )
+                fs_instance = fs["instance"]
+                info = (
+                    await fs_instance._info(item_path)
+                    if fs_instance.async_impl
+                    else fs_instance.info(item_path)
+                )
+                if info["type"] == "directory":
+                    raise IsADirectoryError(f"{item_path} is a directory.")
+
+                cache_key = (
+                    item_path,
+                    info_etag(info),
+                    file_format,
+                    rows,
+                    tuple(columns) if columns else None,
+                )
+                preview = fs["preview_cache"].get(cache_key)
+                cached = preview is not None
+                if not cached:
+                    preview = await tabular_preview(
+                        fs_instance,
+                        item_path,
+                        info.get("size"),
+                        file_format,
+                        rows,
+                        columns,
+                    )
+                    fs["preview_cache"].set(cache_key, preview)
+        except JupyterFsspecException:
+            return
+
+        self.set_status(200)
+        self.write(
+            {
+                "status": "success",
+                "description": f"Previewed {file_format} file {item_path}.",
+                "content": {**preview, "cached": cached},
+            }
+        )
         await self.finish()
 
 
@@ -428,6 +1529,7 @@ class FileSystemHandler(JupyterFsspecHandler):
     # GET
     # /files
     @tornado.web.authenticated
+    @cancel_on_disconnect
     async def get(self):
         """Retrieve list of files for directories
 
@@ -437,9 +1539,13 @@ class FileSystemHandler(JupyterFsspecHandler):
         if type is "find" recursive files/directories listed;
         if type is "range", returns specified byte range content;
         defaults to "default" for one level deep directory contents and single file entire contents]
+        :param [since]: [Optional query arg version token of an earlier listing of item_path]
+        :param [maxdepth]: [Optional query arg directory levels listed by a "find" request]
 
         :return: dict with a status, description and content/error
-            content being a list of files, file information
+            content being a list of files, file information, and a version token for
+            the listing. When since is a known token, delta is true and content only
+            holds the entries added, removed or modified since, each with a change.
         :rtype: dict
         """
         # GET /jupyter_fsspec/files?key=my-key&item_path=/some_directory/of_interest
@@ -465,6 +1571,30 @@ class FileSystemHandler(JupyterFsspecHandler):
         fs_instance = fs["instance"]
         response = {}
 
+        if get_request.type == RequestType.find:
+            # Everything below item_path in one response, instead of a request per directory
+            try:
+                with handle_exception(self):
+                    result = await fs_instance._find(
+                        item_path,
+                        maxdepth=get_request.maxdepth,
+                        withdirs=True,
+                        detail=True,
+                    )
+            except JupyterFsspecException:
+                return
+            filtered_result = [
+                {info: item_dict[info] for info in DETAIL_TO_KEEP if info in item_dict}
+                for item_dict in result.values()
+            ]
+            root_path = self.fs_manager.name_to_prefix[key]
+            response["content"] = self.fs_manager.map_paths(
+                root_path, key, filtered_result
+            )
+            self.write(response)
+            await self.finish()
+            return
+
         try:
             with handle_exception(self):
                 is_async = fs_instance.async_impl
@@ -476,14 +1606,37 @@ class FileSystemHandler(JupyterFsspecHandler):
         except JupyterFsspecException:
             return
 
-        detail_to_keep = ["name", "type", "size", "ino", "mode"]
+        listing_versions = self.fs_manager.listing_versions
+        snapshot = listing_snapshot(result)
+        delta = None
+        if get_request.since is not None:
+            delta = listing_versions.changes_since(
+                key, item_path, get_request.since, snapshot
+            )
+        if delta is None:
+            entries = result
+            response["version"] = listing_versions.add(key, item_path, snapshot)
+        else:
+            entries = [item_dict for _, item_dict in delta]
+            # An unchanged listing keeps its version
+            response["version"] = (
+                listing_versions.add(key, item_path, snapshot)
+                if delta
+                else get_request.since
+            )
+        response["delta"] = delta is not None
+
         filtered_result = [
-            {info: item_dict[info] for info in detail_to_keep if info in item_dict}
-            for item_dict in result
+            {info: item_dict[info] for info in DETAIL_TO_KEEP if info in item_dict}
+            for item_dict in entries
         ]
-        response["content"] = filtered_result
         root_path = self.fs_manager.name_to_prefix[key]
         mapped_result = self.fs_manager.map_paths(root_path, key, filtered_result)
+        if delta:
+            mapped_result = [
+                {"change": change, **item_dict}
+                for (change, _), item_dict in zip(delta, mapped_result)
+            ]
         response["content"] = mapped_result
         self.write(response)
         await self.finish()
@@ -550,6 +1703,7 @@ class FileSystemHandler(JupyterFsspecHandler):
             except JupyterFsspecException:
                 return
 
+            await self.fs_manager.paths_changed(key, item_path)
             response["status"] = "success"
             response["description"] = f"Updated file {item_path}."
             self.set_status(200)
@@ -568,6 +1722,7 @@ class FileSystemHandler(JupyterFsspecHandler):
 
         :param [key]: [Query arg string used to retrieve the appropriate filesystem instance]
         :param [item_path]: [Query arg string path to file or directory to be retrieved]
+        :param [recursive]: [Optional request body property to delete a directory with its contents]
 
         :return: dict with a status, description and (optionally) error
         :rtype: dict
@@ -592,14 +1747,16 @@ class FileSystemHandler(JupyterFsspecHandler):
         try:
             try:
                 with handle_exception(self):
+                    recursive = delete_request.recursive
                     (
-                        await fs_instance._rm(item_path)
+                        await fs_instance._rm(item_path, recursive=recursive)
                         if is_async
-                        else fs_instance.rm(item_path)
+                        else fs_instance.rm(item_path, recursive=recursive)
                     )
             except JupyterFsspecException:
                 return
 
+            await self.fs_manager.paths_changed(key, item_path)
             self.set_status(200)
             response["status"] = "success"
             response["description"] = f"Deleted {item_path}."
@@ -612,6 +1769,320 @@ class FileSystemHandler(JupyterFsspecHandler):
         await self.finish()
 
 
+# ====================================================================================
+# Push changes of watched directories
+# ====================================================================================
+class FileEventsHandler(JupyterFsspecWebSocketHandler):
+    """Notify the client of changes to the directories it watches.
+
+    The client sends ``{"action": "watch" | "unwatch", "key", "item_path"}`` and
+    receives ``{"key", "item_path", "changes"}`` whenever the listing of a watched
+    directory changes, where each change is a listing entry with a ``change``
+    of "added", "removed" or "modified".
+    """
+
+    def initialize(self, fs_manager):
+        self.fs_manager = fs_manager
+        self._watches = {}
+
+    def _write(self, message):
+        try:
+            self.write_message(json.dumps(message))
+        except tornado.websocket.WebSocketClosedError:
+            logger.debug("Events socket closed before a notification")
+
+    def _send_changes(self, key, item_path, changes):
+        entries = [
+            {info: entry[info] for info in DETAIL_TO_KEEP if info in entry}
+            for _, entry in changes
+        ]
+        root_path = self.fs_manager.name_to_prefix[key]
+        mapped = self.fs_manager.map_paths(root_path, key, entries)
+        self._write(
+            {
+                "key": key,
+                "item_path": item_path,
+                "changes": [
+                    {"change": change, **entry}
+                    for (change, _), entry in zip(changes, mapped)
+                ],
+            }
+        )
+
+    def on_message(self, message):
+        try:
+            watch_request = WatchRequest(**json.loads(message))
+            watch_key = (watch_request.key, watch_request.item_path)
+            if watch_request.action == WatchAction.watch:
+                if watch_key in self._watches:
+                    return
+                fs, item_path = self.fs_manager.validate_fs("get", *watch_key)
+                callback = functools.partial(self._send_changes, *watch_key)
+                self.fs_manager.change_feed.subscribe(
+                    watch_request.key, fs["instance"], item_path, callback
+                )
+                self._watches[watch_key] = (fs["instance"], item_path, callback)
+            elif watch_key in self._watches:
+                self.fs_manager.change_feed.unsubscribe(
+                    watch_request.key, *self._watches.pop(watch_key)
+                )
+        except Exception as e:
+            logger.error(f"Failed to process events message: {e}")
+            self._write(
+                {
+                    "status": "failed",
+                    "description": f"{type(e).__name__}: {str(e)}",
+                    "error_code": type(e).__name__,
+                }
+            )
+
+    def on_close(self):
+        for (key, _), watch in self._watches.items():
+            self.fs_manager.change_feed.unsubscribe(key, *watch)
+        self._watches.clear()
+
+
+# ====================================================================================
+# Multiplexed WebSocket channel for the API
+# ====================================================================================
+class _ChannelConnection(tornado.httputil.HTTPConnection):
+    """Connection of a request carried by a channel frame.
+
+    The response is collected by the handler itself, see ``_ChannelResponse``,
+    so nothing is written to it.
+    """
+
+    def __init__(self, context):
+        self.context = context
+
+    def set_close_callback(self, callback):
+        pass
+
+    def finish(self):
+        pass
+
+
+class _ChannelResponse:
+    """Handler mixin keeping the response in memory instead of sending it.
+
+    Flushing is a no-op, the whole response is replied as one frame once the
+    handler finishes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.channel_headers = {}
+        self.channel_chunks = []
+        self.channel_finished = False
+        super().__init__(*args, **kwargs)
+
+    def set_header(self, name, value):
+        super().set_header(name, value)
+        self.channel_headers[name] = str(value)
+
+    def clear_header(self, name):
+        super().clear_header(name)
+        self.channel_headers.pop(name, None)
+
+    def write(self, chunk):
+        if self.channel_finished:
+            raise RuntimeError("Cannot write() after finish()")
+        if isinstance(chunk, dict):
+            chunk = tornado.escape.json_encode(chunk)
+            self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.channel_chunks.append(tornado.escape.utf8(chunk))
+
+    def flush(self, include_footers=False):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    def finish(self, chunk=None):
+        if chunk is not None:
+            self.write(chunk)
+        self.channel_finished = True
+        return super().finish()
+
+
+@functools.lru_cache(maxsize=None)
+def _channel_handler_class(handler_class):
+    return type(handler_class.__name__, (_ChannelResponse, handler_class), {})
+
+
+async def _call_handler(handler):
+    """Run the method of ``handler`` for its request and finish the response."""
+    method = handler.request.method
+    if method not in handler.SUPPORTED_METHODS:
+        raise tornado.web.HTTPError(405)
+    # Authenticates the request and checks its XSRF token
+    result = handler.prepare()
+    if result is not None:
+        await result
+    if not handler.channel_finished:
+        result = getattr(handler, method.lower())()
+        if result is not None:
+            await result
+    if not handler.channel_finished:
+        handler.finish()
+
+
+class FsspecChannelHandler(JupyterFsspecWebSocketHandler):
+    """Carry many API requests over one WebSocket.
+
+    A text frame is a JSON request ``{"id", "method", "endpoint", "headers", "body"}``
+    where ``endpoint`` is what would follow ``/jupyter_fsspec/`` in the URL. A binary
+    frame is a 4 byte big-endian header length, that JSON header and the raw body.
+    Each request runs through the regular handler of its endpoint, concurrently with
+    the others up to ``max_concurrent`` at once, and is answered with a frame of the
+    same shape carrying its ``id``, ``status`` and ``headers``. File contents are
+    answered with binary frames. A frame ``{"id", "cancel": true}`` cancels the
+    pending request with that ``id``.
+    """
+
+    # request headers a frame may set, the others come from the WebSocket handshake
+    frame_headers = ("Content-Type", "Range", "X-XSRFToken")
+    handshake_headers = ("Authorization", "Cookie", "Host", "Origin", "User-Agent")
+    response_headers = ("Content-Type", "Content-Range")
+    # endpoints answering with raw bytes rather than JSON
+    binary_endpoints = ("files/contents",)
+    # requests of one socket running at once, the others wait for a slot
+    max_concurrent = 16
+
+    def initialize(self, fs_manager, routes):
+        self.fs_manager = fs_manager
+        self.routes = routes
+        self._tasks = set()
+        self._requests = {}
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+
+    def on_message(self, message):
+        task = asyncio.ensure_future(self._handle_frame(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def on_close(self):
+        for task in self._tasks:
+            task.cancel()
+
+    def _cancel(self, frame_id):
+        task = self._requests.pop(frame_id, None)
+        if task is not None:
+            logger.debug("Cancelling channel request %s", frame_id)
+            task.cancel()
+
+    @staticmethod
+    def _pack(header, body):
+        header_bytes = json.dumps(header).encode("utf-8")
+        return len(header_bytes).to_bytes(4, "big") + header_bytes + body
+
+    @staticmethod
+    def _unpack(message):
+        header_len = int.from_bytes(message[:4], "big")
+        header = json.loads(message[4 : 4 + header_len])
+        return header, message[4 + header_len :]
+
+    def _build_request(self, method, endpoint, frame_headers, body, connection):
+        path, _, query = endpoint.partition("?")
+        uri = url_path_join(self.base_url, "jupyter_fsspec", path.strip("/"))
+        if query:
+            uri = f"{uri}?{query}"
+
+        headers = tornado.httputil.HTTPHeaders()
+        for name in self.handshake_headers:
+            if name in self.request.headers:
+                headers[name] = self.request.headers[name]
+        token = self.get_query_argument("token", None)
+        if token and "Authorization" not in headers:
+            headers["Authorization"] = f"token {token}"
+        for name, value in frame_headers.items():
+            if name.title() in [h.title() for h in self.frame_headers]:
+                headers[name] = value
+
+        return tornado.httputil.HTTPServerRequest(
+            method=method.upper(),
+            uri=uri,
+            version="HTTP/1.1",
+            headers=headers,
+            body=body,
+            connection=connection,
+        )
+
+    async def _dispatch(self, frame, body):
+        endpoint = frame.get("endpoint", "")
+        route = self.routes.get(endpoint.partition("?")[0].strip("/"))
+        if route is None:
+            raise tornado.web.HTTPError(404, f"Unknown endpoint {endpoint}")
+        handler_class, handler_kwargs = route
+
+        connection = _ChannelConnection(self.request.connection.context)
+        request = self._build_request(
+            frame.get("method", "GET"),
+            endpoint,
+            frame.get("headers") or {},
+            body,
+            connection,
+        )
+        handler = _channel_handler_class(handler_class)(
+            self.application, request, **handler_kwargs
+        )
+        await _call_handler(handler)
+        return (
+            handler.get_status(),
+            handler.channel_headers,
+            b"".join(handler.channel_chunks),
+        )
+
+    async def _handle_frame(self, message):
+        frame_id = None
+        try:
+            if isinstance(message, bytes):
+                frame, body = self._unpack(message)
+            else:
+                frame = json.loads(message)
+                body = (frame.get("body") or "").encode("utf-8")
+            frame_id = frame.get("id")
+            if frame.get("cancel"):
+                # The client gave up on this request, nothing is replied
+                self._cancel(frame_id)
+                return
+            self._requests[frame_id] = asyncio.current_task()
+            binary = (
+                frame.get("method", "GET").upper() == "GET"
+                and frame.get("endpoint", "").partition("?")[0].strip("/")
+                in self.binary_endpoints
+            )
+            async with self._slots:
+                status, headers, response_body = await self._dispatch(frame, body)
+            headers = {
+                name: headers[name] for name in self.response_headers if name in headers
+            }
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            binary = False
+            status = e.status_code if isinstance(e, tornado.web.HTTPError) else 400
+            headers = {"Content-Type": "application/json"}
+            response_body = json.dumps(
+                {
+                    "status": "failed",
+                    "description": f"{type(e).__name__}: {e}",
+                    "error_code": type(e).__name__,
+                }
+            ).encode("utf-8")
+        finally:
+            if self._requests.get(frame_id) is asyncio.current_task():
+                del self._requests[frame_id]
+
+        header = {"id": frame_id, "status": status, "headers": headers}
+        try:
+            if binary and status < 400:
+                self.write_message(self._pack(header, response_body), binary=True)
+            else:
+                header["body"] = response_body.decode("utf-8", errors="replace")
+                self.write_message(json.dumps(header))
+        except tornado.websocket.WebSocketClosedError:
+            logger.debug("Channel closed before the reply to frame %s", frame_id)
+
+
 def setup_handlers(web_app):
     host_pattern = ".*$"
 
@@ -628,6 +2099,16 @@ def setup_handlers(web_app):
         base_url, "jupyter_fsspec", "files", "transfer"
     )
     contents = url_path_join(base_url, "jupyter_fsspec", "files", "contents")
+    route_search = url_path_join(base_url, "jupyter_fsspec", "files", "search")
+    route_index = url_path_join(base_url, "jupyter_fsspec", "files", "index")
+    route_du = url_path_join(base_url, "jupyter_fsspec", "files", "du")
+    route_preview = url_path_join(base_url, "jupyter_fsspec", "files", "preview")
+    route_tabular = url_path_join(base_url, "jupyter_fsspec", "files", "tabular")
+    route_channel = url_path_join(base_url, "jupyter_fsspec", "channel")
+    route_batch = url_path_join(base_url, "jupyter_fsspec", "files", "batch")
+    route_info = url_path_join(base_url, "jupyter_fsspec", "files", "info")
+    route_upload = url_path_join(base_url, "jupyter_fsspec", "files", "upload")
+    route_events = url_path_join(base_url, "jupyter_fsspec", "files", "events")
 
     handlers = [
         (route_fsspec_config, FsspecConfigHandler, dict(fs_manager=fs_manager)),
@@ -636,9 +2117,33 @@ def setup_handlers(web_app):
         (route_file_actions, FileActionHandler, dict(fs_manager=fs_manager)),
         (route_fs_file_transfer, FileTransferHandler, dict(fs_manager=fs_manager)),
         (contents, FileContentsHandler, dict(fs_manager=fs_manager)),
+        (route_search, FileSearchHandler, dict(fs_manager=fs_manager)),
+        (route_index, FileIndexHandler, dict(fs_manager=fs_manager)),
+        (route_du, FileDiskUsageHandler, dict(fs_manager=fs_manager)),
+        (route_preview, FilePreviewHandler, dict(fs_manager=fs_manager)),
+        (route_tabular, FileTabularPreviewHandler, dict(fs_manager=fs_manager)),
+        (route_batch, FileBatchReadHandler, dict(fs_manager=fs_manager)),
+        (route_info, FileInfoHandler, dict(fs_manager=fs_manager)),
+        (route_upload, FileUploadHandler, dict(fs_manager=fs_manager)),
     ]
 
+    # Endpoints reachable through the channel, by their path below /jupyter_fsspec/
+    api_root = url_path_join(base_url, "jupyter_fsspec")
+    channel_routes = {
+        route[len(api_root) :].strip("/"): (handler_class, kwargs)
+        for route, handler_class, kwargs in handlers
+    }
+    handlers.append(
+        (
+            route_channel,
+            FsspecChannelHandler,
+            dict(fs_manager=fs_manager, routes=channel_routes),
+        )
+    )
+    handlers.append((route_events, FileEventsHandler, dict(fs_manager=fs_manager)))
+
     web_app.add_handlers(host_pattern, handlers)
+    tornado.ioloop.IOLoop.current().add_callback(fs_manager.start_index_crawls)
 
 
 async def main():
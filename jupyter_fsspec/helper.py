@@ -1,23 +1,33 @@
 # Gives users access to filesystems defined in the jupyter_fsspec config file
 
 
+import asyncio
+import atexit
+import collections
 import copy
 import datetime
-import json
+import functools
 import os
 import re
 import tempfile
 import traceback
+import weakref
 from base64 import standard_b64encode
+from concurrent.futures import ThreadPoolExecutor
 
 from .file_manager import FileSystemManager
 from .exceptions import JupyterFsspecException
+from .tabular import detect_format
 
 
 # Global config manager for kernel-side jupyter-fsspec use
 _manager = None
 _active = None
+_active_name = None
 _user_data = None
+_fs_cache = {}  # Filesystem instances keyed by source name and config hash
+_fs_cache_loops = {}  # Weak references to the event loops of cached async instances
+_user_data_tempfiles = set()  # Upload tempfiles not yet removed
 _EMPTY_RESULT = {
     "ok": False,
     "value": None,
@@ -27,6 +37,10 @@ _EMPTY_RESULT = {
 }
 out = None  # Set below
 _builtin_open = open  # The public API here shadows this name, save it here
+_builtin_bytes = bytes
+
+# Uploads are written in parts of this size, the smallest S3 accepts for a multipart upload
+UPLOAD_CHUNK_SIZE = 5 * 2**20
 
 
 class HelperOutput:
@@ -34,18 +48,32 @@ class HelperOutput:
 
     PREVIEW_LEN = 64
 
-    def __init__(self, data):
+    def __init__(self, data, loader=None):
         # if not (set(data) >= set(_EMPTY_RESULT)):
         #     # Check for all needed keys
         #     raise JupyterFsspecException('Invalid Jupyter FSSpec output!')
 
         self._result = data
+        # Fetches the value on first access, for results made from a preview
+        self._loader = loader
 
     @property
     def value(self):
         """The value of the requested operation"""
+        if self._loader is not None:
+            self._result["value"] = self._loader()
+            self._loader = None
         return self._result["value"]
 
+    @property
+    def preview(self):
+        """The first PREVIEW_LEN bytes of the value, without fetching all of it"""
+        if self._result.get("preview") is not None:
+            return self._result["preview"]
+        if self._loader is None and self._result["value"] is not None:
+            return self._result["value"][: HelperOutput.PREVIEW_LEN]
+        return None
+
     @property
     def ok(self):
         """The status of the request"""
@@ -72,7 +100,11 @@ class HelperOutput:
 
     @property
     def length(self):
-        return -1 if self.value is None else len(self.value)
+        if self._result.get("size") is not None:
+            return self._result["size"]
+        if self._loader is not None or self._result["value"] is None:
+            return -1
+        return len(self._result["value"])
 
     def __repr__(self):
         # Compile time info
@@ -88,10 +120,10 @@ class HelperOutput:
         )
 
         # Compile value info
-        value = self.value
+        preview = self.preview
         value_info = " <None>"
-        if value is not None:
-            value_info = f"\n\n{value[:HelperOutput.PREVIEW_LEN]}"
+        if preview is not None:
+            value_info = f"\n\n{preview}"
 
         newline = "\n"
         string_rep = (
@@ -121,19 +153,60 @@ def _get_manager(cached=True):
     return _manager
 
 
-def _get_fs(fs_name):
+def _get_fs(fs_name, asynchronous=False):
     # Get an fsspec filesystem from the manager
     # The fs_name is url encoded, we handle that here...TODO refactor that
+    # Instances are reused across calls, so connections and credentials stay warm.
+    # The cache key includes a hash of the source's config, a changed source is
+    # constructed again.
     mgr = _get_manager()
-    fs = mgr.construct_named_fs(fs_name)
-    if fs is not None:
-        return fs
-    else:
-        raise JupyterFsspecException("Error, could not find specified filesystem")
+    source_config = next(
+        (
+            source
+            for source in mgr.config.get("sources", [])
+            if source.get("name") == fs_name
+        ),
+        None,
+    )
+    # Async instances are only reused within the event loop they were made for
+    loop = None
+    if asynchronous:
+        _evict_closed_loops()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+    cache_key = (
+        fs_name,
+        asynchronous,
+        None if loop is None else id(loop),
+        FileSystemManager.hash_config(source_config),
+    )
+    fs = _fs_cache.get(cache_key)
+    if fs is None:
+        fs = mgr.construct_named_fs(fs_name, asynchronous=asynchronous)
+        if fs is None:
+            raise JupyterFsspecException("Error, could not find specified filesystem")
+        _fs_cache[cache_key] = fs
+        if loop is not None:
+            _fs_cache_loops[cache_key] = weakref.ref(loop)
+    return fs
+
+
+def _evict_closed_loops():
+    # Each asyncio.run makes a new loop, drop the instances of the closed ones
+    # (their ids may also be reused by a new loop)
+    for cache_key, loop_ref in list(_fs_cache_loops.items()):
+        loop = loop_ref()
+        if loop is None or loop.is_closed():
+            del _fs_cache_loops[cache_key]
+            _fs_cache.pop(cache_key, None)
 
 
 def reload():
-    # Get a new manager/re-read the config file
+    # Get a new manager/re-read the config file, dropping cached filesystems
+    _fs_cache.clear()
+    _fs_cache_loops.clear()
     return _get_manager(False)
 
 
@@ -145,7 +218,31 @@ def fs(fs_name):
 filesystem = fs  # Alias for matching fsspec call
 
 
-def _request_bytes(fs_name, path):
+def _split_source_path(path):
+    # Split a "source name/path in source" path into the source name and the
+    # absolute path on that source's filesystem
+    split_path = [p for p in re.split("/+", path) if p]
+    if not split_path:
+        raise JupyterFsspecException("Invalid path")
+    remainder = []
+    if len(split_path) > 1:
+        remainder = split_path[1:]
+    named_fs_key = split_path[0]
+
+    # Get a non-magic (magic paths start with a fake/virtual named_fs_key component) absolute path
+    fs_info = _get_manager().get_filesystem(named_fs_key)
+    if fs_info is None:
+        raise JupyterFsspecException("Error, could not find specified filesystem")
+    path_components = [fs_info["path"].rstrip("/")]
+    if remainder:
+        path_components.extend(remainder)
+    return named_fs_key, "/".join(path_components)
+
+
+def _request_bytes(fs_name, path, preview=True):
+    # Fetch a file for the frontend, the result is left in `out`. In preview mode
+    # only the first PREVIEW_LEN bytes and the size are read, the full value is
+    # fetched when `out.value` is first accessed.
     global out
 
     # Empty results first
@@ -156,39 +253,25 @@ def _request_bytes(fs_name, path):
     out = HelperOutput(blank)
 
     try:
-        # Get the fs key (the fs name from the config)
-        split_path = [p for p in re.split("/+", path) if p]
-        if not split_path:
-            raise JupyterFsspecException("Invalid path")
-        remainder = []
-        if len(split_path) > 1:
-            remainder = split_path[1:]
-        named_fs_key = split_path[0]
-
-        # Get a non-magic (magic paths start with a fake/virtual named_fs_key component) absolute path
-        fs_info = _get_manager().get_filesystem(named_fs_key)
-        path_components = [fs_info["path"]]
-        if remainder:
-            path_components.extend(remainder)
-        abspath = "/".join(path_components)
-        named_fs = _get_manager().construct_named_fs(named_fs_key)
-        with _builtin_open(
-            "DBG_helper_"
-            + re.sub(r"[^A-Za-z0-9]", "_", datetime.datetime.now().isoformat())
-            + ".txt",
-            "wb",
-        ) as fhandle:
-            out = json.dumps({"path": path, "key": named_fs_key, "abspath": abspath})
-            fhandle.write(f"DEBUG SEND TO HELPER\n{out}".encode("utf8"))
-        out = HelperOutput(
-            {
-                "ok": True,
-                "value": named_fs.open(abspath, mode="rb").read(),
-                "path": path,
-                "timestamp": now,
-                "error": None,
-            }
+        named_fs_key, abspath = _split_source_path(path)
+        named_fs = _get_fs(named_fs_key)
+        result = {
+            "ok": True,
+            "value": None,
+            "path": path,
+            "timestamp": now,
+            "error": None,
+        }
+        if not preview:
+            result["value"] = named_fs.cat_file(abspath)
+            out = HelperOutput(result)
+            return
+
+        result["size"] = named_fs.info(abspath).get("size")
+        result["preview"] = named_fs.cat_file(
+            abspath, start=0, end=HelperOutput.PREVIEW_LEN
         )
+        out = HelperOutput(result, loader=lambda: named_fs.cat_file(abspath))
     except Exception:
         blank["error"] = traceback.format_exc()
         out = HelperOutput(blank)
@@ -201,21 +284,171 @@ def _get_user_data_string():
 
 
 def _get_user_data_tempfile_path():
-    tfile = tempfile.NamedTemporaryFile(delete=False)
-    tfile.write(_user_data)
+    # The server reads the file after this returns, so it can't be deleted here.
+    # Each upload gets its own file, so concurrent uploads don't overwrite each
+    # other. The frontend removes it once the transfer is done, and any left over
+    # are removed when the kernel exits.
+    with tempfile.NamedTemporaryFile(prefix="jfs-user-data-", delete=False) as tfile:
+        tfile.write(_user_data)
+    _user_data_tempfiles.add(tfile.name)
     return tfile.name
 
 
+def _remove_user_data_tempfile(path):
+    # Only files made by _get_user_data_tempfile_path are removed
+    if path not in _user_data_tempfiles:
+        return
+    _user_data_tempfiles.discard(path)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@atexit.register
+def _remove_user_data_tempfiles():
+    for path in list(_user_data_tempfiles):
+        _remove_user_data_tempfile(path)
+
+
 def set_user_data(data):
     global _user_data
     _user_data = data
 
 
+def _as_buffer(obj):
+    # Get a flat byte view of bytes-like objects (memoryview, NumPy arrays...)
+    if isinstance(obj, (_builtin_bytes, bytearray)):
+        return obj
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        raise JupyterFsspecException(
+            f"Cannot upload objects of type {type(obj).__name__}"
+        ) from None
+    try:
+        return view.cast("B") if view.c_contiguous else memoryview(view.tobytes())
+    except (TypeError, ValueError):
+        # Formats that can't be cast to bytes, e.g. NumPy structured arrays
+        return memoryview(view.tobytes())
+
+
+def _is_arrow_table(obj):
+    return type(obj).__module__.split(".")[0] == "pyarrow" and hasattr(obj, "schema")
+
+
+def _write_arrow_table(table, fhandle, path):
+    # Serialize the table in the format matching the target path, Arrow IPC otherwise
+    file_format = detect_format(path)
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, fhandle)
+    elif file_format == "csv":
+        import pyarrow.csv as pcsv
+
+        delimiter = "\t" if path.lower().endswith(".tsv") else ","
+        pcsv.write_csv(table, fhandle, pcsv.WriteOptions(delimiter=delimiter))
+    elif file_format == "jsonl":
+        raise JupyterFsspecException(
+            "Arrow tables can only be uploaded as Parquet, Arrow IPC or CSV files"
+        )
+    else:
+        import pyarrow.ipc as ipc
+
+        with ipc.new_file(fhandle, table.schema) as writer:
+            writer.write(table)
+
+
+def upload(obj, path, chunk_size=UPLOAD_CHUNK_SIZE):
+    # (Public API) Write bytes, a bytes-like object (memoryview, NumPy array...), a
+    # binary file-like object or an Arrow table to a "source name/path in source"
+    # path, returns the number of bytes written.
+    # Data is streamed to the filesystem in chunk_size parts, which object stores
+    # send as the parts of a multipart upload, without a local copy of the file.
+    fs_name, abspath = _split_source_path(path)
+    fs = _get_fs(fs_name)
+
+    if _is_arrow_table(obj):
+        with fs.open(abspath, "wb", block_size=chunk_size) as fhandle:
+            _write_arrow_table(obj, fhandle, abspath)
+            return fhandle.tell()
+
+    if hasattr(obj, "read"):
+        with fs.open(abspath, "wb", block_size=chunk_size) as fhandle:
+            while True:
+                chunk = obj.read(chunk_size)
+                if not chunk:
+                    break
+                if isinstance(chunk, str):
+                    raise JupyterFsspecException(
+                        "File objects must be opened in binary mode to be uploaded"
+                    )
+                fhandle.write(chunk)
+            return fhandle.tell()
+
+    data = _as_buffer(obj)
+    if (
+        getattr(fs, "async_impl", False)
+        and isinstance(data, _builtin_bytes)
+        and len(data) > chunk_size
+    ):
+        # Async backends (e.g. s3fs) upload the parts of a single write concurrently
+        fs.pipe_file(abspath, data)
+        return len(data)
+    with fs.open(abspath, "wb", block_size=chunk_size) as fhandle:
+        for offset in range(0, len(data), chunk_size):
+            fhandle.write(data[offset : offset + chunk_size])
+    return len(data)
+
+
+# pyarrow dataset format names for the formats detected from file extensions
+_DATASET_FORMATS = {"parquet": "parquet", "arrow": "ipc", "csv": "csv", "jsonl": "json"}
+
+
+def read_table(path, columns=None, filters=None, format=None, **kwargs):
+    # (Public API) Read a file or directory of a "source name/path in source" path into
+    # an Arrow table. Only the requested columns, and for Parquet the row groups whose
+    # statistics can match the filters, are read, with ranged reads of the files.
+    # filters is a pyarrow expression or a list of (column, op, value) tuples, as
+    # accepted by pyarrow.parquet. Extra kwargs are passed to pyarrow.dataset.dataset.
+    try:
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+        from pyarrow.fs import FSSpecHandler, PyFileSystem
+    except ImportError:
+        raise JupyterFsspecException(
+            "read_table requires pyarrow, install it with "
+            "`pip install jupyter_fsspec[tabular]`"
+        ) from None
+
+    fs_name, abspath = _split_source_path(path)
+    fs = _get_fs(fs_name)
+
+    if format is None:
+        # Directories are read as Parquet datasets
+        file_format = detect_format(abspath) or "parquet"
+        format = _DATASET_FORMATS[file_format]
+        if abspath.lower().endswith(".tsv"):
+            import pyarrow.csv as pcsv
+
+            format = ds.CsvFileFormat(parse_options=pcsv.ParseOptions(delimiter="\t"))
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+
+    kwargs.setdefault("partitioning", "hive")
+    dataset = ds.dataset(
+        abspath, filesystem=PyFileSystem(FSSpecHandler(fs)), format=format, **kwargs
+    )
+    return dataset.to_table(columns=columns, filter=filters)
+
+
 def work_on(fs_name):
     # Set one of the named filesystems as "active" for use with convenience funcs below
-    global _active
+    global _active, _active_name
     fs = _get_fs(fs_name)
     _active = fs
+    _active_name = fs_name
 
     return fs
 
@@ -273,3 +506,151 @@ def stat(*args, **kwargs):
 
     fs = _get_active()
     return fs.stat(*args, **kwargs)
+
+
+def _reserved_bytes(pending):
+    # Bytes held by reads ahead: the size of finished reads, the expected size of others
+    total = 0
+    for _, future, size in pending:
+        if future.done() and not future.cancelled() and future.exception() is None:
+            total += len(future.result())
+        else:
+            total += size or 0
+    return total
+
+
+def iter_files(paths, prefetch=4, max_bytes=None):
+    # Yield (path, bytes) for each file of a glob pattern or list of paths on the
+    # active filesystem, in order, while up to `prefetch` files are read concurrently
+    # in worker threads, so processing a file overlaps fetching the next ones.
+    # Reads ahead stop while the file being processed and the files read after it
+    # would exceed max_bytes: new reads only start when the consumer asks for the next
+    # file, and are counted with it.
+    # Sizes come from the glob listing; for a list of paths the largest file read so
+    # far is used as the estimate. A file larger than the budget is still read,
+    # without reading others ahead.
+    if not _active:
+        raise JupyterFsspecException("No active filesystem")
+
+    fs = _get_active()
+    if isinstance(paths, str):
+        sizes = {
+            path: info.get("size") or 0
+            for path, info in fs.glob(paths, detail=True).items()
+            if info.get("type") != "directory"
+        }
+        paths = list(sizes)
+    else:
+        paths = list(paths)
+        sizes = {}
+
+    workers = max(prefetch, 1)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = collections.deque()  # (path, future, expected size) in path order
+    next_index = 0
+    largest = None
+    try:
+        while next_index < len(paths) or pending:
+            # pending[0] is the next file yielded, so it is in the budget
+            while next_index < len(paths) and len(pending) < workers:
+                path = paths[next_index]
+                size = sizes.get(path, largest)
+                if (
+                    pending
+                    and max_bytes is not None
+                    and (size is None or _reserved_bytes(pending) + size > max_bytes)
+                ):
+                    break
+                pending.append((path, pool.submit(fs.cat_file, path), size))
+                next_index += 1
+            path, future, _ = pending.popleft()
+            data = future.result()
+            largest = max(largest or 0, len(data))
+            yield path, data
+    finally:
+        # The consumer may stop early, don't start reads it won't use
+        for _, future, _ in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+# Async counterparts of the convenience funcs, for use with top-level await in
+# notebooks, e.g. `await asyncio.gather(*(helper.acat(p) for p in paths))`.
+# They use an async instance of the active filesystem.
+
+
+def _get_active_async():
+    # Gets an async instance of the "active" filesystem for the running event loop
+    if not _active_name:
+        raise JupyterFsspecException("No active filesystem")
+
+    return _get_fs(_active_name, asynchronous=True)
+
+
+async def _in_thread(func, *args, **kwargs):
+    # Run a blocking call in the default executor (asyncio.to_thread needs Python 3.9)
+    return await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(func, *args, **kwargs)
+    )
+
+
+class _ThreadedAsyncFile:
+    # Async interface to a file of a backend without async files, the blocking
+    # calls run in a worker thread
+
+    def __init__(self, fhandle):
+        self._file = fhandle
+
+    async def read(self, length=-1):
+        return await _in_thread(self._file.read, length)
+
+    async def write(self, data):
+        return await _in_thread(self._file.write, data)
+
+    def seek(self, loc, whence=0):
+        return self._file.seek(loc, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    async def close(self):
+        await _in_thread(self._file.close)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+async def acat(*args, **kwargs):
+    # Get bytes from the specified path(s), a list of paths returns a dict
+    fs = _get_active_async()
+    return await fs._cat(*args, **kwargs)
+
+
+async def als(*args, **kwargs):
+    # Async counterpart of ls
+    fs = _get_active_async()
+    return await fs._ls(*args, **kwargs)
+
+
+async def ainfo(*args, **kwargs):
+    # Async counterpart of stat
+    fs = _get_active_async()
+    return await fs._info(*args, **kwargs)
+
+
+async def aopen(path, mode="rb", **kwargs):
+    # Get an async file handle (binary modes only), use as
+    # `async with await helper.aopen(path) as f: data = await f.read()`
+    fs = _get_active_async()
+    try:
+        return await fs.open_async(path, mode, **kwargs)
+    except NotImplementedError:
+        fhandle = await _in_thread(_get_active().open, path, mode, **kwargs)
+        return _ThreadedAsyncFile(fhandle)
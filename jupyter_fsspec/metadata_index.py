@@ -0,0 +1,264 @@
+"""Persistent SQLite metadata index for a filesystem source"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import info_mtime
+
+
+logger = logging.getLogger(__name__)
+
+SORT_COLUMNS = {"name": "path", "size": "size", "mtime": "mtime", "type": "type"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    size INTEGER,
+    mtime REAL,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+CREATE INDEX IF NOT EXISTS entries_name ON entries (name);
+CREATE INDEX IF NOT EXISTS entries_size ON entries (size);
+CREATE INDEX IF NOT EXISTS entries_mtime ON entries (mtime);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class MetadataIndex:
+    """Name, size, mtime and type of every path in a source, kept in SQLite.
+
+    Paths are stored relative to the source root. The index is filled by a
+    background crawl of the whole source and kept current by the mutating
+    handlers writing through their changes.
+
+    All database work runs on a dedicated thread, one statement batch at a
+    time, so large crawls and queries do not block the event loop.
+    """
+
+    def __init__(self, db_path, refresh_interval=None):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        # The single worker serializes access, the connection is only
+        # created here and closed from that worker
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="metadata-index"
+        )
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._generation = self._get_meta("generation") or 0
+        self._indexed_at = self._get_meta("indexed_at")
+        self._crawl_task = None
+
+    def close(self):
+        if self._crawl_task is not None:
+            self._crawl_task.cancel()
+        # Queued work finishes before the connection is closed
+        self._executor.submit(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    def _get_meta(self, key):
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    @property
+    def indexed_at(self):
+        """Start time of the last completed crawl, None if never crawled."""
+        return self._indexed_at
+
+    @property
+    def crawling(self):
+        return self._crawl_task is not None and not self._crawl_task.done()
+
+    def is_stale(self):
+        indexed_at = self.indexed_at
+        if indexed_at is None:
+            return True
+        if self.refresh_interval is None:
+            return False
+        return time.time() - indexed_at > self.refresh_interval
+
+    async def upsert(self, entries):
+        """Insert or update ``(relative_path, info)`` pairs."""
+        return await self._run(self._upsert, entries)
+
+    def _upsert(self, entries):
+        rows = []
+        for path, info in entries:
+            path = path.strip("/")
+            if not path:
+                continue
+            parent, _, name = path.rpartition("/")
+            rows.append(
+                (
+                    path,
+                    parent,
+                    name,
+                    info.get("type"),
+                    info.get("size"),
+                    info_mtime(info),
+                    self._generation,
+                )
+            )
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries "
+                "(path, parent, name, type, size, mtime, generation) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    async def remove(self, path):
+        """Remove a path and everything below it."""
+        await self._run(self._remove, path)
+
+    def _remove(self, path):
+        path = path.strip("/")
+        with self._conn:
+            if not path:
+                self._conn.execute("DELETE FROM entries")
+                return
+            self._conn.execute(
+                "DELETE FROM entries WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                (path, _like_escape(path) + "/%"),
+            )
+
+    async def replace(self, path, entries, recursive=False):
+        """Replace the indexed children (or whole subtree) of ``path``."""
+        return await self._run(self._replace, path, entries, recursive)
+
+    def _replace(self, path, entries, recursive):
+        path = path.strip("/")
+        with self._conn:
+            if recursive:
+                if path:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE path LIKE ? ESCAPE '\\'",
+                        (_like_escape(path) + "/%",),
+                    )
+                else:
+                    self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE parent = ?", (path,))
+        return self._upsert(entries)
+
+    async def query(
+        self,
+        path="",
+        pattern=None,
+        sort="name",
+        descending=False,
+        recursive=False,
+        limit=None,
+    ):
+        """Return indexed entries below ``path`` as info dicts.
+
+        ``pattern`` is a case-sensitive glob matched against entry names.
+        """
+        return await self._run(
+            self._query, path, pattern, sort, descending, recursive, limit
+        )
+
+    def _query(self, path, pattern, sort, descending, recursive, limit):
+        path = path.strip("/")
+        clauses = []
+        params = []
+        if recursive:
+            if path:
+                clauses.append("path LIKE ? ESCAPE '\\'")
+                params.append(_like_escape(path) + "/%")
+        else:
+            clauses.append("parent = ?")
+            params.append(path)
+        if pattern:
+            clauses.append("name GLOB ?")
+            params.append(pattern)
+
+        sql = "SELECT path, type, size, mtime FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {SORT_COLUMNS[sort]} {'DESC' if descending else 'ASC'}"
+        if sort != "name":
+            sql += ", path ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return [
+            {"name": row[0], "type": row[1], "size": row[2], "mtime": row[3]}
+            for row in self._conn.execute(sql, params)
+        ]
+
+    async def crawl(self, fs_instance, root, to_relative):
+        """Walk the whole source and rebuild the index from the listing."""
+        started = time.time()
+        self._generation += 1
+        generation = self._generation
+        count = 0
+        logger.info("Crawling %s into metadata index %s", root, self.db_path)
+        async for _, dirs, files in fs_instance._walk(root, detail=True):
+            count += await self.upsert(
+                [
+                    (to_relative(info["name"]), info)
+                    for info in (*dirs.values(), *files.values())
+                ]
+            )
+
+        await self._run(self._finish_crawl, generation, started)
+        self._indexed_at = started
+        logger.info("Indexed %d entries from %s", count, root)
+        return count
+
+    def _finish_crawl(self, generation, started):
+        with self._conn:
+            # Anything not seen by this crawl (and not written through since) is gone
+            self._conn.execute(
+                "DELETE FROM entries WHERE generation < ?", (generation,)
+            )
+            self._set_meta("generation", generation)
+            self._set_meta("indexed_at", started)
+
+    def start_crawl(self, fs_instance, root, to_relative):
+        """Start a background crawl unless one is already running."""
+        if not self.crawling:
+            self._crawl_task = asyncio.ensure_future(
+                self.crawl(fs_instance, root, to_relative)
+            )
+            self._crawl_task.add_done_callback(self._crawl_done)
+        return self._crawl_task
+
+    def _crawl_done(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Metadata index crawl failed for %s: %s",
+                self.db_path,
+                task.exception(),
+            )
@@ -3,6 +3,87 @@ from typing import Optional, Dict, List, Literal, Union
 from enum import Enum
 
 
+class IndexConfig(BaseModel):
+    """Persistent SQLite metadata index for a source"""
+
+    path: Optional[str] = Field(
+        default=None,
+        title="Index directory",
+        description="Directory for the index database, defaults to the Jupyter data directory",
+    )
+    refresh_interval: Optional[float] = Field(
+        default=3600,
+        title="Refresh interval",
+        description="Seconds after which the source is crawled again, never if null",
+    )
+
+
+class CacheMode(str, Enum):
+    blockcache = "blockcache"
+    filecache = "filecache"
+
+
+class CacheConfig(BaseModel):
+    """Local disk cache layered over a source"""
+
+    mode: CacheMode = Field(
+        default=CacheMode.blockcache,
+        title="Cache mode",
+        description="'blockcache' stores the blocks that are read, 'filecache' whole files",
+    )
+    directory: Optional[str] = Field(
+        default=None,
+        title="Cache directory",
+        description="Directory for cached data, defaults to the Jupyter data directory",
+    )
+    max_bytes: Optional[int] = Field(
+        default=None,
+        gt=0,
+        title="Maximum cache size",
+        description="Bytes above which least recently used files are evicted, unbounded if null",
+    )
+    expiry: Optional[float] = Field(
+        default=604800,
+        title="Expiry",
+        description="Seconds after which a cached file is downloaded again, never if null",
+    )
+
+
+class RetryConfig(BaseModel):
+    """Retries of transient backend errors and the circuit breaker of a source"""
+
+    attempts: int = Field(
+        default=3,
+        ge=1,
+        title="Attempts",
+        description="Attempts of idempotent operations such as ls, info and reads, 1 disables retries",
+    )
+    backoff: float = Field(
+        default=0.2,
+        ge=0,
+        title="Backoff",
+        description="Seconds of the first retry delay, doubled for each retry and jittered",
+    )
+    max_backoff: float = Field(
+        default=5,
+        ge=0,
+        title="Maximum backoff",
+        description="Upper bound in seconds of a retry delay",
+    )
+    failure_threshold: int = Field(
+        default=5,
+        ge=1,
+        title="Failure threshold",
+        description="Consecutive failed operations after which the source fails fast",
+    )
+    reset_timeout: float = Field(
+        default=30,
+        gt=0,
+        title="Reset timeout",
+        description="Seconds of failing fast before the source is probed again",
+    )
+
+
 class Source(BaseModel):
     """Filesystem configurations passed to fsspec"""
 
@@ -11,6 +92,9 @@ class Source(BaseModel):
     protocol: Optional[str] = None
     args: Optional[List] = []
     kwargs: Optional[Dict] = {}
+    index: Optional[IndexConfig] = None
+    cache: Optional[CacheConfig] = None
+    retry: RetryConfig = RetryConfig()
 
 
 class Config(BaseModel):
@@ -22,6 +106,7 @@ class Config(BaseModel):
 class RequestType(str, Enum):
     default = "default"
     range = "range"
+    find = "find"
 
 
 class RequestAction(str, Enum):
@@ -49,18 +134,105 @@ class GetRequest(BaseRequest):
     GET request specific items.
 
     type: option to specify type of GET request
+    maxdepth: levels of a recursive 'find' listing, unlimited by default
+    since: version token of an earlier listing of the same directory
     """
 
     type: Optional[RequestType] = Field(
         default=RequestType.default,
         title="Type of GET request",
-        description="Either a 'range' GET request for file or 'default' for normal GET",
+        description="Either a 'range' GET request for file, 'find' for a recursive listing or 'default' for normal GET",
+    )
+    maxdepth: Optional[int] = Field(
+        default=None,
+        gt=0,
+        title="Find depth",
+        description="Number of directory levels below item_path listed by a 'find' request",
     )
     refresh: Optional[bool] = Field(
         default=False,
         title="Refresh filesystem listing",
         description="Whether to refresh the filesystem contents",
     )
+    since: Optional[str] = Field(
+        default=None,
+        title="Listing version",
+        description="Version token of an earlier listing, to only return the entries changed since",
+    )
+
+
+class PreviewRequest(BaseRequest):
+    """
+    Preview request specific items.
+
+    max_bytes: number of leading bytes to read, capped by the server
+    """
+
+    max_bytes: Optional[int] = Field(
+        default=None,
+        gt=0,
+        title="Preview size",
+        description="Number of leading bytes of the file to read, capped by the server",
+    )
+
+
+class TabularFormat(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+class TabularPreviewRequest(BaseRequest):
+    """
+    Tabular preview request specific items.
+
+    rows: number of sample rows to return, capped by the server
+    columns: comma separated column names to include in the sample
+    format: file format, detected from the file extension when omitted
+    """
+
+    rows: int = Field(
+        default=10,
+        ge=0,
+        title="Sample rows",
+        description="Number of rows to sample from the start of the file",
+    )
+    columns: Optional[str] = Field(
+        default=None,
+        title="Columns",
+        description="Comma separated column names to include in the sample",
+    )
+    format: Optional[TabularFormat] = Field(
+        default=None,
+        title="File format",
+        description="Format of the file, detected from the file extension when omitted",
+    )
+
+    @property
+    def column_list(self):
+        if not self.columns:
+            return None
+        return [name.strip() for name in self.columns.split(",") if name.strip()]
+
+
+class WatchAction(str, Enum):
+    watch = "watch"
+    unwatch = "unwatch"
+
+
+class WatchRequest(BaseRequest):
+    """
+    Change notification subscription items.
+
+    action: start or stop watching the directory at item_path
+    """
+
+    action: WatchAction = Field(
+        ...,
+        title="Watch action",
+        description="Either 'watch' to receive changes of the directory or 'unwatch' to stop",
+    )
 
 
 class PostRequest(BaseRequest):
@@ -88,14 +260,204 @@ class PostRequest(BaseRequest):
     )
 
 
+class UploadRequest(BaseRequest):
+    """
+    Chunked upload items.
+
+    upload_id: upload to write to, none when starting an upload
+    offset: byte offset in the file of the chunk in the request body
+    """
+
+    upload_id: Optional[str] = Field(
+        default=None,
+        title="Upload id",
+        description="Id returned when the upload was started",
+    )
+    offset: int = Field(
+        default=0,
+        ge=0,
+        title="Chunk offset",
+        description="Byte offset in the file at which the chunk starts",
+    )
+
+
+class ReadRequest(BaseRequest):
+    """
+    One read of a batch.
+
+    start: first byte to read, negative counting from the end of the file
+    end: byte after the last one to read, the end of the file by default
+    """
+
+    start: Optional[int] = Field(
+        default=None, title="Start", description="Offset of the first byte to read"
+    )
+    end: Optional[int] = Field(
+        default=None, title="End", description="Offset after the last byte to read"
+    )
+
+
+class BatchReadRequest(BaseModel):
+    """Reads of whole files or byte ranges, of any sources, sent together"""
+
+    reads: List[ReadRequest] = Field(
+        ..., title="Reads", description="Reads whose results are returned in order"
+    )
+
+
 class DeleteRequest(BaseRequest):
     """
-    Placeholder model for delete request
+    DELETE request specific items.
+
+    recursive: also delete the contents of a directory
+    """
+
+    recursive: Optional[bool] = Field(
+        default=False,
+        title="Recursive delete",
+        description="Whether to delete a directory with everything below it",
+    )
+
+
+class SearchType(str, Enum):
+    glob = "glob"
+    regex = "regex"
+
+
+class SearchRequest(BaseModel):
+    """
+    Search a filesystem for paths matching a pattern.
+
+    key: unique
+    pattern: glob or regex matched against paths relative to the filesystem root
+    type: whether the pattern is a glob or a regex
+    limit: optional maximum number of matches returned
+    """
+
+    key: str = Field(
+        ...,
+        title="Filesystem name",
+        description="Unique identifier given as the filesystem 'name' in the config file",
+    )
+    pattern: str = Field(
+        ...,
+        title="Search pattern",
+        description="Pattern matched against paths relative to the filesystem root",
+    )
+    type: Optional[SearchType] = Field(
+        default=SearchType.glob,
+        title="Pattern type",
+        description="Either 'glob' (default) or 'regex'",
+    )
+    limit: Optional[int] = Field(
+        default=None,
+        gt=0,
+        title="Result limit",
+        description="Maximum number of matches to return, unlimited by default",
+    )
+
+
+class IndexSort(str, Enum):
+    name = "name"
+    size = "size"
+    mtime = "mtime"
+    type = "type"
+
+
+class IndexRequest(BaseModel):
+    """
+    Query the metadata index of a filesystem.
 
-    No additional information is needed than base request
+    key: unique
+    item_path: directory to query, defaults to the filesystem root
+    pattern: optional glob matched against entry names
+    sort: column to sort by
+    descending: reverse the sort order
+    recursive: include everything below item_path instead of direct children
+    limit: optional maximum number of entries returned
+    refresh: list the live backend and update the index before answering
     """
 
-    pass
+    key: str = Field(
+        ...,
+        title="Filesystem name",
+        description="Unique identifier given as the filesystem 'name' in the config file",
+    )
+    item_path: str = Field(
+        default="", title="Path", description="Directory to query in filesystem"
+    )
+    pattern: Optional[str] = Field(
+        default=None,
+        title="Name pattern",
+        description="Case-sensitive glob matched against entry names",
+    )
+    sort: Optional[IndexSort] = Field(
+        default=IndexSort.name,
+        title="Sort column",
+        description="One of 'name', 'size', 'mtime' or 'type'",
+    )
+    descending: Optional[bool] = Field(default=False, title="Sort descending")
+    recursive: Optional[bool] = Field(
+        default=False,
+        title="Recursive query",
+        description="Include all entries below item_path, not only direct children",
+    )
+    limit: Optional[int] = Field(
+        default=None, gt=0, title="Result limit", description="Maximum entries"
+    )
+    refresh: Optional[bool] = Field(
+        default=False,
+        title="Refresh from backend",
+        description="List the live backend and update the index before answering",
+    )
+
+
+class InfoRequest(BaseModel):
+    """
+    File information of one or more paths.
+
+    key: unique
+    item_path: path to describe
+    paths: paths to describe together, in place of item_path
+    """
+
+    key: str = Field(
+        ...,
+        title="Filesystem name",
+        description="Unique identifier given as the filesystem 'name' in the config file",
+    )
+    item_path: Optional[str] = Field(
+        default=None, title="Path", description="Path to describe in filesystem"
+    )
+    paths: Optional[List[str]] = Field(
+        default=None,
+        title="Paths",
+        description="Paths to describe in one request, each looked up concurrently",
+    )
+
+
+class DiskUsageRequest(BaseModel):
+    """
+    Compute the total size of a directory.
+
+    key: unique
+    item_path: directory to measure, defaults to the filesystem root
+    refresh: ignore cached directory subtotals
+    """
+
+    key: str = Field(
+        ...,
+        title="Filesystem name",
+        description="Unique identifier given as the filesystem 'name' in the config file",
+    )
+    item_path: str = Field(
+        default="", title="Path", description="Directory to measure in filesystem"
+    )
+    refresh: Optional[bool] = Field(
+        default=False,
+        title="Refresh subtotals",
+        description="Ignore cached directory subtotals and walk the backend again",
+    )
 
 
 class Direction(str, Enum):
@@ -0,0 +1,111 @@
+"""Content sniffing and bounded previews of file contents"""
+
+import codecs
+import mimetypes
+
+
+# (offset, signature, mime type) of common binary formats
+_MAGIC_SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"PAR1", "application/vnd.apache.parquet"),
+    (0, b"ARROW1", "application/vnd.apache.arrow.file"),
+    (0, b"PK\x03\x04", "application/zip"),
+    (0, b"\x1f\x8b", "application/gzip"),
+    (0, b"BZh", "application/x-bzip2"),
+    (0, b"\xfd7zXZ\x00", "application/x-xz"),
+    (0, b"\x28\xb5\x2f\xfd", "application/zstd"),
+    (0, b"\x89HDF\r\n\x1a\n", "application/x-hdf5"),
+    (0, b"SQLite format 3\x00", "application/vnd.sqlite3"),
+    (0, b"\x7fELF", "application/x-executable"),
+    (8, b"WEBP", "image/webp"),
+]
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+_TEXTUAL_SUFFIXES = ("json", "xml", "yaml", "javascript", "csv", "sql", "x-sh")
+
+HEX_PREVIEW_LEN = 256
+
+
+def _is_textual(mime_type):
+    return mime_type.startswith("text/") or mime_type.endswith(_TEXTUAL_SUFFIXES)
+
+
+def sniff_encoding(data, partial=False):
+    """Return the text encoding of ``data``, or None if it does not look like text.
+
+    ``partial`` indicates ``data`` is the head of a longer file, so it may end
+    in the middle of a multi-byte character.
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    if b"\x00" in data:
+        return None
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(data, final=not partial)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    # Mostly printable bytes without NULs: assume a single-byte encoding
+    control = sum(1 for byte in data if byte < 32 and byte not in b"\t\n\r\f\b")
+    if data and control / len(data) > 0.05:
+        return None
+    return "latin-1"
+
+
+def sniff_mime_type(data, path, encoding=None):
+    """Guess the MIME type from the leading bytes, falling back to the file extension."""
+    for offset, signature, mime_type in _MAGIC_SIGNATURES:
+        if data[offset : offset + len(signature)] == signature:
+            return mime_type
+    guessed, _ = mimetypes.guess_type(path)
+    if guessed:
+        return guessed
+    return "text/plain" if encoding else "application/octet-stream"
+
+
+def decode_text(data, encoding, truncated):
+    """Decode ``data``, dropping a trailing partial character of a truncated read."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    return decoder.decode(data, final=not truncated)
+
+
+def hexdump(data, width=16):
+    """Format bytes as ``offset  hex bytes  |ascii|`` lines."""
+    lines = []
+    for offset in range(0, len(data), width):
+        chunk = data[offset : offset + width]
+        hex_bytes = " ".join(f"{byte:02x}" for byte in chunk)
+        text = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+        lines.append(f"{offset:08x}  {hex_bytes:<{width * 3 - 1}}  |{text}|")
+    return "\n".join(lines)
+
+
+def build_preview(data, path, size):
+    """Describe the leading bytes of a file of ``size`` bytes at ``path``."""
+    truncated = size is None or size > len(data)
+    encoding = sniff_encoding(data, partial=truncated)
+    preview = {
+        "mime_type": sniff_mime_type(data, path, encoding),
+        "encoding": encoding,
+        "size": size,
+        "preview_bytes": len(data),
+        "truncated": truncated,
+    }
+    if encoding and _is_textual(preview["mime_type"]):
+        preview["text"] = decode_text(data, encoding, truncated)
+    else:
+        preview["encoding"] = None
+        preview["hex"] = hexdump(data[:HEX_PREVIEW_LEN])
+    return preview
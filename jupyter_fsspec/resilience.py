@@ -0,0 +1,196 @@
+"""Retries of transient backend failures and per-source circuit breakers"""
+
+import asyncio
+import errno
+import functools
+import inspect
+import logging
+import random
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Operations that can be repeated without changing the backend
+IDEMPOTENT_METHODS = frozenset(
+    {
+        "_cat",
+        "_cat_file",
+        "_cat_ranges",
+        "_du",
+        "_exists",
+        "_expand_path",
+        "_find",
+        "_get_file",
+        "_glob",
+        "_info",
+        "_isdir",
+        "_isfile",
+        "_ls",
+        "_size",
+    }
+)
+
+TRANSIENT_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+TRANSIENT_ERRNO = frozenset(
+    {
+        errno.EAGAIN,
+        errno.EBUSY,
+        errno.ECONNABORTED,
+        errno.ECONNREFUSED,
+        errno.ECONNRESET,
+        errno.EPIPE,
+        errno.ETIMEDOUT,
+    }
+)
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a backend that keeps failing."""
+
+
+def is_transient(error):
+    """Whether ``error`` looks like a failure that may go away when retried."""
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return not isinstance(error, CircuitOpenError)
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    if status in TRANSIENT_STATUS:
+        return True
+    if isinstance(error, OSError) and error.errno in TRANSIENT_ERRNO:
+        return True
+    # Client libraries (aiohttp, botocore, ...) name their connection errors alike
+    return any(
+        name in type(error).__name__
+        for name in ("ConnectionError", "Disconnected", "Timeout")
+    )
+
+
+class CircuitBreaker:
+    """Fails calls fast once a backend failed ``failure_threshold`` calls in a row.
+
+    After ``reset_timeout`` seconds a single probe call is let through: its success
+    closes the circuit again, its failure keeps it open for another timeout.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probe = None  # token of the call probing a half-open circuit
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if (
+            self._probe is not None
+            or time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """Check that a call may go through.
+
+        Returns a token when the call is the probe of a half-open circuit, None
+        otherwise. The token is passed back to ``release`` and ``record_failure``.
+        """
+        if self.opened_at is None:
+            return None
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0 or self._probe is not None:
+            raise CircuitOpenError(
+                f"Source '{self.name}' is unavailable after {self.failures} "
+                f"consecutive failures, retrying in {max(remaining, 0):.0f}s"
+            )
+        self._probe = object()
+        return self._probe
+
+    def release(self, probe):
+        """Let another call probe the backend, when probe ``probe`` was abandoned."""
+        if probe is not None and probe is self._probe:
+            self._probe = None
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Source '{self.name}' recovered, closing its circuit")
+        self.failures = 0
+        self.opened_at = None
+        self._probe = None
+
+    def record_failure(self, probe=None):
+        self.failures += 1
+        # A call started before the circuit opened does not end the probe
+        self.release(probe)
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"Source '{self.name}' failed {self.failures} times in a row, "
+                    "opening its circuit"
+                )
+            self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures}
+
+
+class ResilientFileSystem:
+    """Async filesystem proxy applying a source's retry policy and circuit breaker.
+
+    Idempotent operations are retried on transient errors with exponential
+    backoff and full jitter. Every async operation goes through the circuit
+    breaker. Anything else is forwarded to the wrapped filesystem unchanged.
+    """
+
+    def __init__(self, fs, retry_config, breaker):
+        self.fs = fs
+        self.retry_config = retry_config
+        self.breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self.fs, name)
+        if not name.startswith("_") or not inspect.iscoroutinefunction(attr):
+            return attr
+        wrapped = self._wrap(attr, retry=name in IDEMPOTENT_METHODS)
+        # Later lookups find the wrapper without going through __getattr__
+        self.__dict__[name] = wrapped
+        return wrapped
+
+    def _backoff(self, attempt):
+        config = self.retry_config
+        return random.uniform(0, min(config.max_backoff, config.backoff * 2**attempt))
+
+    def _wrap(self, method, retry):
+        attempts = self.retry_config.attempts if retry else 1
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            probe = self.breaker.before_call()
+            try:
+                for attempt in range(attempts):
+                    try:
+                        result = await method(*args, **kwargs)
+                    except Exception as e:
+                        if not is_transient(e):
+                            # The backend answered, e.g. with a missing file
+                            self.breaker.record_success()
+                            raise
+                        if attempt + 1 == attempts:
+                            self.breaker.record_failure(probe)
+                            raise
+                        delay = self._backoff(attempt)
+                        logger.debug(
+                            f"Retrying {method.__name__} in {delay:.2f}s after: {e}"
+                        )
+                        await asyncio.sleep(delay)
+                    else:
+                        self.breaker.record_success()
+                        return result
+            except asyncio.CancelledError:
+                # An abandoned probe must not keep the circuit half-open
+                self.breaker.release(probe)
+                raise
+
+        return call
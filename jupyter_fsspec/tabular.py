@@ -0,0 +1,305 @@
+"""Schema and row-sample previews of tabular files (Parquet, Arrow, CSV, JSONL)"""
+
+import asyncio
+import base64
+import csv
+import datetime
+import decimal
+import io
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".parq": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Row groups whose statistics are returned for Parquet files
+MAX_ROW_GROUP_STATS = 10
+
+
+def detect_format(path):
+    for extension, file_format in FORMAT_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return file_format
+    return None
+
+
+def json_safe(value):
+    """Convert values produced by pyarrow or the parsers into JSON serializable ones."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    return str(value)
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable read-only file that fetches byte ranges from a source on demand.
+
+    It is meant to be read from a worker thread: every read runs ``_cat_file``
+    for exactly the requested range on the server event loop, so a reader such
+    as pyarrow only transfers the footer and the pages it actually decodes.
+    """
+
+    def __init__(self, fs_instance, path, size, loop):
+        super().__init__()
+        self.fs_instance = fs_instance
+        self.path = path
+        self.size = size
+        self.loop = loop
+        self.position = 0
+        self.bytes_read = 0
+        self.requests = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self.position = position
+        return self.position
+
+    def _fetch(self, start, end):
+        self.requests += 1
+        if not self.fs_instance.async_impl:
+            return self.fs_instance.cat_file(self.path, start, end)
+        future = asyncio.run_coroutine_threadsafe(
+            self.fs_instance._cat_file(self.path, start, end), self.loop
+        )
+        return future.result()
+
+    def read(self, size=-1):
+        end = self.size if size is None or size < 0 else self.position + size
+        end = min(end, self.size)
+        if end <= self.position:
+            return b""
+        data = self._fetch(self.position, end)
+        self.position += len(data)
+        self.bytes_read += len(data)
+        return data
+
+    def readall(self):
+        return self.read(-1)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _arrow_schema(schema):
+    return [
+        {"name": field.name, "type": str(field.type), "nullable": field.nullable}
+        for field in schema
+    ]
+
+
+def _statistics(column):
+    stats = column.statistics
+    result = {
+        "name": column.path_in_schema,
+        "compressed_size": column.total_compressed_size,
+        "uncompressed_size": column.total_uncompressed_size,
+    }
+    if stats is not None:
+        result["null_count"] = stats.null_count if stats.has_null_count else None
+        if stats.has_min_max:
+            result["min"] = json_safe(stats.min)
+            result["max"] = json_safe(stats.max)
+    return result
+
+
+def read_parquet_preview(reader, rows, columns=None):
+    """Schema, row group statistics and the first rows of the first row group."""
+    import pyarrow.parquet as pq
+
+    # A small buffer keeps pyarrow from reading whole column chunks up front
+    parquet_file = pq.ParquetFile(reader, buffer_size=64 * 1024, pre_buffer=False)
+    metadata = parquet_file.metadata
+
+    row_groups = []
+    for i in range(min(metadata.num_row_groups, MAX_ROW_GROUP_STATS)):
+        row_group = metadata.row_group(i)
+        row_groups.append(
+            {
+                "index": i,
+                "num_rows": row_group.num_rows,
+                "total_byte_size": row_group.total_byte_size,
+                "columns": [
+                    _statistics(row_group.column(j))
+                    for j in range(row_group.num_columns)
+                ],
+            }
+        )
+
+    sample = []
+    if metadata.num_row_groups and rows:
+        batches = parquet_file.iter_batches(
+            batch_size=rows, row_groups=[0], columns=columns
+        )
+        batch = next(batches, None)
+        if batch is not None:
+            sample = batch.slice(0, rows).to_pylist()
+
+    return {
+        "schema": _arrow_schema(parquet_file.schema_arrow),
+        "num_rows": metadata.num_rows,
+        "num_columns": metadata.num_columns,
+        "num_row_groups": metadata.num_row_groups,
+        "created_by": metadata.created_by,
+        "row_groups": row_groups,
+        "rows": json_safe(sample),
+    }
+
+
+def read_arrow_preview(reader, rows, columns=None):
+    """Schema and the first rows of the first record batch of an Arrow IPC file."""
+    import pyarrow.ipc as ipc
+
+    ipc_file = ipc.open_file(reader)
+    sample = []
+    if ipc_file.num_record_batches and rows:
+        batch = ipc_file.get_batch(0).slice(0, rows)
+        if columns:
+            batch = batch.select(columns)
+        sample = batch.to_pylist()
+    return {
+        "schema": _arrow_schema(ipc_file.schema),
+        "num_record_batches": ipc_file.num_record_batches,
+        "rows": json_safe(sample),
+    }
+
+
+def _complete_lines(data, truncated):
+    text = data.decode("utf-8", errors="replace")
+    lines = text.splitlines()
+    if truncated and lines and not text.endswith(("\n", "\r")):
+        # The last line was cut off by the partial read
+        lines.pop()
+    return lines
+
+
+def _infer_type(values):
+    present = [v for v in values if v not in ("", None)]
+    if not present:
+        return "null"
+    for name, parse in (("int64", int), ("double", float)):
+        try:
+            for value in present:
+                parse(value)
+            return name
+        except ValueError:
+            continue
+    if all(v.lower() in ("true", "false") for v in present):
+        return "bool"
+    return "string"
+
+
+def read_csv_preview(data, truncated, rows, delimiter=",", columns=None):
+    """Header, inferred column types and the first rows from the head of a CSV file."""
+    lines = _complete_lines(data, truncated)
+    records = list(csv.reader(lines, delimiter=delimiter))
+    if not records:
+        return {"schema": [], "rows": []}
+    header, body = records[0], records[1:]
+    names = [name for name in header if not columns or name in columns]
+    values = [dict(zip(header, record)) for record in body]
+    return {
+        "schema": [
+            {"name": name, "type": _infer_type([v.get(name) for v in values])}
+            for name in names
+        ],
+        "rows": [{name: v.get(name) for name in names} for v in values[:rows]],
+    }
+
+
+def read_jsonl_preview(data, truncated, rows, columns=None):
+    """Union of keys with value types and the first records from the head of a JSONL file."""
+    records = [
+        json.loads(line) for line in _complete_lines(data, truncated) if line.strip()
+    ]
+    schema = {}
+    for record in records:
+        for name, value in record.items():
+            if columns and name not in columns:
+                continue
+            if schema.get(name) in (None, "null"):
+                schema[name] = "null" if value is None else type(value).__name__
+    sample = records[:rows]
+    if columns:
+        sample = [{k: v for k, v in r.items() if k in columns} for r in sample]
+    return {
+        "schema": [{"name": name, "type": kind} for name, kind in schema.items()],
+        "rows": sample,
+    }
+
+
+async def tabular_preview(
+    fs_instance, path, size, file_format, rows, columns=None, head_bytes=64 * 1024
+):
+    """Build a preview of a tabular file reading as few bytes as possible."""
+    if file_format in ("parquet", "arrow"):
+        reader = RangeReader(fs_instance, path, size, asyncio.get_running_loop())
+        read = read_parquet_preview if file_format == "parquet" else read_arrow_preview
+        # pyarrow blocks on each range read, keep it off the event loop
+        preview = await asyncio.get_running_loop().run_in_executor(
+            None, read, reader, rows, columns
+        )
+        preview["bytes_read"] = reader.bytes_read
+        preview["range_requests"] = reader.requests
+    else:
+        end = min(size, head_bytes) if size is not None else head_bytes
+        data = (
+            await fs_instance._cat_file(path, 0, end)
+            if fs_instance.async_impl
+            else fs_instance.cat_file(path, 0, end)
+        )
+        truncated = size is None or size > len(data)
+        if file_format == "csv":
+            delimiter = "\t" if path.lower().endswith(".tsv") else ","
+            preview = read_csv_preview(data, truncated, rows, delimiter, columns)
+        else:
+            preview = read_jsonl_preview(data, truncated, rows, columns)
+        preview["bytes_read"] = len(data)
+        preview["truncated"] = truncated
+
+    preview["format"] = file_format
+    preview["size"] = size
+    return preview
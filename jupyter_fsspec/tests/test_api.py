@@ -1,6 +1,17 @@
+import asyncio
 import json
 import pytest
 from tornado.httpclient import HTTPClientError
+
+from jupyter_fsspec import handlers
+from jupyter_fsspec.handlers import (
+    FileBatchReadHandler,
+    FileSearchHandler,
+    FileSystemHandler,
+    FsspecChannelHandler,
+    cancel_on_disconnect,
+)
+from jupyter_fsspec.utils import decode_frames
 # TODO: Testing: different file types, received expected errors
 
 
@@ -654,3 +665,773 @@ async def test_upload_download(fs_manager_instance, jp_fetch):
 
 
 # TODO: Fix Event loop closed error (unclosed session); Dirty state between tests with s3
+
+
+async def test_search_files(fs_manager_instance, jp_fetch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+
+    async def search(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "search",
+            method="GET",
+            params={"key": mem_key, **params},
+        )
+        assert response.code == 200
+        lines = response.body.decode("utf-8").splitlines()
+        return [json.loads(line) for line in lines[:-1]], json.loads(lines[-1])
+
+    # glob with a literal directory prefix
+    matches, summary = await search(pattern="test_dir/*.txt")
+    assert [item["name"] for item in matches] == ["/test_dir/file1.txt"]
+    assert matches[0]["type"] == "file"
+    assert summary["status"] == "success"
+    assert summary["count"] == 1
+    assert not summary["truncated"]
+
+    # single level glob does not descend into subdirectories
+    matches, _ = await search(pattern="*.txt")
+    assert [item["name"] for item in matches] == ["/file_in_root.txt"]
+
+    # recursive glob with a result cap
+    matches, summary = await search(pattern="**/*.txt", limit=1)
+    assert len(matches) == 1
+    assert summary["count"] == 1
+    assert summary["truncated"]
+
+    # regex
+    matches, _ = await search(pattern=r"^test_dir/file\d\.txt$", type="regex")
+    assert [item["name"] for item in matches] == ["/test_dir/file1.txt"]
+
+    # top-level alternatives share no literal prefix, both are searched
+    matches, _ = await search(pattern=r"^test_dir/file1|file_in_root", type="regex")
+    assert sorted(item["name"] for item in matches) == [
+        "/file_in_root.txt",
+        "/test_dir/file1.txt",
+    ]
+
+    # invalid regex
+    with pytest.raises(HTTPClientError) as exc_info:
+        await search(pattern="^test_dir/(", type="regex")
+    assert exc_info.value.code == 400
+
+
+async def test_search_limit_stops_listing(fs_manager_instance, jp_fetch, monkeypatch):
+    fs_manager = await fs_manager_instance
+    mem_key = "TestsMemSource"
+    mem_fs = fs_manager.get_filesystem(mem_key)["instance"]
+    for i in range(5):
+        await mem_fs._pipe(f"tree/dir{i}/file.txt", b"x")
+
+    response = await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "search",
+        method="GET",
+        params={"key": mem_key, "pattern": "tree/**", "limit": "2"},
+    )
+    lines = response.body.decode("utf-8").splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[-1])["truncated"]
+
+    listed = []
+    ls = mem_fs._ls
+
+    async def recording_ls(path, *args, **kwargs):
+        listed.append(path)
+        return await ls(path, *args, **kwargs)
+
+    monkeypatch.setattr(mem_fs, "_ls", recording_ls)
+
+    # directories are only listed as the entries are consumed
+    root_listing = await ls("/tree", detail=True)
+    entries = FileSearchHandler._iter_tree(mem_fs, "/tree", root_listing, "", None)
+    assert [(await entries.__anext__())["type"] for _ in range(2)] == ["directory"] * 2
+    await entries.aclose()
+    assert listed == []
+
+    entries = FileSearchHandler._iter_tree(mem_fs, "/tree", root_listing, "dir1", None)
+    names = [info["name"] async for info in entries]
+    assert [name.strip("/") for name in names] == ["tree/dir1", "tree/dir1/file.txt"]
+    assert len(listed) == 1
+    await mem_fs._rm("tree", recursive=True)
+
+
+async def test_metadata_index(fs_manager_instance_indexed, jp_fetch):
+    fs_manager = await fs_manager_instance_indexed
+    mem_key = "TestsIndexedMem"
+    mem_info = fs_manager.get_filesystem(mem_key)
+    mem_fs = mem_info["instance"]
+    mem_fs_path = mem_info["path"]
+
+    async def query(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "index",
+            method="GET",
+            params={"key": mem_key, **params},
+        )
+        assert response.code == 200
+        return json.loads(response.body.decode("utf-8"))
+
+    # refresh populates the index from the live backend
+    body = await query(item_path="test_dir", refresh="true")
+    assert body["status"] == "success"
+    assert body["refreshed_at"] is not None
+    assert [item["name"] for item in body["content"]] == [
+        f"{mem_key}/test_dir/file1.txt"
+    ]
+    assert body["content"][0]["size"] == len(b"Test content")
+    assert body["content"][0]["type"] == "file"
+
+    # writes through the contents handler are written through to the index
+    await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "contents",
+        method="POST",
+        params={"key": mem_key, "item_path": "test_dir/big.txt"},
+        body=b"x" * 100,
+    )
+    body = await query(item_path="test_dir", sort="size", descending="true")
+    assert [item["name"] for item in body["content"]] == [
+        f"{mem_key}/test_dir/big.txt",
+        f"{mem_key}/test_dir/file1.txt",
+    ]
+    body = await query(item_path="test_dir", pattern="big*")
+    assert [item["size"] for item in body["content"]] == [100]
+
+    # so are deletes
+    await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        method="DELETE",
+        params={"key": mem_key},
+        body=json.dumps({"key": mem_key, "item_path": "test_dir/big.txt"}),
+        allow_nonstandard_methods=True,
+    )
+    assert not await mem_fs._exists(f"{mem_fs_path}/test_dir/big.txt")
+    body = await query(item_path="test_dir")
+    assert [item["name"] for item in body["content"]] == [
+        f"{mem_key}/test_dir/file1.txt"
+    ]
+
+    # sources without an index are rejected
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "index",
+            method="GET",
+            params={"key": "empty_test_mem"},
+        )
+    assert exc_info.value.code == 500
+    await mem_fs._rm(mem_fs_path, recursive=True)
+
+
+async def test_disk_usage(fs_manager_instance, jp_fetch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+
+    async def disk_usage(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "du",
+            method="GET",
+            params={"key": mem_key, **params},
+        )
+        assert response.code == 200
+        lines = response.body.decode("utf-8").splitlines()
+        final = json.loads(lines[-1])
+        assert final["status"] == "success"
+        return final["content"]
+
+    content = await disk_usage(item_path="test_dir")
+    assert content["total_bytes"] == len(b"Test content")
+    assert content["file_count"] == 1
+    assert content["dir_count"] == 0
+    assert not content["native"]
+
+    # writes invalidate the cached subtotals
+    await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "contents",
+        method="POST",
+        params={"key": mem_key, "item_path": "test_dir/nested/more.txt"},
+        body=b"12345",
+    )
+    content = await disk_usage(item_path="test_dir")
+    assert content["total_bytes"] == len(b"Test content") + 5
+    assert content["file_count"] == 2
+    assert content["dir_count"] == 1
+
+
+async def test_preview_file(fs_manager_instance, jp_fetch):
+    fs_manager = await fs_manager_instance
+    mem_key = "TestsMemSource"
+    mem_fs = fs_manager.get_filesystem(mem_key)["instance"]
+
+    async def preview(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "preview",
+            method="GET",
+            params={"key": mem_key, **params},
+        )
+        assert response.code == 200
+        return json.loads(response.body.decode("utf-8"))["content"]
+
+    content = await preview(item_path="test_dir/file1.txt", max_bytes=4)
+    assert content["text"] == "Test"
+    assert content["mime_type"] == "text/plain"
+    assert content["encoding"] == "utf-8"
+    assert content["size"] == len(b"Test content")
+    assert content["preview_bytes"] == 4
+    assert content["truncated"]
+
+    await mem_fs._pipe("test_dir/image.bin", b"\x89PNG\r\n\x1a\n" + bytes(1000))
+    content = await preview(item_path="test_dir/image.bin")
+    assert content["mime_type"] == "image/png"
+    assert content["encoding"] is None
+    assert "text" not in content
+    assert content["hex"].startswith("00000000  89 50 4e 47")
+    assert not content["truncated"]
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await preview(item_path="test_dir")
+    assert exc_info.value.code == 500
+
+
+async def test_tabular_preview(fs_manager_instance, jp_fetch):
+    fs_manager = await fs_manager_instance
+    mem_key = "TestsMemSource"
+    mem_fs = fs_manager.get_filesystem(mem_key)["instance"]
+
+    async def tabular(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "tabular",
+            method="GET",
+            params={"key": mem_key, **params},
+        )
+        assert response.code == 200
+        return json.loads(response.body.decode("utf-8"))["content"]
+
+    await mem_fs._pipe("test_dir/table.csv", b"id,name\n1,a\n2,b\n3,c\n")
+    content = await tabular(item_path="test_dir/table.csv", rows=2)
+    assert content["format"] == "csv"
+    assert content["schema"] == [
+        {"name": "id", "type": "int64"},
+        {"name": "name", "type": "string"},
+    ]
+    assert content["rows"] == [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}]
+    assert not content["cached"]
+
+    content = await tabular(item_path="test_dir/table.csv", rows=2)
+    assert content["cached"]
+
+    # a new version of the file has a new etag
+    await mem_fs._pipe("test_dir/table.csv", b"id,name\n9,z\n")
+    content = await tabular(item_path="test_dir/table.csv", rows=2)
+    assert not content["cached"]
+    assert content["rows"] == [{"id": "9", "name": "z"}]
+
+    await mem_fs._pipe("test_dir/events.log", b'{"a": 1}\n{"a": 2}\n')
+    content = await tabular(
+        item_path="test_dir/events.log", format="jsonl", columns="a"
+    )
+    assert content["rows"] == [{"a": 1}, {"a": 2}]
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await tabular(item_path="test_dir/events.log")
+    assert exc_info.value.code == 400
+
+
+async def test_ranged_reads_block_cache(fs_manager_instance, jp_fetch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+    data = b"0123456789abcdef" * 1024
+
+    async def read_range(start, end):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "contents",
+            method="GET",
+            headers={"Range": f"{start}-{end}"},
+            params={
+                "key": mem_key,
+                "type": "range",
+                "item_path": "test_dir/blocks.bin",
+            },
+        )
+        assert response.code == 200
+        return response.body
+
+    async def write(body):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "contents",
+            method="POST",
+            params={"key": mem_key, "item_path": "test_dir/blocks.bin"},
+            body=body,
+        )
+        assert response.code == 201
+
+    await write(data)
+    for start in range(0, 4096, 512):
+        assert await read_range(start, start + 512) == data[start : start + 512]
+
+    # writes through the server are never served from stale blocks
+    await write(b"replaced" + data[8:])
+    assert await read_range(0, 8) == b"replaced"
+
+
+async def test_batch_read(fs_manager_instance, jp_fetch, monkeypatch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+    reads = [
+        {"key": mem_key, "item_path": "test_dir/file1.txt"},
+        {"key": mem_key, "item_path": "test_dir/file1.txt", "start": 5, "end": 8},
+        {"key": mem_key, "item_path": "test_dir/file1.txt", "start": -7},
+        {"key": mem_key, "item_path": "test_dir/missing.txt", "start": 0, "end": 1},
+        {"key": "NoSuchSource", "item_path": "file.txt"},
+    ]
+    response = await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "batch",
+        method="POST",
+        body=json.dumps({"reads": reads}),
+    )
+    assert response.code == 200
+    results = decode_frames(response.body)
+    assert results[:3] == [b"Test content", b"con", b"content"]
+    assert results[3]["error"] == "FileNotFoundError"
+    assert results[4]["error"] == "ValueError"
+
+    # reads fetched a few at a time still come back in request order
+    monkeypatch.setattr(FileBatchReadHandler, "chunk_reads", 1)
+    monkeypatch.setattr(FileBatchReadHandler, "read_ahead", 1)
+    response = await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "batch",
+        method="POST",
+        body=json.dumps({"reads": reads}),
+    )
+    assert decode_frames(response.body)[:3] == results[:3]
+
+    # batches returning more than max_bytes are rejected before reading
+    monkeypatch.setattr(FileBatchReadHandler, "max_bytes", 10)
+    response = await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "batch",
+        method="POST",
+        body=json.dumps({"reads": reads[1:3]}),
+    )
+    assert decode_frames(response.body) == [b"con", b"content"]
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "batch",
+            method="POST",
+            body=json.dumps({"reads": reads[:1]}),
+        )
+    assert exc_info.value.code == 413
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "batch",
+            method="POST",
+            body=json.dumps({"reads": [{"key": mem_key}]}),
+        )
+    assert exc_info.value.code == 400
+
+
+async def test_find_files(fs_manager_instance, jp_fetch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+
+    async def find(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            method="GET",
+            params={"key": mem_key, "item_path": "", "type": "find", **params},
+        )
+        content = json.loads(response.body.decode("utf-8"))["content"]
+        return {entry["name"].strip("/"): entry["type"] for entry in content}
+
+    found = await find()
+    assert found["test_dir"] == "directory"
+    assert found["test_dir/file1.txt"] == "file"
+    # directories below maxdepth are not entered
+    shallow = await find(maxdepth=1)
+    assert shallow["test_dir"] == "directory"
+    assert "test_dir/file1.txt" not in shallow
+
+
+async def test_file_info(fs_manager_instance, jp_fetch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+
+    response = await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "info",
+        method="GET",
+        params={"key": mem_key, "item_path": "test_dir/file1.txt"},
+    )
+    info = json.loads(response.body.decode("utf-8"))["content"]
+    assert info["type"] == "file"
+    assert info["size"] == len(b"Test content")
+    assert info["name"].endswith("test_dir/file1.txt")
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "info",
+            method="GET",
+            params={"key": mem_key, "item_path": "test_dir/missing.txt"},
+        )
+    assert exc_info.value.code == 404
+
+    response = await jp_fetch(
+        "jupyter_fsspec",
+        "files",
+        "info",
+        method="POST",
+        body=json.dumps(
+            {
+                "key": mem_key,
+                "paths": ["test_dir", "test_dir/missing.txt", "test_dir/file1.txt"],
+            }
+        ),
+    )
+    content = json.loads(response.body.decode("utf-8"))["content"]
+    assert [entry.get("type") for entry in content] == ["directory", None, "file"]
+    assert content[1] == {
+        "name": "test_dir/missing.txt",
+        "error": "FileNotFoundError",
+        "description": content[1]["description"],
+    }
+
+
+async def test_chunked_upload(fs_manager_instance, jp_fetch):
+    fs_manager = await fs_manager_instance
+    mem_key = "TestsMemSource"
+    mem_fs = fs_manager.get_filesystem(mem_key)["instance"]
+    params = {"key": mem_key, "item_path": "test_dir/chunked.bin"}
+
+    async def upload(method, body=None, **kwargs):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "upload",
+            method=method,
+            params={**params, **kwargs},
+            body=body,
+            allow_nonstandard_methods=True,
+        )
+        return json.loads(response.body.decode("utf-8"))
+
+    started = await upload("POST", b"")
+    upload_id = started["content"]["upload_id"]
+
+    chunks = [b"a" * 1000, b"b" * 1000, b"c" * 10]
+    offset = 0
+    for chunk in chunks:
+        response = await upload("PUT", chunk, upload_id=upload_id, offset=offset)
+        offset += len(chunk)
+        assert response["content"]["size"] == offset
+
+    # a retried chunk is accepted once, a chunk leaving a gap is refused
+    response = await upload("PUT", chunks[-1], upload_id=upload_id, offset=2000)
+    assert response["content"]["size"] == offset
+    with pytest.raises(HTTPClientError) as exc_info:
+        await upload("PUT", b"gap", upload_id=upload_id, offset=offset + 1)
+    assert exc_info.value.code == 409
+
+    # chunks are written to the backend as they arrive, not staged until commit
+    assert await mem_fs._cat_file("test_dir/chunked.bin") == b"".join(chunks)
+
+    committed = await upload("POST", b"", upload_id=upload_id)
+    assert committed["content"]["size"] == 2010
+
+    response = await jp_fetch(
+        "jupyter_fsspec", "files", "contents", method="GET", params=params
+    )
+    assert response.body == b"".join(chunks)
+
+    # the upload is gone once committed
+    with pytest.raises(HTTPClientError) as exc_info:
+        await upload("PUT", b"late", upload_id=upload_id, offset=offset)
+    assert exc_info.value.code == 404
+
+    params["item_path"] = "test_dir/aborted.bin"
+    aborted = await upload("POST", b"")
+    await upload("PUT", b"partial", upload_id=aborted["content"]["upload_id"], offset=0)
+    await upload("DELETE", upload_id=aborted["content"]["upload_id"])
+    # nothing is left of an aborted upload
+    assert not await mem_fs._exists("test_dir/aborted.bin")
+    with pytest.raises(HTTPClientError) as exc_info:
+        await upload("POST", b"", upload_id=aborted["content"]["upload_id"])
+    assert exc_info.value.code == 404
+
+
+async def test_channel(fs_manager_instance, jp_ws_fetch):
+    fs_manager = await fs_manager_instance
+    mem_key = "TestsMemSource"
+    ws = await jp_ws_fetch("jupyter_fsspec", "channel")
+
+    async def receive_all(count):
+        replies = {}
+        for _ in range(count):
+            message = await ws.read_message()
+            if isinstance(message, bytes):
+                header_len = int.from_bytes(message[:4], "big")
+                reply = json.loads(message[4 : 4 + header_len])
+                reply["body"] = message[4 + header_len :]
+            else:
+                reply = json.loads(message)
+            replies[reply["id"]] = reply
+        return replies
+
+    try:
+        # several requests in flight at once, answered by id
+        ws.write_message(
+            json.dumps(
+                {
+                    "id": 1,
+                    "method": "GET",
+                    "endpoint": f"files?key={mem_key}&item_path=test_dir",
+                }
+            )
+        )
+        ws.write_message(
+            json.dumps(
+                {
+                    "id": 2,
+                    "method": "GET",
+                    "endpoint": f"files/contents?key={mem_key}&item_path=test_dir/file1.txt",
+                    "headers": {"Range": "0-4"},
+                }
+            )
+        )
+        ws.write_message(json.dumps({"id": 3, "endpoint": "nowhere"}))
+        replies = await receive_all(3)
+
+        assert replies[1]["status"] == 200
+        listing = json.loads(replies[1]["body"])["content"]
+        assert "/test_dir/file1.txt" in [item["name"] for item in listing]
+        assert replies[2]["status"] == 200
+        assert replies[2]["body"] == b"Test"
+        assert replies[2]["headers"]["Content-Range"] == "bytes 0-4"
+        assert replies[3]["status"] == 404
+
+        # binary frames carry raw request bodies
+        header = json.dumps(
+            {
+                "id": "upload",
+                "method": "POST",
+                "endpoint": f"files/contents?key={mem_key}&item_path=test_dir/channel.bin",
+                "headers": {"Content-Type": "application/octet-stream"},
+            }
+        ).encode("utf-8")
+        payload = bytes(range(256))
+        ws.write_message(len(header).to_bytes(4, "big") + header + payload, binary=True)
+        replies = await receive_all(1)
+        assert replies["upload"]["status"] == 201
+
+        mem_fs = fs_manager.get_filesystem(mem_key)["instance"]
+        assert await mem_fs._cat_file("test_dir/channel.bin") == payload
+    finally:
+        ws.close()
+
+
+async def test_file_events(fs_manager_instance, jp_fetch, jp_ws_fetch):
+    await fs_manager_instance
+    mem_key = "TestsMemSource"
+    ws = await jp_ws_fetch("jupyter_fsspec", "files", "events")
+
+    try:
+        ws.write_message(
+            json.dumps({"action": "watch", "key": mem_key, "item_path": "test_dir"})
+        )
+        # let the watch take its first listing before changing the directory
+        await asyncio.sleep(0.2)
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "contents",
+            method="POST",
+            params={"key": mem_key, "item_path": "test_dir/watched.txt"},
+            body=b"watched",
+        )
+        assert response.code == 201
+
+        # changes made through the server are pushed without waiting for a poll
+        message = json.loads(await asyncio.wait_for(ws.read_message(), 5))
+        assert message["key"] == mem_key
+        assert message["item_path"] == "test_dir"
+        assert {
+            "change": "added",
+            "name": "/test_dir/watched.txt",
+            "type": "file",
+        }.items() <= message["changes"][0].items()
+
+        ws.write_message(json.dumps({"action": "watch", "key": "NoSuchSource"}))
+        message = json.loads(await asyncio.wait_for(ws.read_message(), 5))
+        assert message["status"] == "failed"
+    finally:
+        ws.close()
+        # let the server drop the watch before the event loop closes
+        await asyncio.sleep(0.1)
+
+
+async def test_listing_delta(fs_manager_instance, jp_fetch):
+    fs_manager = await fs_manager_instance
+    mem_key = "TestsMemSource"
+    mem_fs = fs_manager.get_filesystem(mem_key)["instance"]
+
+    async def list_dir(**params):
+        response = await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            method="GET",
+            params={"key": mem_key, "item_path": "test_dir", **params},
+        )
+        return json.loads(response.body)
+
+    full = await list_dir()
+    assert full["delta"] is False
+    assert len(full["content"]) == 1
+
+    # an unchanged directory keeps its version and sends no entries
+    unchanged = await list_dir(since=full["version"], refresh="true")
+    assert unchanged == {"version": full["version"], "delta": True, "content": []}
+
+    await mem_fs._pipe_file("/test_dir/delta.txt", b"delta")
+    await mem_fs._rm_file("/test_dir/file1.txt")
+    changed = await list_dir(since=full["version"], refresh="true")
+    assert changed["delta"] is True
+    assert changed["version"] != full["version"]
+    assert sorted((item["change"], item["name"]) for item in changed["content"]) == [
+        ("added", "/test_dir/delta.txt"),
+        ("removed", "/test_dir/file1.txt"),
+    ]
+
+    # unknown versions fall back to the full listing
+    fallback = await list_dir(since="unknown", refresh="true")
+    assert fallback["delta"] is False
+    assert [item["name"] for item in fallback["content"]] == ["/test_dir/delta.txt"]
+
+
+async def test_cancel_on_disconnect(
+    fs_manager_instance, jp_fetch, jp_ws_fetch, monkeypatch
+):
+    await fs_manager_instance
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow_get(self):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(FileSystemHandler, "get", cancel_on_disconnect(slow_get))
+
+    # an HTTP client giving up closes the connection and cancels the request
+    with pytest.raises(HTTPClientError):
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            params={"key": "TestsMemSource", "item_path": "test_dir"},
+            request_timeout=0.5,
+        )
+    await asyncio.wait_for(cancelled.wait(), 5)
+
+    # the background walk of a disk usage request is stopped with it
+    cancelled.clear()
+
+    async def slow_run(self):
+        return await slow_get(None)
+
+    monkeypatch.setattr(handlers.DiskUsageWalk, "run", slow_run)
+    with pytest.raises(HTTPClientError):
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            "du",
+            params={"key": "TestsMemSource", "item_path": "test_dir"},
+            request_timeout=0.5,
+        )
+    await asyncio.wait_for(cancelled.wait(), 5)
+
+    # a mutation runs to completion, only its response is dropped
+    finished = asyncio.Event()
+
+    async def slow_delete(self):
+        try:
+            await asyncio.sleep(0.5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        finished.set()
+        self.finish({"status": "success"})
+
+    cancelled.clear()
+    monkeypatch.setattr(FileSystemHandler, "delete", slow_delete)
+    with pytest.raises(HTTPClientError):
+        await jp_fetch(
+            "jupyter_fsspec",
+            "files",
+            method="DELETE",
+            params={"key": "TestsMemSource", "item_path": "test_dir"},
+            request_timeout=0.2,
+        )
+    await asyncio.wait_for(finished.wait(), 5)
+    assert not cancelled.is_set()
+
+    # a channel request is cancelled by a cancel frame for its id
+    started.clear()
+    cancelled.clear()
+    monkeypatch.setattr(FsspecChannelHandler, "max_concurrent", 1)
+    ws = await jp_ws_fetch("jupyter_fsspec", "channel")
+    try:
+        ws.write_message(
+            json.dumps(
+                {"id": 1, "endpoint": "files?key=TestsMemSource&item_path=test_dir"}
+            )
+        )
+        await asyncio.wait_for(started.wait(), 5)
+        # only one request of the socket runs at a time
+        ws.write_message(json.dumps({"id": 2, "endpoint": "config"}))
+        message = ws.read_message()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.shield(message), 0.2)
+        ws.write_message(json.dumps({"id": 1, "cancel": True}))
+        await asyncio.wait_for(cancelled.wait(), 5)
+
+        reply = json.loads(await asyncio.wait_for(message, 5))
+        assert reply["id"] == 2
+        assert reply["status"] == 200
+    finally:
+        ws.close()
@@ -1,3 +1,4 @@
+import json
 import os
 
 import pytest
@@ -93,3 +94,215 @@ def test_roundtrip_fileio(fs):
         f.write(b"hello2")
     with fs.open("testmem/afile2", "rb") as f:
         assert f.read() == b"hello2"
+
+
+def test_chunked_write(fs):
+    data = bytes(range(256)) * 20
+
+    requests_sent = []
+    request = fs.session.request
+
+    def recording_request(method, url, data=None, **kwargs):
+        requests_sent.append((method, url.rsplit("/", 1)[-1], len(data or b"")))
+        return request(method, url, data=data, **kwargs)
+
+    fs.session.request = recording_request
+
+    with fs.open("testmem/chunked", "wb", block_size=1000) as f:
+        for i in range(0, len(data), 700):
+            f.write(data[i : i + 700])
+        # full blocks were sent before the file is closed
+        assert ("PUT", "upload", 1400) in requests_sent
+    # no request carries more than a block and a write
+    assert max(size for _, _, size in requests_sent) < 1700
+    assert requests_sent[-1][:2] == ("POST", "upload")
+    assert fs.cat_file("testmem/chunked") == data
+
+    requests_sent.clear()
+    with fs.open("testmem/small", "wb", block_size=1000) as f:
+        f.write(b"small")
+    assert [method for method, _, _ in requests_sent] == ["POST"]
+    assert fs.cat_file("testmem/small") == b"small"
+
+
+def test_info(fs):
+    fs.pipe_file("testmem/stat/a", b"abc")
+    fs.pipe_file("testmem/stat/b", b"abcdef")
+
+    requests_sent = []
+    request = fs.session.request
+
+    def recording_request(method, url, **kwargs):
+        requests_sent.append((method, url.rsplit("/", 1)[-1]))
+        return request(method, url, **kwargs)
+
+    fs.session.request = recording_request
+
+    info = fs.info("testmem/stat/a")
+    assert info["name"] == "testmem/stat/a"
+    assert info["type"] == "file"
+    assert fs.size("testmem/stat/b") == 6
+    assert fs.isdir("testmem/stat")
+    assert not fs.exists("testmem/stat/c")
+    # each check is a single lookup, no directory is listed
+    assert set(requests_sent) == {("GET", "info")}
+    assert len(requests_sent) == 4
+
+    requests_sent.clear()
+    assert fs.sizes(["testmem/stat/b", "testmem/stat/a"]) == [6, 3]
+    assert requests_sent == [("POST", "info")]
+    with pytest.raises(FileNotFoundError):
+        fs.sizes(["testmem/stat/a", "testmem/stat/c"])
+
+
+@pytest.fixture()
+def afs(server):
+    yield client.AsyncJFS(server, skip_instance_cache=True)
+
+
+def test_async_bulk_cat(afs):
+    paths = [f"testmem/bulk/file{i}" for i in range(20)]
+    afs.pipe({path: path.encode() for path in paths})
+
+    out = afs.cat(paths)
+    assert out == {path: path.encode() for path in paths}
+    assert afs.cat_ranges(paths[:2], [0, 8], [4, None]) == [b"test", b"bulk/file1"]
+
+    infos = [afs.info(path) for path in paths]
+    assert all(info["size"] == len(path) for info, path in zip(infos, paths))
+    with pytest.raises(FileNotFoundError):
+        afs.info("testmem/bulk/notafile")
+
+    assert afs.find("testmem/bulk") == sorted(paths)
+    afs.rm("testmem/bulk", recursive=True)
+    assert not afs.exists("testmem/bulk/file0")
+
+
+async def test_async_api(server):
+    afs = client.AsyncJFS(server, asynchronous=True, skip_instance_cache=True)
+    session = await afs.set_session()
+    try:
+        out = await afs._ls("", detail=False)
+        assert out == ["testfile", "testmem", "testobj"]
+        assert await afs._cat_file("testmem/afile") == b"hello"
+    finally:
+        await session.close()
+
+
+def test_ranged_reads(fs):
+    data = bytes(range(256)) * 4096
+    fs.pipe_file("testmem/big", data)
+
+    responses = []
+    request = fs.session.request
+
+    def recording_request(method, url, headers=None, data=None, **kwargs):
+        r = request(method, url, headers=headers, data=data, **kwargs)
+        if url.endswith("batch"):
+            reads = json.loads(data)["reads"]
+            responses.append([(read["start"], read["end"]) for read in reads])
+        else:
+            responses.append((headers.get("Range"), len(r.content)))
+        return r
+
+    fs.session.request = recording_request
+
+    assert fs.cat_file("testmem/big", 1000, 1010) == data[1000:1010]
+    assert fs.cat_file("testmem/big", -10) == data[-10:]
+    assert fs.cat_file("testmem/big", 10, 10) == b""
+    with fs.open("testmem/big", "rb", block_size=4096) as f:
+        f.seek(500_000)
+        assert f.read(100) == data[500_000:500_100]
+    # no request transfers the whole file
+    assert max(size for _, size in responses) < 100_000
+
+    responses.clear()
+    out = fs.cat_ranges(
+        ["testmem/big"] * 3, [0, 100, 900_000], [10, 110, 900_010], max_gap=1000
+    )
+    assert out == [data[0:10], data[100:110], data[900_000:900_010]]
+    # one request, reading the two nearby ranges as one
+    assert responses == [[(0, 110), (900_000, 900_010)]]
+
+    responses.clear()
+    out = fs.cat_ranges(["testmem/big", "testmem/afile"], [-5, 1], [None, 3])
+    assert out == [data[-5:], b"el"]
+    assert responses == [[(1, 3), (-5, None)]]
+    with pytest.raises(FileNotFoundError):
+        fs.cat_ranges(
+            ["testmem/big", "testmem/nofile"], [0, 0], [1, 1], on_error="raise"
+        )
+
+    out = fs.cat(["testmem/afile", "testmem/big", "testmem/nofile"], on_error="return")
+    assert out["testmem/afile"] == b"hello"
+    assert out["testmem/big"] == data
+    assert isinstance(out["testmem/nofile"], FileNotFoundError)
+
+
+def test_async_chunked_write(afs):
+    data = bytes(range(256)) * 20
+    with afs.open("testmem/achunked", "wb", block_size=1000) as f:
+        for i in range(0, len(data), 700):
+            f.write(data[i : i + 700])
+    assert afs.cat_file("testmem/achunked") == data
+
+
+def test_async_ranged_reads(afs):
+    data = bytes(range(256)) * 64
+    afs.pipe_file("testmem/ranged", data)
+
+    assert afs.cat_file("testmem/ranged", 100, 200) == data[100:200]
+    assert afs.cat_file("testmem/ranged", -5) == data[-5:]
+    out = afs.cat_ranges(
+        ["testmem/ranged", "testmem/ranged", "testmem/notafile"],
+        [0, 20, 0],
+        [10, None, 10],
+    )
+    assert out[:2] == [data[:10], data[20:]]
+    assert isinstance(out[2], FileNotFoundError)
+    with pytest.raises(FileNotFoundError):
+        afs.cat_ranges(["testmem/notafile"], [0], [10], on_error="raise")
+
+
+def test_find_walk_cache(server):
+    fs = client.JFS(server, skip_instance_cache=True, listings_expiry_time=60)
+    for i in range(3):
+        for j in range(3):
+            fs.pipe_file(f"testmem/tree/d{i}/e{j}/file", b"x" * i)
+
+    requests_sent = []
+    request = fs.session.request
+
+    def recording_request(method, url, params=None, **kwargs):
+        requests_sent.append((method, (params or {}).get("type")))
+        return request(method, url, params=params, **kwargs)
+
+    fs.session.request = recording_request
+
+    files = fs.find("testmem/tree")
+    assert len(files) == 9
+    assert files[0] == "testmem/tree/d0/e0/file"
+    assert "testmem/tree/d1" in fs.find("testmem/tree", withdirs=True)
+    assert fs.find("testmem/tree", maxdepth=1, withdirs=True) == [
+        "testmem/tree",
+        "testmem/tree/d0",
+        "testmem/tree/d1",
+        "testmem/tree/d2",
+    ]
+    assert requests_sent == [("GET", "find")] * 3
+
+    # a walk of the tree is served from the listings filled by one find
+    requests_sent.clear()
+    fs.invalidate_cache()
+    walked = list(fs.walk("testmem/tree"))
+    assert len(walked) == 13
+    assert fs.ls("testmem/tree/d2/e1", detail=False) == ["testmem/tree/d2/e1/file"]
+    assert fs.size("testmem/tree/d2/e1/file") == 2
+    assert requests_sent == [("GET", "find")]
+
+    # changes made through the client drop the affected listings
+    fs.pipe_file("testmem/tree/d0/new", b"")
+    assert "testmem/tree/d0/new" in fs.ls("testmem/tree/d0", detail=False)
+    fs.rm("testmem/tree/d1", recursive=True)
+    assert fs.ls("testmem/tree", detail=False) == ["testmem/tree/d0", "testmem/tree/d2"]
+    assert not fs.exists("testmem/tree/d1/e0/file")
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+import fsspec
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.implementations.memory import MemoryFileSystem
+
+from jupyter_fsspec.block_cache import BlockCache
+
+
+class CountingMemoryFileSystem(MemoryFileSystem):
+    cachable = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = []
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        self.reads.append((start, end))
+        return super().cat_file(path, start, end, **kwargs)
+
+
+async def test_sequential_reads_prefetch_aligned_blocks():
+    data = os.urandom(10 * 1024)
+    fs = AsyncFileSystemWrapper(CountingMemoryFileSystem())
+    await fs._pipe_file("/block_cache_test/data.bin", data)
+    cache = BlockCache(block_size=1024, max_bytes=64 * 1024, readahead=4)
+
+    try:
+        for start in range(0, 4096, 256):
+            chunk = await cache.read(
+                "src", fs, "/block_cache_test/data.bin", start, start + 256
+            )
+            assert chunk == data[start : start + 256]
+            # let the background readahead run
+            await asyncio.sleep(0)
+    finally:
+        fsspec.filesystem("memory").rm("/block_cache_test", recursive=True)
+
+    # every backend read is aligned to whole blocks
+    assert all(start % 1024 == 0 for start, _ in fs.sync_fs.reads)
+    # the first block is read on demand, later blocks arrive through readahead
+    assert len(fs.sync_fs.reads) < 4
+    assert cache.hits > cache.misses
+
+
+async def test_read_spanning_blocks_and_file_end():
+    data = os.urandom(3000)
+    fs = AsyncFileSystemWrapper(CountingMemoryFileSystem())
+    await fs._pipe_file("/block_cache_test/data.bin", data)
+    cache = BlockCache(block_size=1024, max_bytes=64 * 1024)
+
+    try:
+        assert (
+            await cache.read("src", fs, "/block_cache_test/data.bin", 1000, 2000)
+            == (data[1000:2000])
+        )
+        # contiguous missing blocks are fetched with one request
+        assert fs.sync_fs.reads == [(0, 2048)]
+        assert (
+            await cache.read("src", fs, "/block_cache_test/data.bin", 2900, 5000)
+            == (data[2900:])
+        )
+        assert (
+            await cache.read("src", fs, "/block_cache_test/data.bin", 4000, 5000) == b""
+        )
+
+        # a changed file is read again once its info is invalidated
+        await fs._pipe_file("/block_cache_test/data.bin", b"new contents")
+        cache.invalidate("src", "/block_cache_test/data.bin")
+        assert await cache.read("src", fs, "/block_cache_test/data.bin", 0, 3) == b"new"
+    finally:
+        fsspec.filesystem("memory").rm("/block_cache_test", recursive=True)
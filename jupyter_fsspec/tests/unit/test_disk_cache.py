@@ -0,0 +1,103 @@
+import fsspec
+import pytest
+import yaml
+
+from jupyter_fsspec.disk_cache import (
+    BlockCacheFileSystem,
+    FileCacheFileSystem,
+    cache_stats,
+    invalidate,
+    wrap_with_cache,
+)
+from jupyter_fsspec.file_manager import FileSystemManager
+from jupyter_fsspec.models import CacheConfig
+
+
+@pytest.fixture
+def source_files(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    for i in range(4):
+        (source / f"file{i}.bin").write_bytes(bytes([i]) * 100_000)
+    return source
+
+
+@pytest.mark.parametrize("mode", ["blockcache", "filecache"])
+def test_cache_evicts_least_recently_used(tmp_path, source_files, mode):
+    cache_fs = wrap_with_cache(
+        fsspec.filesystem("file"),
+        CacheConfig(mode=mode, max_bytes=250_000),
+        str(tmp_path / "cache"),
+    )
+
+    for i in [0, 1, 0, 2]:
+        assert cache_fs.cat_file(str(source_files / f"file{i}.bin"), 0, 4) == (
+            bytes([i]) * 4
+        )
+
+    stats = cache_stats(cache_fs)
+    assert stats["mode"] == mode
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    # file1 was the least recently used when file2 pushed the cache over its limit
+    assert stats["evictions"] == 1
+    assert stats["size"] <= 250_000
+
+    cache_fs.cat_file(str(source_files / "file0.bin"), 0, 4)
+    assert cache_stats(cache_fs)["hits"] == 2
+    cache_fs.cat_file(str(source_files / "file1.bin"), 0, 4)
+    assert cache_stats(cache_fs)["misses"] == 4
+
+
+def test_invalidate_directory(tmp_path, source_files):
+    cache_fs = wrap_with_cache(
+        fsspec.filesystem("file"),
+        CacheConfig(mode="filecache"),
+        str(tmp_path / "cache"),
+    )
+    path = str(source_files / "file3.bin")
+    cache_fs.cat_file(path)
+    (source_files / "file3.bin").write_bytes(b"changed")
+
+    # the stale copy is served until it is invalidated
+    assert cache_fs.cat_file(path) == bytes([3]) * 100_000
+    invalidate(cache_fs, str(source_files))
+    assert cache_fs.cat_file(path) == b"changed"
+
+
+async def test_manager_applies_source_cache(tmp_path):
+    config = {
+        "sources": [
+            {
+                "name": "cached",
+                "path": "memory://cached_dir",
+                "cache": {"mode": "filecache", "directory": str(tmp_path / "cache")},
+            }
+        ]
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.dump(config))
+    fs_manager = FileSystemManager(config_path)
+
+    fs_info = fs_manager.get_filesystem(fs_manager._encode_key({"name": "cached"}))
+    assert isinstance(fs_info["cache"], FileCacheFileSystem)
+    named_fs = fs_manager.construct_named_fs("cached")
+    assert isinstance(named_fs, FileCacheFileSystem)
+
+    fs_instance = fs_info["instance"]
+    try:
+        await fs_instance._pipe_file("/cached_dir/data.bin", b"first")
+        assert await fs_instance._cat_file("/cached_dir/data.bin") == b"first"
+        await fs_instance._pipe_file("/cached_dir/data.bin", b"second")
+        await fs_manager.paths_changed("cached", "/cached_dir/data.bin")
+        assert await fs_instance._cat_file("/cached_dir/data.bin") == b"second"
+        assert cache_stats(fs_info["cache"])["misses"] == 2
+    finally:
+        fsspec.filesystem("memory").rm("/cached_dir", recursive=True)
+
+
+def test_block_cache_class():
+    cache_fs = wrap_with_cache(
+        fsspec.filesystem("memory"), CacheConfig(), cache_storage="TMP"
+    )
+    assert isinstance(cache_fs, BlockCacheFileSystem)
+    assert cache_stats(cache_fs)["max_bytes"] is None
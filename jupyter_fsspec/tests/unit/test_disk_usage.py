@@ -0,0 +1,58 @@
+import asyncio
+
+import fsspec
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+
+from jupyter_fsspec.disk_usage import DiskUsageCache, DiskUsageWalk, has_native_du
+
+
+class CountingWrapper(AsyncFileSystemWrapper):
+    """Records listed paths and the peak number of concurrent listings."""
+
+    def __init__(self, fs):
+        super().__init__(fs)
+        self.listed = []
+        self.active = 0
+        self.peak = 0
+        listing = self._ls
+
+        async def _ls(path, **kwargs):
+            self.listed.append(path)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(0.01)
+                return await listing(path, **kwargs)
+            finally:
+                self.active -= 1
+
+        self._ls = _ls
+
+
+async def test_walk_disk_usage():
+    mem_fs = fsspec.filesystem("memory")
+    for i in range(6):
+        mem_fs.pipe(f"du_root/dir_{i}/file.bin", b"x" * (i + 1))
+        mem_fs.pipe(f"du_root/dir_{i}/sub/file.bin", b"y")
+    mem_fs.pipe("du_root/top.bin", b"zz")
+    fs = CountingWrapper(mem_fs)
+    assert not has_native_du(fs)
+
+    cache = DiskUsageCache()
+    walk = DiskUsageWalk(fs, "du_root", max_concurrency=3, cache=cache)
+    total_bytes, file_count, dir_count = await walk.run()
+
+    assert total_bytes == sum(range(1, 7)) + 6 + 2
+    assert file_count == 13
+    assert dir_count == 12
+    assert 1 < fs.peak <= 3
+    assert cache.get("/du_root/dir_2")["total_bytes"] == 3 + 1
+
+    # cached subtotals are reused instead of listing again
+    fs.listed.clear()
+    cache.invalidate("/du_root/dir_0/file.bin")
+    walk = DiskUsageWalk(fs, "du_root", cache=cache)
+    assert await walk.run() == (total_bytes, file_count, dir_count)
+    assert sorted(fs.listed) == ["/du_root", "/du_root/dir_0"]
+
+    mem_fs.rm("du_root", recursive=True)
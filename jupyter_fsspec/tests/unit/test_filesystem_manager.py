@@ -1,9 +1,13 @@
+import gc
+import time
 import pytest
 import yaml
 import os
 from pydantic import ValidationError
 from pathlib import Path
+from fsspec.core import strip_protocol
 from jupyter_fsspec.file_manager import FileSystemManager
+from jupyter_fsspec.file_manager import logger as file_manager_logger
 from unittest.mock import patch
 
 
@@ -208,3 +212,124 @@ def test_error_retrieve_config_content(bad_yaml_config):
 
     partial_exc_msg = "expected <block end>, but found '?'"
     assert partial_exc_msg in str(exc.value)
+
+
+def test_map_paths(setup_config_dir, config_file):
+    fs_manager = FileSystemManager(config_file)
+    root_path = fs_manager.name_to_prefix["inmem"]
+
+    listing = [
+        {"name": "/mem_dir/file.txt"},
+        {"name": "mem_dir/nested"},
+        {"name": "/mem_dir/mem_dir/inner.txt"},
+        {"name": "/mem_dir"},
+        {"type": "file"},
+    ]
+    mapped = fs_manager.map_paths(root_path, "inmem", listing)
+
+    assert [item.get("name") for item in mapped] == [
+        "inmem/file.txt",
+        "inmem/nested",
+        "inmem/mem_dir/inner.txt",
+        "inmem",
+        None,
+    ]
+
+
+def test_map_paths_large_listing(setup_config_dir, config_file):
+    fs_manager = FileSystemManager(config_file)
+    root_path = fs_manager.name_to_prefix["inmem"]
+    count = 100_000
+
+    listing = [{"name": f"/mem_dir/dir_{i}/file_{i}.bin"} for i in range(count)]
+    mapped = fs_manager.map_paths(root_path, "inmem", listing)
+
+    assert len(mapped) == count
+    assert mapped[0]["name"] == "inmem/dir_0/file_0.bin"
+    assert mapped[-1]["name"] == f"inmem/dir_{count - 1}/file_{count - 1}.bin"
+    # the translator is built once per source and reused
+    translator = fs_manager.get_path_translator(root_path, "inmem")
+    assert translator is fs_manager.get_path_translator(root_path, "inmem")
+    mapper = fs_manager.get_items_mapper(root_path, "inmem")
+    assert mapper is fs_manager.get_items_mapper(root_path, "inmem")
+
+
+def _split_map_paths(fs_manager, root_path, key, file_obj_list):
+    # map_paths before the cached translators, kept as the benchmark baseline
+    protocol = fs_manager.get_filesystem_protocol(key)
+    file_manager_logger.debug("protocol: %s", protocol)
+    file_manager_logger.debug("initial root path: %s", root_path)
+    if not root_path and not (protocol == "file://"):
+        return file_obj_list
+    if protocol == "file://":
+        root = strip_protocol(root_path)
+    else:
+        root = fs_manager.name_to_prefix[key]
+    file_manager_logger.debug("filesystem root: %s", root)
+    for item in file_obj_list:
+        if "name" in item:
+            split_paths = item["name"].split(root, 1)
+            file_manager_logger.debug("split file name: %s", split_paths)
+            relative_path = split_paths[1] if len(split_paths) > 1 else split_paths[0]
+            item["name"] = key + relative_path
+    return file_obj_list
+
+
+def _best_time(map_paths, listings, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        copies = [[dict(item) for item in listing] for listing in listings]
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for listing in copies:
+                map_paths(listing)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def test_map_paths_matches_split(setup_config_dir, config_file):
+    fs_manager = FileSystemManager(config_file)
+    root_path = fs_manager.name_to_prefix["inmem"]
+
+    listing = [
+        {"name": "/mem_dir/file.txt"},
+        {"name": "mem_dir/nested"},
+        {"name": "/mem_dir/mem_dir/inner.txt"},
+        {"name": "/mem_dir/dir_1/file_1.bin", "size": 1},
+        {"name": "/mem_dir"},
+        {"type": "file"},
+    ] + [{"name": f"/mem_dir/dir_{i}/file_{i}.bin"} for i in range(1000)]
+    expected = _split_map_paths(
+        fs_manager, root_path, "inmem", [dict(item) for item in listing]
+    )
+    mapped = fs_manager.map_paths(root_path, "inmem", [dict(item) for item in listing])
+    assert mapped == expected
+
+
+@pytest.mark.skipif(
+    not os.environ.get("JUPYTER_FSSPEC_BENCHMARK"),
+    reason="timing benchmark, set JUPYTER_FSSPEC_BENCHMARK=1 to run",
+)
+def test_map_paths_benchmark(setup_config_dir, config_file):
+    fs_manager = FileSystemManager(config_file)
+    root_path = fs_manager.name_to_prefix["inmem"]
+
+    def split_map_paths(listing):
+        return _split_map_paths(fs_manager, root_path, "inmem", listing)
+
+    def translator_map_paths(listing):
+        return fs_manager.map_paths(root_path, "inmem", listing)
+
+    large = [[{"name": f"/mem_dir/dir_{i}/file_{i}.bin"} for i in range(100_000)]]
+    small = [
+        [{"name": f"/mem_dir/dir_{j}/file_{i}.bin"} for i in range(5)]
+        for j in range(10_000)
+    ]
+    for listings in (large, small):
+        split_time = _best_time(split_map_paths, listings)
+        translator_time = _best_time(translator_map_paths, listings)
+        print(f"split {split_time:.4f}s, translator {translator_time:.4f}s")
+        assert translator_time < split_time, (translator_time, split_time)
@@ -0,0 +1,321 @@
+import asyncio
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from jupyter_fsspec import helper
+
+
+@pytest.fixture
+def mem_helper(setup_config_file_fs, monkeypatch):
+    fs_manager = setup_config_file_fs
+    monkeypatch.setattr(helper, "_manager", fs_manager)
+    monkeypatch.setattr(helper, "_fs_cache", {})
+    monkeypatch.setattr(helper, "_fs_cache_loops", {})
+    monkeypatch.setattr(helper, "_active", None)
+    monkeypatch.setattr(helper, "_active_name", None)
+    mem_fs = fs_manager.construct_named_fs("TestsMemSource")
+    mem_fs.pipe("/helper/data.bin", bytes(range(256)) * 4)
+    yield mem_fs
+    mem_fs.rm("/helper", recursive=True)
+
+
+def test_request_bytes_preview(mem_helper, monkeypatch, tmp_path):
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    reads = []
+    cat_file = type(mem_helper).cat_file
+
+    def recording_cat_file(self, path, start=None, end=None, **kwargs):
+        reads.append((start, end))
+        return cat_file(self, path, start=start, end=end, **kwargs)
+
+    monkeypatch.setattr(type(mem_helper), "cat_file", recording_cat_file)
+
+    helper._request_bytes("TestsMemSource", "TestsMemSource/helper/data.bin")
+    out = helper.out
+    assert out.ok
+    assert out.length == 1024
+    assert out.preview == bytes(range(64))
+    assert "preview (total 1,024)" in repr(out)
+    # only the preview was read
+    assert reads == [(0, helper.HelperOutput.PREVIEW_LEN)]
+
+    assert out.value == bytes(range(256)) * 4
+    assert len(reads) == 2
+    assert out.value == bytes(range(256)) * 4
+    assert len(reads) == 2
+    # no debug files are left in the working directory
+    assert list(workdir.iterdir()) == []
+
+
+def test_request_bytes_errors(mem_helper):
+    helper._request_bytes("TestsMemSource", "TestsMemSource/helper/missing.bin")
+    assert not helper.out.ok
+    assert "FileNotFoundError" in helper.out.error
+    assert helper.out.length == -1
+
+    helper._request_bytes(
+        "TestsMemSource", "TestsMemSource/helper/data.bin", preview=False
+    )
+    assert helper.out.ok
+    assert helper.out.length == 1024
+
+
+def test_fs_instance_cache(mem_helper, setup_config_file_fs, monkeypatch):
+    fs_manager = setup_config_file_fs
+    constructed = []
+    construct_named_fs = fs_manager.construct_named_fs
+
+    def counting_construct_named_fs(fs_name, asynchronous=False):
+        constructed.append(fs_name)
+        return construct_named_fs(fs_name, asynchronous=asynchronous)
+
+    monkeypatch.setattr(fs_manager, "construct_named_fs", counting_construct_named_fs)
+    monkeypatch.setattr(
+        helper.FileSystemManager, "create_default", lambda **kwargs: fs_manager
+    )
+
+    mem_fs = helper.fs("TestsMemSource")
+    assert helper.work_on("TestsMemSource") is mem_fs
+    helper._request_bytes("TestsMemSource", "TestsMemSource/helper/data.bin")
+    assert helper.out.ok
+    assert constructed == ["TestsMemSource"]
+
+    # a changed source is constructed again
+    source = fs_manager.config["sources"][-1]
+    monkeypatch.setitem(source, "kwargs", {"skip_instance_cache": True})
+    helper.fs(source["name"])
+    helper.fs(source["name"])
+    monkeypatch.setitem(source, "kwargs", {})
+    helper.fs(source["name"])
+    assert constructed == ["TestsMemSource"] + [source["name"]] * 2
+
+    helper.reload()
+    helper.fs("TestsMemSource")
+    assert constructed[-1] == "TestsMemSource"
+    assert len(constructed) == 4
+
+    with pytest.raises(helper.JupyterFsspecException):
+        helper.fs("NoSuchSource")
+
+
+def test_upload(mem_helper):
+    data = bytes(range(256)) * 40
+    assert helper.upload(data, "TestsMemSource/helper/up/bytes", chunk_size=1000) == (
+        len(data)
+    )
+    assert mem_helper.cat_file("/helper/up/bytes") == data
+
+    view = memoryview(bytearray(data))[::2]
+    helper.upload(view, "TestsMemSource/helper/up/view", chunk_size=1000)
+    assert mem_helper.cat_file("/helper/up/view") == data[::2]
+
+    fileobj = io.BytesIO(data)
+    helper.upload(fileobj, "TestsMemSource/helper/up/file", chunk_size=1000)
+    assert mem_helper.cat_file("/helper/up/file") == data
+
+    with pytest.raises(helper.JupyterFsspecException):
+        helper.upload(io.StringIO("text"), "TestsMemSource/helper/up/text")
+    with pytest.raises(helper.JupyterFsspecException):
+        helper.upload("text", "TestsMemSource/helper/up/text")
+    with pytest.raises(helper.JupyterFsspecException):
+        helper.upload(data, "NoSuchSource/file")
+
+
+def test_user_data_tempfiles(monkeypatch):
+    monkeypatch.setattr(helper, "_user_data_tempfiles", set())
+    monkeypatch.setattr(helper, "_user_data", None)
+    helper.set_user_data(b"first")
+    first = helper._get_user_data_tempfile_path()
+    helper.set_user_data(b"second")
+    second = helper._get_user_data_tempfile_path()
+    # an upload in progress keeps its own file
+    assert first != second
+    with open(first, "rb") as f:
+        assert f.read() == b"first"
+
+    helper._remove_user_data_tempfile(first)
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+    # only the helper's own files are removed
+    helper._remove_user_data_tempfile(__file__)
+    assert os.path.exists(__file__)
+
+    helper._remove_user_data_tempfiles()
+    assert not os.path.exists(second)
+    assert helper._user_data_tempfiles == set()
+
+
+def test_upload_async_backend(setup_config_file_fs, s3_client, monkeypatch):
+    monkeypatch.setattr(helper, "_manager", setup_config_file_fs)
+    monkeypatch.setattr(helper, "_fs_cache", {})
+    data = b"0123456789" * 1000
+    try:
+        helper.upload(data, "TestSourceAWS/uploaded.bin", chunk_size=1024)
+        obj = s3_client.get_object(Bucket="my-test-bucket", Key="uploaded.bin")
+        assert obj["Body"].read() == data
+    finally:
+        # the bucket is shared with the API tests listing it
+        s3_client.delete_object(Bucket="my-test-bucket", Key="uploaded.bin")
+
+
+def test_upload_arrays(mem_helper):
+    np = pytest.importorskip("numpy")
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    array = np.arange(1000, dtype="float64").reshape(10, 100)
+    helper.upload(array, "TestsMemSource/helper/up/array.bin", chunk_size=1000)
+    assert mem_helper.cat_file("/helper/up/array.bin") == array.tobytes()
+    helper.upload(array.T, "TestsMemSource/helper/up/transposed.bin")
+    assert mem_helper.cat_file("/helper/up/transposed.bin") == array.T.tobytes()
+
+    table = pa.table({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    helper.upload(table, "TestsMemSource/helper/up/table.parquet")
+    with mem_helper.open("/helper/up/table.parquet", "rb") as f:
+        assert pq.read_table(f).equals(table)
+    helper.upload(table, "TestsMemSource/helper/up/table.arrow")
+    with mem_helper.open("/helper/up/table.arrow", "rb") as f:
+        assert pa.ipc.open_file(f).read_all().equals(table)
+
+
+async def test_async_api(mem_helper):
+    with pytest.raises(helper.JupyterFsspecException):
+        await helper.acat("/helper/data.bin")
+
+    helper.work_on("TestsMemSource")
+    paths = [f"/helper/async/file{i}" for i in range(20)]
+    mem_helper.pipe({path: path.encode() for path in paths})
+
+    out = await asyncio.gather(*(helper.acat(path) for path in paths))
+    assert out == [path.encode() for path in paths]
+    assert await helper.acat(paths[:2]) == {path: path.encode() for path in paths[:2]}
+    assert await helper.acat("/helper/data.bin", start=1, end=3) == b"\x01\x02"
+
+    names = await helper.als("/helper/async", detail=False)
+    assert sorted(name.strip("/") for name in names) == sorted(
+        path.strip("/") for path in paths
+    )
+    infos = await asyncio.gather(*(helper.ainfo(path) for path in paths))
+    assert [info["size"] for info in infos] == [len(path) for path in paths]
+
+    async with await helper.aopen("/helper/async/new", "wb") as f:
+        await f.write(b"async ")
+        await f.write(b"write")
+    async with await helper.aopen("/helper/async/new") as f:
+        f.seek(6)
+        assert await f.read() == b"write"
+    assert mem_helper.cat_file("/helper/async/new") == b"async write"
+
+    # one async instance per event loop
+    assert helper._get_active_async() is helper._get_active_async()
+
+
+def test_async_instances_per_loop(mem_helper):
+    helper.work_on("TestsMemSource")
+
+    async def get_async():
+        return helper._get_active_async()
+
+    first = asyncio.run(get_async())
+    second = asyncio.run(get_async())
+    assert second is not first
+    # the instance of the closed loop was dropped
+    async_instances = [fs for key, fs in helper._fs_cache.items() if key[1]]
+    assert async_instances == [second]
+    assert len(helper._fs_cache_loops) == 1
+
+
+def test_iter_files(mem_helper, monkeypatch):
+    helper.work_on("TestsMemSource")
+    paths = [f"/helper/iter/file{i:02}" for i in range(12)]
+    mem_helper.pipe({path: path.encode() * 10 for path in paths})
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+    cat_file = type(mem_helper).cat_file
+
+    def slow_cat_file(self, path, *args, **kwargs):
+        with lock:
+            active.append(path)
+            peak.append(len(active))
+        time.sleep(0.02)
+        try:
+            return cat_file(self, path, *args, **kwargs)
+        finally:
+            with lock:
+                active.remove(path)
+
+    monkeypatch.setattr(type(mem_helper), "cat_file", slow_cat_file)
+
+    out = list(helper.iter_files(paths, prefetch=4))
+    assert out == [(path, path.encode() * 10) for path in paths]
+    assert max(peak) == 4
+
+    # each file is 190 bytes, only two fit in the budget
+    peak.clear()
+    out = []
+    for path, data in helper.iter_files(
+        "/helper/iter/file*", prefetch=4, max_bytes=400
+    ):
+        # the file being processed counts in the budget
+        assert (len(peak) - len(out)) * 190 <= 400
+        out.append((path, data))
+    assert [path.strip("/") for path, _ in out] == [path.strip("/") for path in paths]
+    assert max(peak) == 2
+
+    # without a listing, the size of the files read so far is the estimate
+    peak.clear()
+    assert len(list(helper.iter_files(paths, prefetch=4, max_bytes=400))) == 12
+    assert max(peak) == 2
+
+    # a file larger than the budget is read on its own
+    peak.clear()
+    assert len(list(helper.iter_files(paths[:3], max_bytes=10))) == 3
+    assert max(peak) == 1
+
+    # stopping early does not read the rest of the files
+    peak.clear()
+    files = helper.iter_files(paths, prefetch=2)
+    assert next(files)[0] == paths[0]
+    files.close()
+    time.sleep(0.1)
+    assert len(peak) <= 3
+
+    files = helper.iter_files([paths[0], "/helper/iter/missing", paths[1]])
+    assert next(files)[0] == paths[0]
+    with pytest.raises(FileNotFoundError):
+        next(files)
+
+
+def test_read_table(mem_helper):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    table = pa.table({"id": list(range(100)), "name": [str(i) for i in range(100)]})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=10)
+    mem_helper.pipe("/helper/tables/data.parquet", buffer.getvalue())
+
+    out = helper.read_table(
+        "TestsMemSource/helper/tables/data.parquet",
+        columns=["id"],
+        filters=[("id", ">=", 95)],
+    )
+    assert out.column_names == ["id"]
+    assert out.column("id").to_pylist() == [95, 96, 97, 98, 99]
+
+    helper.upload(table.slice(0, 2), "TestsMemSource/helper/ds/part=a/f.parquet")
+    helper.upload(table.slice(2, 1), "TestsMemSource/helper/ds/part=b/f.parquet")
+    out = helper.read_table("TestsMemSource/helper/ds", filters=[("part", "=", "b")])
+    assert out.to_pydict() == {"id": [2], "name": ["2"], "part": ["b"]}
+
+    helper.upload(table.slice(0, 3), "TestsMemSource/helper/tables/data.csv")
+    out = helper.read_table("TestsMemSource/helper/tables/data.csv", columns=["name"])
+    assert out.column("name").to_pylist() == [0, 1, 2]
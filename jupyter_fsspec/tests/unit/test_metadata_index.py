@@ -0,0 +1,68 @@
+import threading
+
+import fsspec
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+
+from jupyter_fsspec.metadata_index import MetadataIndex
+
+
+async def test_crawl_and_query(tmp_path):
+    mem_fs = fsspec.filesystem("memory")
+    mem_fs.pipe("index_root/a.txt", b"a")
+    mem_fs.pipe("index_root/sub/b.txt", b"bbb")
+    mem_fs.pipe("index_root/sub/c.csv", b"cc")
+    fs = AsyncFileSystemWrapper(mem_fs)
+
+    index = MetadataIndex(str(tmp_path / "index.sqlite"))
+    assert index.is_stale()
+
+    def to_relative(name):
+        return name.lstrip("/")[len("index_root/") :]
+
+    count = await index.crawl(fs, "index_root", to_relative)
+    assert count == 4
+    assert not index.is_stale()
+
+    children = await index.query("")
+    assert [entry["name"] for entry in children] == ["a.txt", "sub"]
+    assert children[1]["type"] == "directory"
+
+    by_size = await index.query("", sort="size", descending=True, recursive=True)
+    assert [entry["name"] for entry in by_size][:3] == [
+        "sub/b.txt",
+        "sub/c.csv",
+        "a.txt",
+    ]
+    assert [entry["name"] for entry in await index.query("sub", pattern="*.csv")] == [
+        "sub/c.csv"
+    ]
+
+    # entries that disappeared from the backend are dropped by the next crawl
+    mem_fs.rm("index_root/sub", recursive=True)
+    await index.crawl(fs, "index_root", to_relative)
+    assert [entry["name"] for entry in await index.query("", recursive=True)] == [
+        "a.txt"
+    ]
+
+    # the index persists across instances
+    index.close()
+    reopened = MetadataIndex(str(tmp_path / "index.sqlite"))
+    assert [entry["name"] for entry in await reopened.query("")] == ["a.txt"]
+    reopened.close()
+    mem_fs.rm("index_root", recursive=True)
+
+
+async def test_database_work_runs_off_the_event_loop(tmp_path):
+    index = MetadataIndex(str(tmp_path / "index.sqlite"))
+    threads = []
+    execute = index._upsert
+
+    def record_thread(entries):
+        threads.append(threading.get_ident())
+        return execute(entries)
+
+    index._upsert = record_thread
+    assert await index.upsert([("a.txt", {"type": "file", "size": 1})]) == 1
+    assert threads and threads[0] != threading.get_ident()
+    assert [entry["name"] for entry in await index.query("")] == ["a.txt"]
+    index.close()
@@ -0,0 +1,28 @@
+import codecs
+
+from jupyter_fsspec.preview import build_preview, sniff_encoding, sniff_mime_type
+
+
+def test_sniff_encoding():
+    assert sniff_encoding("héllo".encode("utf-8")) == "utf-8"
+    # multi-byte character cut off by a partial read
+    assert sniff_encoding("héllo".encode("utf-8")[:2], partial=True) == "utf-8"
+    assert sniff_encoding(codecs.BOM_UTF16_LE + "hi".encode("utf-16-le")) == "utf-16"
+    assert sniff_encoding("café".encode("latin-1")) == "latin-1"
+    assert sniff_encoding(b"\x00\x01\x02\x03") is None
+
+
+def test_sniff_mime_type():
+    assert (
+        sniff_mime_type(b"PAR1\x00\x00", "data.bin") == "application/vnd.apache.parquet"
+    )
+    assert sniff_mime_type(b"a,b\n1,2\n", "data.csv", "utf-8") == "text/csv"
+    assert sniff_mime_type(b"plain", "README", "utf-8") == "text/plain"
+    assert sniff_mime_type(b"\x00\x01", "blob") == "application/octet-stream"
+
+
+def test_build_preview_truncated_text():
+    data = "naïve".encode("utf-8")[:3]
+    preview = build_preview(data, "notes.txt", size=100)
+    assert preview["truncated"]
+    assert preview["text"] == "na"
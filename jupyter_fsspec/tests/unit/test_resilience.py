@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from jupyter_fsspec.models import RetryConfig
+from jupyter_fsspec.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientFileSystem,
+)
+
+
+class FlakyFileSystem:
+    """Fails the first ``failures`` calls of each operation."""
+
+    async_impl = True
+
+    def __init__(self, failures, error=ConnectionResetError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def _info(self, path):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("connection reset by peer")
+        return {"name": path, "type": "file", "size": 0}
+
+    async def _rm_file(self, path):
+        self.calls += 1
+        raise ConnectionResetError("connection reset by peer")
+
+
+def resilient(fs, **retry):
+    config = RetryConfig(backoff=0, **retry)
+    breaker = CircuitBreaker(
+        "flaky",
+        failure_threshold=config.failure_threshold,
+        reset_timeout=config.reset_timeout,
+    )
+    return ResilientFileSystem(fs, config, breaker)
+
+
+async def test_idempotent_operations_are_retried():
+    fs = resilient(FlakyFileSystem(failures=2), attempts=3)
+
+    assert (await fs._info("a"))["name"] == "a"
+    assert fs.fs.calls == 3
+    assert fs.breaker.state == "closed"
+    # attributes other than async operations are forwarded unchanged
+    assert fs.async_impl is True
+
+
+async def test_mutations_and_permanent_errors_are_not_retried():
+    fs = resilient(FlakyFileSystem(failures=5), attempts=3)
+    with pytest.raises(ConnectionResetError):
+        await fs._rm_file("a")
+    assert fs.fs.calls == 1
+
+    fs = resilient(FlakyFileSystem(failures=5, error=FileNotFoundError))
+    with pytest.raises(FileNotFoundError):
+        await fs._info("a")
+    assert fs.fs.calls == 1
+    assert fs.breaker.failures == 0
+
+
+async def test_circuit_opens_and_probes_for_recovery():
+    fs = resilient(
+        FlakyFileSystem(failures=2), attempts=1, failure_threshold=2, reset_timeout=60
+    )
+    for _ in range(2):
+        with pytest.raises(ConnectionResetError):
+            await fs._info("a")
+    assert fs.breaker.state == "open"
+
+    # fails fast without calling the backend
+    with pytest.raises(CircuitOpenError):
+        await fs._info("a")
+    assert fs.fs.calls == 2
+
+    # once the timeout passed, one probe is let through and closes the circuit
+    fs.breaker.opened_at = time.monotonic() - 60
+    assert fs.breaker.state == "half-open"
+    assert (await fs._info("a"))["name"] == "a"
+    assert fs.breaker.state == "closed"
+
+
+def test_only_the_probe_releases_the_half_open_circuit():
+    breaker = CircuitBreaker("flaky", failure_threshold=1, reset_timeout=0)
+    # started while the circuit was closed
+    ordinary = breaker.before_call()
+    assert ordinary is None
+    breaker.record_failure()
+
+    probe = breaker.before_call()
+    assert probe is not None
+    # the ordinary call being cancelled or failing late leaves the probe slot taken
+    breaker.release(ordinary)
+    breaker.record_failure(ordinary)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.release(probe)
+    assert breaker.before_call() is not None
@@ -0,0 +1,77 @@
+import io
+
+import fsspec
+import pytest
+
+from jupyter_fsspec.tabular import (
+    detect_format,
+    read_csv_preview,
+    read_jsonl_preview,
+    tabular_preview,
+)
+
+
+def test_detect_format():
+    assert detect_format("data/part-0.parquet") == "parquet"
+    assert detect_format("table.FEATHER") == "arrow"
+    assert detect_format("rows.tsv") == "csv"
+    assert detect_format("events.ndjson") == "jsonl"
+    assert detect_format("notes.txt") is None
+
+
+def test_read_csv_preview_drops_partial_line():
+    data = b"id,name,score\n1,a,0.5\n2,b,1.5\n3,c,2"
+    preview = read_csv_preview(data, truncated=True, rows=10)
+    assert preview["schema"] == [
+        {"name": "id", "type": "int64"},
+        {"name": "name", "type": "string"},
+        {"name": "score", "type": "double"},
+    ]
+    assert preview["rows"] == [
+        {"id": "1", "name": "a", "score": "0.5"},
+        {"id": "2", "name": "b", "score": "1.5"},
+    ]
+
+    preview = read_csv_preview(data, truncated=False, rows=1, columns=["name"])
+    assert preview["schema"] == [{"name": "name", "type": "string"}]
+    assert preview["rows"] == [{"name": "a"}]
+
+
+def test_read_jsonl_preview():
+    data = b'{"a": 1, "b": null}\n{"a": 2, "b": "x"}\n{"a": 3, "b'
+    preview = read_jsonl_preview(data, truncated=True, rows=10)
+    assert preview["schema"] == [
+        {"name": "a", "type": "int"},
+        {"name": "b", "type": "str"},
+    ]
+    assert preview["rows"] == [{"a": 1, "b": None}, {"a": 2, "b": "x"}]
+
+
+async def test_parquet_preview_reads_footer_and_first_row_group():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    num_rows = 200000
+    table = pa.table(
+        {"id": list(range(num_rows)), "label": [f"row-{i}" for i in range(num_rows)]}
+    )
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=10000)
+    data = buffer.getvalue()
+
+    fs = fsspec.filesystem("memory")
+    fs.pipe("/tabular_test/data.parquet", data)
+    try:
+        preview = await tabular_preview(
+            fs, "/tabular_test/data.parquet", len(data), "parquet", rows=5
+        )
+    finally:
+        fs.rm("/tabular_test", recursive=True)
+
+    assert preview["num_rows"] == num_rows
+    assert preview["num_row_groups"] == 20
+    assert [field["name"] for field in preview["schema"]] == ["id", "label"]
+    assert preview["rows"] == [{"id": i, "label": f"row-{i}"} for i in range(5)]
+    first_id_stats = preview["row_groups"][0]["columns"][0]
+    assert (first_id_stats["min"], first_id_stats["max"]) == (0, 9999)
+    assert preview["bytes_read"] < len(data) / 4
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import fsspec
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+
+from jupyter_fsspec.watcher import (
+    ChangeFeed,
+    ListingVersions,
+    PathWatch,
+    diff_snapshots,
+    listing_snapshot,
+    start_local_observer,
+)
+
+
+def test_diff_snapshots():
+    old = listing_snapshot(
+        [
+            {"name": "/dir/kept.txt", "type": "file", "size": 1},
+            {"name": "/dir/changed.txt", "type": "file", "size": 1},
+            {"name": "/dir/removed.txt", "type": "file", "size": 1},
+        ]
+    )
+    new = listing_snapshot(
+        [
+            {"name": "/dir/kept.txt", "type": "file", "size": 1},
+            {"name": "/dir/changed.txt", "type": "file", "size": 2},
+            {"name": "/dir/added/", "type": "directory", "size": 0},
+        ]
+    )
+
+    changes = {(change, entry["name"]) for change, entry in diff_snapshots(old, new)}
+    assert changes == {
+        ("modified", "/dir/changed.txt"),
+        ("added", "/dir/added/"),
+        ("removed", "/dir/removed.txt"),
+    }
+
+
+async def test_change_feed_polls_and_wakes():
+    fs = AsyncFileSystemWrapper(fsspec.filesystem("memory"))
+    await fs._pipe_file("/watcher_test/existing.txt", b"data")
+    feed = ChangeFeed(poll_interval=0.05)
+    received = asyncio.Queue()
+
+    try:
+        feed.subscribe("src", fs, "memory://watcher_test/", received.put_nowait)
+        await asyncio.sleep(0.01)
+
+        # changes made behind the server's back are found by polling
+        await fs._pipe_file("/watcher_test/external.txt", b"data")
+        changes = await asyncio.wait_for(received.get(), 1)
+        assert [(c, e["name"]) for c, e in changes] == [
+            ("added", "/watcher_test/external.txt")
+        ]
+
+        # notified changes are listed at once, well before the next poll
+        feed.poll_interval = 60
+        feed.unsubscribe("src", fs, "/watcher_test", received.put_nowait)
+        feed.subscribe("src", fs, "/watcher_test", received.put_nowait)
+        await asyncio.sleep(0.01)
+        await fs._rm_file("/watcher_test/existing.txt")
+        feed.notify("src", fs, "/watcher_test/existing.txt")
+        changes = await asyncio.wait_for(received.get(), 1)
+        assert [(c, e["name"]) for c, e in changes] == [
+            ("removed", "/watcher_test/existing.txt")
+        ]
+    finally:
+        feed.close()
+        await asyncio.sleep(0)
+        fsspec.filesystem("memory").rm("/watcher_test", recursive=True)
+
+
+async def test_path_watch_first_listing_fails():
+    fs = AsyncFileSystemWrapper(fsspec.filesystem("memory"))
+    await fs._pipe_file("/watcher_test/existing.txt", b"data")
+    ls = fs._ls
+    failures = [ConnectionError("unreachable")]
+
+    async def flaky_ls(path, **kwargs):
+        if failures:
+            raise failures.pop()
+        return await ls(path, **kwargs)
+
+    fs._ls = flaky_ls
+    watch = PathWatch(fs, "/watcher_test", poll_interval=0.05)
+    received = asyncio.Queue()
+    watch.subscribers.add(received.put_nowait)
+
+    try:
+        watch.start()
+        await asyncio.sleep(0.1)
+        # the watch outlives a failed first listing and reports later changes
+        assert not failures
+        assert not watch._task.done()
+        await fs._pipe_file("/watcher_test/added.txt", b"data")
+        watch.wake()
+        changes = await asyncio.wait_for(received.get(), 1)
+        assert [(c, e["name"]) for c, e in changes] == [
+            ("added", "/watcher_test/added.txt")
+        ]
+    finally:
+        watch.stop()
+        await asyncio.sleep(0)
+        fsspec.filesystem("memory").rm("/watcher_test", recursive=True)
+
+
+def test_listing_versions():
+    versions = ListingVersions(max_entries=4)
+    old = listing_snapshot(
+        [
+            {"name": "/dir/a.txt", "type": "file", "size": 1, "mtime": 1},
+            {"name": "/dir/b.txt", "type": "file", "size": 1, "mtime": 1},
+        ]
+    )
+    token = versions.add("src", "/dir", old)
+
+    new = listing_snapshot(
+        [
+            {"name": "/dir/a.txt", "type": "file", "size": 1, "mtime": 1},
+            {"name": "/dir/b.txt", "type": "file", "size": 2, "mtime": 2},
+        ]
+    )
+    changes = versions.changes_since("src", "/dir", token, new)
+    assert [(change, entry["name"]) for change, entry in changes] == [
+        ("modified", "/dir/b.txt")
+    ]
+    # tokens are only valid for the listing they were issued for
+    assert versions.changes_since("src", "/other", token, new) is None
+
+    # a new listing of the directory replaces the previous token
+    new_token = versions.add("src", "/dir", new)
+    assert versions.changes_since("src", "/dir", token, new) is None
+    assert versions.changes_since("src", "/dir", new_token, new) == []
+    assert len(versions._listings) == 1
+
+    # older listings are dropped beyond the entry limit
+    versions.add("src", "/other", old)
+    assert versions.changes_since("src", "/dir", new_token, new) is None
+
+
+def test_local_observer_only_for_local_protocols():
+    for protocol in ("dbfs", ("memory",), ["s3", "s3a"]):
+        watch = SimpleNamespace(
+            fs_instance=SimpleNamespace(protocol=protocol), path="/"
+        )
+        assert start_local_observer(watch) is None
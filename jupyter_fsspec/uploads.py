@@ -0,0 +1,133 @@
+"""Uploads of large files sent to the server in a sequence of chunks"""
+
+import asyncio
+import logging
+import secrets
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# Block size of the backend file, the smallest part size of S3 multipart uploads
+UPLOAD_BLOCK_SIZE = 5 * 2**20
+
+
+class UploadOffsetError(ValueError):
+    """Raised when a chunk does not continue an upload where it stands."""
+
+
+class ChunkedUpload:
+    """A file received chunk by chunk, written to the backend as chunks arrive.
+
+    The file is opened in ``"wb"`` mode on a synchronous instance of the source,
+    so backends such as S3 send each full ``UPLOAD_BLOCK_SIZE`` block as a part of
+    a multipart upload while later chunks are still being received, and only a
+    block is buffered on the server. The blocking file calls run in the default executor. ``commit``
+    closes the file, writing its last block. The file is written in place, an
+    existing file at ``path`` is replaced from the first chunk on and an aborted
+    upload removes what was written.
+    """
+
+    def __init__(self, key, path, fs):
+        self.key = key
+        self.path = path
+        self.id = secrets.token_urlsafe(16)
+        self.size = 0
+        self.updated = time.monotonic()
+        self._fs = fs
+        self._file = None
+        self._done = False
+        self._lock = asyncio.Lock()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _write(self, data):
+        if self._file is None:
+            self._file = self._fs.open(self.path, "wb", block_size=UPLOAD_BLOCK_SIZE)
+        self._file.write(data)
+
+    def _abort(self):
+        if self._file is None:
+            return
+        self._file.close()
+        try:
+            self._fs.rm_file(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def write(self, offset, data):
+        """Append ``data``, which must start at byte ``offset`` of the file."""
+        async with self._lock:
+            if self._done:
+                raise UploadOffsetError("The upload is already finished")
+            if offset + len(data) == self.size and offset < self.size:
+                # A retried chunk that was already received
+                return self.size
+            if offset != self.size:
+                raise UploadOffsetError(
+                    f"Chunk at offset {offset} does not continue the upload "
+                    f"at offset {self.size}"
+                )
+            await self._run(self._write, data)
+            self.size += len(data)
+            self.updated = time.monotonic()
+            return self.size
+
+    async def commit(self):
+        """Finish writing the file, its last block is sent to the backend."""
+        async with self._lock:
+            # An empty upload still creates the file
+            await self._run(self._write, b"")
+            await self._run(self._file.close)
+            self._done = True
+
+    async def discard(self):
+        """Abort an upload that was not committed, removing the partial file."""
+        async with self._lock:
+            if self._done:
+                return
+            self._done = True
+            try:
+                await self._run(self._abort)
+            except Exception as e:
+                logger.warning(f"Failed to remove aborted upload of '{self.path}': {e}")
+
+
+class UploadRegistry:
+    """Chunked uploads in progress, by upload id.
+
+    Uploads not written to for ``max_idle`` seconds are abandoned, their
+    partial files removed when the next upload starts.
+    """
+
+    def __init__(self, max_idle=3600):
+        self.max_idle = max_idle
+        self._uploads = {}
+
+    async def start(self, key, path, fs):
+        """Start an upload to ``path`` of the synchronous filesystem ``fs``."""
+        await self.expire()
+        upload = ChunkedUpload(key, path, fs)
+        self._uploads[upload.id] = upload
+        return upload
+
+    def get(self, upload_id, key, path):
+        upload = self._uploads.get(upload_id)
+        if upload is None or (upload.key, upload.path) != (key, path):
+            raise KeyError(f"No upload in progress with id: {upload_id}")
+        return upload
+
+    async def finish(self, upload_id):
+        """Forget an upload that was committed or aborted."""
+        upload = self._uploads.pop(upload_id, None)
+        if upload is not None:
+            await upload.discard()
+
+    async def expire(self):
+        deadline = time.monotonic() - self.max_idle
+        for upload_id, upload in list(self._uploads.items()):
+            if upload.updated < deadline:
+                logger.info(f"Abandoning idle upload of '{upload.path}'")
+                await self.finish(upload_id)
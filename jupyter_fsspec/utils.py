@@ -1,24 +1,208 @@
 import base64
+import datetime
+import json
 import re
+import struct
+from collections import OrderedDict
 
 
 def parse_range(range_header):
+    """Parse a ``start-end`` range header, ``end`` being exclusive and optional."""
     if not range_header:
         return None, None  # TODO: No range specified
 
-    match = re.match(r"(\d+)-(\d+)?", range_header)
+    match = re.match(r"(\d+)-(\d+)?$", range_header.strip())
     if not match:
         raise ValueError("Invalid Range header format")
 
     start = int(match.group(1))
-    end = int(match.group(2))
-
-    if end is None:
-        end = None  # TODO: set upper limit to file size
+    # An open range reads to the end of the file
+    end = int(match.group(2)) if match.group(2) is not None else None
 
     return start, end
 
 
+_GLOB_SPECIAL = "*?["
+_REGEX_SPECIAL = ".^$*+?{}[]\\|()"
+
+
+def glob_literal_prefix(pattern):
+    """Return the literal part of a glob pattern before its first wildcard."""
+    for i, char in enumerate(pattern):
+        if char in _GLOB_SPECIAL:
+            return pattern[:i]
+    return pattern
+
+
+def _has_top_level_alternation(pattern):
+    """Whether a regex has a ``|`` outside of groups and character classes."""
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def regex_literal_prefix(pattern):
+    """Return the literal characters an anchored regex pattern must start with."""
+    if not pattern.startswith("^") or _has_top_level_alternation(pattern):
+        # With alternatives, e.g. ^logs/a|other, no prefix is shared by all matches
+        return ""
+    prefix = []
+    for i, char in enumerate(pattern[1:], start=1):
+        if char in _REGEX_SPECIAL:
+            # A quantifier applies to the previous character, drop it
+            if char in "*?{" and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    return "".join(prefix)
+
+
+def split_literal_prefix(literal):
+    """Split a literal path prefix into its directory and trailing name prefix."""
+    directory, _, name_prefix = literal.rpartition("/")
+    return directory, name_prefix
+
+
+_MTIME_KEYS = ("mtime", "LastModified", "last_modified", "updated", "created")
+
+
+def info_mtime(info):
+    """Return the modification time of an fsspec info dict as a POSIX timestamp."""
+    for key in _MTIME_KEYS:
+        value = info.get(key)
+        if value is None:
+            continue
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return value.timestamp()
+        if isinstance(value, str):
+            try:
+                return datetime.datetime.fromisoformat(value).timestamp()
+            except ValueError:
+                continue
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def info_etag(info):
+    """Return a version tag for an fsspec info dict, changing whenever the content does."""
+    for key in ("ETag", "etag", "md5", "checksum"):
+        if info.get(key):
+            return str(info[key]).strip('"')
+    return f"{info.get('size')}-{info_mtime(info)}"
+
+
+class LRUCache:
+    """Mapping that evicts least recently used items beyond ``maxsize``.
+
+    The size of each value is given by ``getsizeof`` (1 per item by default),
+    so the cache can be bounded by item count or by total bytes.
+    """
+
+    def __init__(self, maxsize, getsizeof=None):
+        self.maxsize = maxsize
+        self.getsizeof = getsizeof or (lambda value: 1)
+        self.currsize = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key, value):
+        size = self.getsizeof(value)
+        if size > self.maxsize:
+            # Never worth evicting everything else for
+            self.pop(key)
+            return
+        self.pop(key)
+        self._data[key] = value
+        self._sizes[key] = size
+        self.currsize += size
+        while self.currsize > self.maxsize:
+            oldest = next(iter(self._data))
+            self.pop(oldest)
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+        self.currsize -= self._sizes.pop(key)
+        return self._data.pop(key)
+
+    def keys(self):
+        return list(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+        self.currsize = 0
+
+
+# Results of a batched read are each sent as a kind byte, a length and a payload
+FRAME_HEADER = struct.Struct(">BQ")
+FRAME_DATA = 0
+FRAME_ERROR = 1
+
+
+def encode_frame(result):
+    """Frame one result of a batched read, its bytes or the exception reading it."""
+    if isinstance(result, Exception):
+        payload = json.dumps(
+            {"error": type(result).__name__, "description": str(result)}
+        ).encode()
+        return FRAME_HEADER.pack(FRAME_ERROR, len(payload)), payload
+    return FRAME_HEADER.pack(FRAME_DATA, len(result)), result
+
+
+def decode_frames(body):
+    """Split a batched read response into its results, bytes or error dicts."""
+    out = []
+    offset = 0
+    view = memoryview(body)
+    while offset < len(body):
+        kind, length = FRAME_HEADER.unpack_from(body, offset)
+        offset += FRAME_HEADER.size
+        payload = bytes(view[offset : offset + length])
+        if len(payload) != length:
+            raise ValueError("Truncated batched read response")
+        offset += length
+        out.append(json.loads(payload) if kind == FRAME_ERROR else payload)
+    return out
+
+
 def load_image_as_base64(image_path):
     """Reads an image file and encodes it as a Base64 string."""
     with open(image_path, "rb") as img_file:
@@ -0,0 +1,210 @@
+"""Change notifications for watched directories of filesystem sources"""
+
+import asyncio
+import logging
+import secrets
+
+from jupyter_fsspec.utils import LRUCache, info_etag
+
+
+logger = logging.getLogger(__name__)
+
+
+def listing_snapshot(entries):
+    """Map the names of a detailed listing to their entries."""
+    return {entry["name"].rstrip("/"): entry for entry in entries}
+
+
+def diff_snapshots(old, new):
+    """Return ``(change, entry)`` pairs turning listing ``old`` into ``new``."""
+    changes = []
+    for name, entry in new.items():
+        previous = old.get(name)
+        if previous is None:
+            changes.append(("added", entry))
+        elif previous.get("type") != entry.get("type") or info_etag(
+            previous
+        ) != info_etag(entry):
+            changes.append(("modified", entry))
+    for name, entry in old.items():
+        if name not in new:
+            changes.append(("removed", entry))
+    return changes
+
+
+class ListingVersions:
+    """The directory listing last sent to clients for each path, with its token.
+
+    Only the name, type and version tag of each entry is kept, so a later
+    listing of the same directory can be sent as the changes since a token.
+    A new listing of a directory replaces its previous one and token. At most
+    ``max_entries`` entries are kept over all listings, the least recently
+    used listings are dropped first.
+    """
+
+    def __init__(self, max_entries=50_000):
+        self._listings = LRUCache(
+            max_entries, getsizeof=lambda listing: len(listing[1]) + 1
+        )
+
+    def add(self, key, path, snapshot):
+        """Store ``snapshot`` of ``path`` in source ``key`` and return its token."""
+        token = secrets.token_urlsafe(12)
+        compact = {
+            name: {
+                "name": entry["name"],
+                "type": entry.get("type"),
+                "etag": info_etag(entry),
+            }
+            for name, entry in snapshot.items()
+        }
+        self._listings.set((key, path), (token, compact))
+        return token
+
+    def changes_since(self, key, path, token, snapshot):
+        """Return the changes turning listing ``token`` into ``snapshot``.
+
+        Returns None when the token is unknown, e.g. replaced by a newer listing,
+        evicted or issued for another directory, and the full listing has to be
+        sent instead.
+        """
+        listing = self._listings.get((key, path))
+        if listing is None or listing[0] != token:
+            return None
+        return diff_snapshots(listing[1], snapshot)
+
+
+class PathWatch:
+    """Relists one directory of a source and reports what changed to subscribers.
+
+    The directory is listed every ``poll_interval`` seconds, or as soon as
+    ``wake`` is called, e.g. by a change made through the server or by a
+    filesystem observer of a local source.
+    """
+
+    def __init__(self, fs_instance, path, poll_interval):
+        self.fs_instance = fs_instance
+        self.path = path
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self._wake = asyncio.Event()
+        self._task = None
+        self._observer = None
+
+    async def _snapshot(self):
+        try:
+            entries = await self.fs_instance._ls(self.path, detail=True, refresh=True)
+        except FileNotFoundError:
+            entries = []
+        return listing_snapshot(
+            entry for entry in entries if entry["name"].rstrip("/") != self.path
+        )
+
+    async def _run(self):
+        # Changes are reported from the first listing that succeeds
+        snapshot = None
+        while True:
+            try:
+                new_snapshot = await self._snapshot()
+            except Exception as e:
+                logger.warning(f"Failed to list watched path '{self.path}': {e}")
+            else:
+                changes = (
+                    diff_snapshots(snapshot, new_snapshot)
+                    if snapshot is not None
+                    else []
+                )
+                snapshot = new_snapshot
+                if changes:
+                    for callback in list(self.subscribers):
+                        callback(changes)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+        self._observer = start_local_observer(self)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._observer is not None:
+            self._observer.stop()
+
+
+def start_local_observer(watch):
+    """Wake ``watch`` on OS file events of a local directory, if watchdog is installed."""
+    protocol = watch.fs_instance.protocol
+    protocols = protocol if isinstance(protocol, (tuple, list)) else (protocol,)
+    if not any(p in ("file", "local") for p in protocols):
+        return None
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    loop = asyncio.get_running_loop()
+
+    class WakeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            loop.call_soon_threadsafe(watch.wake)
+
+    observer = Observer()
+    try:
+        observer.schedule(WakeHandler(), watch.path, recursive=False)
+        observer.start()
+    except OSError as e:
+        logger.debug(f"Not observing '{watch.path}', polling instead: {e}")
+        return None
+    return observer
+
+
+class ChangeFeed:
+    """Shared directory watches of all sources, keyed by ``(source, path)``."""
+
+    def __init__(self, poll_interval=10):
+        self.poll_interval = poll_interval
+        self._watches = {}
+
+    def subscribe(self, key, fs_instance, path, callback):
+        path = fs_instance._strip_protocol(path).rstrip("/")
+        watch = self._watches.get((key, path))
+        if watch is None:
+            watch = self._watches[(key, path)] = PathWatch(
+                fs_instance, path, self.poll_interval
+            )
+            watch.start()
+        watch.subscribers.add(callback)
+
+    def unsubscribe(self, key, fs_instance, path, callback):
+        path = fs_instance._strip_protocol(path).rstrip("/")
+        watch = self._watches.get((key, path))
+        if watch is None:
+            return
+        watch.subscribers.discard(callback)
+        if not watch.subscribers:
+            watch.stop()
+            del self._watches[(key, path)]
+
+    def notify(self, key, fs_instance, *paths):
+        """Relist watches that changes to the given paths may affect."""
+        for path in paths:
+            path = fs_instance._strip_protocol(path).rstrip("/")
+            parent = fs_instance._parent(path).rstrip("/")
+            for (watch_key, watch_path), watch in self._watches.items():
+                if watch_key == key and (
+                    watch_path in (path, parent) or watch_path.startswith(path + "/")
+                ):
+                    watch.wake()
+
+    def close(self):
+        for watch in self._watches.values():
+            watch.stop()
+        self._watches.clear()
@@ -0,0 +1,199 @@
+import { URLExt } from '@jupyterlab/coreutils';
+import { ServerConnection } from '@jupyterlab/services';
+import { Logger } from '../logger';
+
+/**
+ * Headers the server accepts from a channel frame
+ */
+const FRAME_HEADERS = ['content-type', 'range', 'x-xsrftoken'];
+
+interface IPendingRequest {
+  resolve: (response: Response) => void;
+  reject: (error: Error) => void;
+}
+
+/**
+ * Multiplexes API requests over a single WebSocket to `jupyter_fsspec/channel`.
+ *
+ * Each request is sent as a frame with a unique id and resolved with a
+ * `Response` built from the reply carrying the same id, so callers can treat
+ * it exactly like the result of `ServerConnection.makeRequest`.
+ */
+export class FsspecChannel {
+  private static _instance: FsspecChannel | null = null;
+  private static _enabled = false;
+
+  private _socket: WebSocket;
+  private _ready: Promise<void>;
+  private _nextId = 0;
+  private _pending = new Map<number, IPendingRequest>();
+  private _logger = Logger.getLogger('FsspecChannel');
+
+  private constructor(settings: ServerConnection.ISettings) {
+    let url = URLExt.join(settings.wsUrl, 'jupyter_fsspec', 'channel');
+    if (settings.token) {
+      url += `?token=${encodeURIComponent(settings.token)}`;
+    }
+    this._socket = new settings.WebSocket(url);
+    this._socket.binaryType = 'arraybuffer';
+    this._ready = new Promise((resolve, reject) => {
+      this._socket.onopen = () => resolve();
+      this._socket.onerror = () => reject(new Error('Channel failed to open'));
+    });
+    this._socket.onmessage = event => this._onMessage(event);
+    this._socket.onclose = () => this._onClose();
+  }
+
+  /**
+   * Enable or disable sending requests over the channel.
+   */
+  static setEnabled(enabled: boolean): void {
+    FsspecChannel._enabled = enabled;
+    if (!enabled && FsspecChannel._instance) {
+      FsspecChannel._instance._socket.close();
+      FsspecChannel._instance = null;
+    }
+  }
+
+  /**
+   * The open channel, or null when it is disabled or cannot be opened.
+   */
+  static async get(
+    settings: ServerConnection.ISettings
+  ): Promise<FsspecChannel | null> {
+    if (!FsspecChannel._enabled) {
+      return null;
+    }
+    if (!FsspecChannel._instance) {
+      FsspecChannel._instance = new FsspecChannel(settings);
+    }
+    const channel = FsspecChannel._instance;
+    try {
+      await channel._ready;
+      return channel;
+    } catch (error) {
+      channel._logger.warn('Channel unavailable, using HTTP requests', {
+        error
+      });
+      if (FsspecChannel._instance === channel) {
+        FsspecChannel._instance = null;
+      }
+      return null;
+    }
+  }
+
+  /**
+   * Send a request for `endPoint` (relative to `jupyter_fsspec/`) over the channel.
+   *
+   * Aborting `init.signal` cancels the request on the server.
+   */
+  async fetch(endPoint: string, init: RequestInit = {}): Promise<Response> {
+    const signal = init.signal;
+    if (signal?.aborted) {
+      throw new DOMException('Request aborted', 'AbortError');
+    }
+    const id = this._nextId++;
+    const headers: Record<string, string> = {};
+    new Headers(init.headers).forEach((value, name) => {
+      if (FRAME_HEADERS.includes(name.toLowerCase())) {
+        headers[name] = value;
+      }
+    });
+    const xsrfToken = getXsrfToken();
+    if (xsrfToken) {
+      headers['X-XSRFToken'] = xsrfToken;
+    }
+
+    const frame = {
+      id,
+      method: init.method || 'GET',
+      endpoint: endPoint,
+      headers
+    };
+    const response = new Promise<Response>((resolve, reject) => {
+      this._pending.set(id, { resolve, reject });
+    });
+    signal?.addEventListener(
+      'abort',
+      () => {
+        const pending = this._pending.get(id);
+        if (pending) {
+          this._pending.delete(id);
+          this._socket.send(JSON.stringify({ id, cancel: true }));
+          pending.reject(new DOMException('Request aborted', 'AbortError'));
+        }
+      },
+      { once: true }
+    );
+
+    const body = init.body;
+    if (body === undefined || body === null || typeof body === 'string') {
+      this._socket.send(JSON.stringify({ ...frame, body: body ?? '' }));
+    } else {
+      const payload = await new Response(body as BodyInit).arrayBuffer();
+      this._socket.send(packFrame(frame, new Uint8Array(payload)));
+    }
+    return response;
+  }
+
+  private _onMessage(event: MessageEvent): void {
+    let reply: any;
+    let body: BodyInit;
+    if (typeof event.data === 'string') {
+      reply = JSON.parse(event.data);
+      body = reply.body;
+    } else {
+      const data = new Uint8Array(event.data as ArrayBuffer);
+      const headerLength = new DataView(data.buffer).getUint32(0);
+      reply = JSON.parse(
+        new TextDecoder().decode(data.subarray(4, 4 + headerLength))
+      );
+      body = data.slice(4 + headerLength);
+    }
+
+    const pending = this._pending.get(reply.id);
+    if (!pending) {
+      this._logger.warn('Reply for unknown request', { id: reply.id });
+      return;
+    }
+    this._pending.delete(reply.id);
+    // Responses with these statuses must not have a body
+    const nullBody = [101, 204, 205, 304].includes(reply.status);
+    pending.resolve(
+      new Response(nullBody ? null : body, {
+        status: reply.status,
+        headers: reply.headers
+      })
+    );
+  }
+
+  private _onClose(): void {
+    for (const pending of this._pending.values()) {
+      pending.reject(new Error('Channel closed'));
+    }
+    this._pending.clear();
+    if (FsspecChannel._instance === this) {
+      FsspecChannel._instance = null;
+    }
+  }
+}
+
+/**
+ * Binary frame: 4 byte big-endian header length, JSON header, raw body.
+ */
+function packFrame(header: object, body: Uint8Array): Uint8Array {
+  const headerBytes = new TextEncoder().encode(JSON.stringify(header));
+  const frame = new Uint8Array(4 + headerBytes.length + body.length);
+  new DataView(frame.buffer).setUint32(0, headerBytes.length);
+  frame.set(headerBytes, 4);
+  frame.set(body, 4 + headerBytes.length);
+  return frame;
+}
+
+function getXsrfToken(): string | undefined {
+  if (typeof document === 'undefined') {
+    return undefined;
+  }
+  const match = document.cookie.match('\\b_xsrf=([^;]*)\\b');
+  return match ? match[1] : undefined;
+}
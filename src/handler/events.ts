@@ -0,0 +1,114 @@
+import { URLExt } from '@jupyterlab/coreutils';
+import { ServerConnection } from '@jupyterlab/services';
+import { Signal } from '@lumino/signaling';
+import { Logger } from '../logger';
+import { IPathInfo } from '../types';
+
+export interface IPathChange extends IPathInfo {
+  change: 'added' | 'removed' | 'modified';
+}
+
+export interface IDirectoryChanges {
+  key: string;
+  item_path: string;
+  changes: IPathChange[];
+}
+
+/**
+ * Receives changes of watched directories from `jupyter_fsspec/files/events`.
+ *
+ * Watches are remembered and sent again when the socket reconnects, so
+ * callers only need to say which directories they display.
+ */
+export class FsspecEvents {
+  changed: Signal<this, IDirectoryChanges>;
+
+  private _socket: WebSocket | null = null;
+  private _watches = new Map<string, { key: string; item_path: string }>();
+  private _reconnectDelay = 1000;
+  private _disposed = false;
+  private _logger = Logger.getLogger('FsspecEvents');
+
+  constructor() {
+    this.changed = new Signal<this, IDirectoryChanges>(this);
+    this._connect();
+  }
+
+  /**
+   * Whether changes are being received, so listings need not be refetched.
+   */
+  get connected(): boolean {
+    return this._socket?.readyState === WebSocket.OPEN;
+  }
+
+  watch(key: string, item_path: string): void {
+    const id = JSON.stringify([key, item_path]);
+    if (!this._watches.has(id)) {
+      this._watches.set(id, { key, item_path });
+      this._send({ action: 'watch', key, item_path });
+    }
+  }
+
+  unwatch(key: string, item_path: string): void {
+    if (this._watches.delete(JSON.stringify([key, item_path]))) {
+      this._send({ action: 'unwatch', key, item_path });
+    }
+  }
+
+  /**
+   * Stop watching every directory, e.g. when another filesystem is selected.
+   */
+  unwatchAll(): void {
+    for (const { key, item_path } of this._watches.values()) {
+      this._send({ action: 'unwatch', key, item_path });
+    }
+    this._watches.clear();
+  }
+
+  dispose(): void {
+    this._disposed = true;
+    this._socket?.close();
+  }
+
+  private _send(message: object): void {
+    if (this.connected) {
+      this._socket!.send(JSON.stringify(message));
+    }
+  }
+
+  private _connect(): void {
+    const settings = ServerConnection.makeSettings();
+    let url = URLExt.join(settings.wsUrl, 'jupyter_fsspec', 'files', 'events');
+    if (settings.token) {
+      url += `?token=${encodeURIComponent(settings.token)}`;
+    }
+    const socket = new settings.WebSocket(url);
+    socket.onopen = () => {
+      this._reconnectDelay = 1000;
+      for (const watch of this._watches.values()) {
+        socket.send(JSON.stringify({ action: 'watch', ...watch }));
+      }
+    };
+    socket.onmessage = event => {
+      const message = JSON.parse(event.data);
+      if (message.status === 'failed') {
+        this._logger.warn('Watch request failed', {
+          description: message.description
+        });
+        return;
+      }
+      this.changed.emit(message as IDirectoryChanges);
+    };
+    socket.onclose = () => {
+      if (this._disposed) {
+        return;
+      }
+      this._logger.debug('Events socket closed, reconnecting', {
+        delay: this._reconnectDelay
+      });
+      setTimeout(() => this._connect(), this._reconnectDelay);
+      this._reconnectDelay = Math.min(this._reconnectDelay * 2, 60000);
+    };
+    this._socket = socket;
+  }
+}
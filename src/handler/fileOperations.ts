@@ -235,6 +235,40 @@ export class FsspecModel {
     }
   }
 
+  async getPreview(
+    key: string,
+    item_path: string,
+    maxBytes?: number
+  ): Promise<any> {
+    const params: Record<string, string> = { key, item_path };
+    if (maxBytes !== undefined) {
+      params.max_bytes = maxBytes.toString();
+    }
+    try {
+      const query = new URLSearchParams(params);
+      const response = await requestAPI<any>(
+        `files/preview?${query.toString()}`,
+        {
+          method: 'GET'
+        }
+      );
+      this.logger.debug('Preview retrieved', {
+        key,
+        path: item_path,
+        mimeType: response?.content?.mime_type,
+        status: response?.status
+      });
+      return response;
+    } catch (error) {
+      this.logger.error('Failed to fetch preview', {
+        key,
+        path: item_path,
+        error
+      });
+      return null;
+    }
+  }
+
   async delete(key: string, item_path: string): Promise<any> {
     try {
       const query = new URLSearchParams({
@@ -733,25 +767,34 @@ export class FsspecModel {
     key: string,
     item_path: string = '',
     type: string = 'default',
-    refresh: boolean = false
+    refresh: boolean = false,
+    since?: string,
+    signal?: AbortSignal
   ): Promise<any> {
-    const query = new URLSearchParams({
+    const params = new URLSearchParams({
       key,
       item_path,
       type,
       refresh: refresh.toString()
-    }).toString();
+    });
+    if (since) {
+      // Only request the entries changed since this listing version
+      params.set('since', since);
+    }
+    const query = params.toString();
 
     this.logger.debug('Listing directory', {
       key,
       path: item_path,
       type,
-      refresh
+      refresh,
+      since
     });
 
     try {
       const result = await requestAPI<any>(`files?${query}`, {
-        method: 'GET'
+        method: 'GET',
+        signal
       });
 
       this.logger.debug('Directory listing completed', {
@@ -762,6 +805,13 @@ export class FsspecModel {
 
       return result;
     } catch (error) {
+      if (signal?.aborted) {
+        this.logger.debug('Directory listing aborted', {
+          key,
+          path: item_path
+        });
+        return null;
+      }
       this.logger.error('Failed to list directory', {
         key,
         path: item_path,
@@ -771,6 +821,56 @@ export class FsspecModel {
     }
   }
 
+  async searchFiles(
+    key: string,
+    pattern: string,
+    type: 'glob' | 'regex' = 'glob',
+    limit?: number
+  ): Promise<any> {
+    const params: Record<string, string> = { key, pattern, type };
+    if (limit !== undefined) {
+      params.limit = limit.toString();
+    }
+    const query = new URLSearchParams(params).toString();
+
+    this.logger.debug('Searching files', { key, pattern, type, limit });
+
+    try {
+      // The response is newline delimited JSON: one entry per match
+      // followed by a summary object
+      const result = await requestAPI<any>(`files/search?${query}`, {
+        method: 'GET'
+      });
+      if (typeof result !== 'string') {
+        // Error payload, or a single summary line parsed as JSON
+        return result?.status === 'success'
+          ? { ...result, content: [] }
+          : result;
+      }
+
+      const lines = result
+        .split('\n')
+        .filter((line: string) => line.length > 0)
+        .map((line: string) => JSON.parse(line));
+      const summary = lines.pop();
+
+      this.logger.debug('File search completed', {
+        key,
+        pattern,
+        matchCount: summary?.count
+      });
+
+      return { ...summary, content: lines };
+    } catch (error) {
+      this.logger.error('Failed to search files', {
+        key,
+        pattern,
+        error
+      });
+      return null;
+    }
+  }
+
   async updateFile(
     path: string,
     recursive: boolean = false,
@@ -1,12 +1,13 @@
 import { URLExt } from '@jupyterlab/coreutils';
 import { ServerConnection } from '@jupyterlab/services';
 import { Logger } from '../logger';
+import { FsspecChannel } from './channel';
 
 /**
  * Call the API extension
  *
  * @param endPoint API REST end point for the extension
- * @param init Initial values for the request
+ * @param init Initial values for the request, abort `init.signal` to cancel it
  * @returns The response body interpreted as JSON
  */
 export async function requestAPI<T>(
@@ -31,7 +32,11 @@ export async function requestAPI<T>(
 
   let response: Response;
   try {
-    response = await ServerConnection.makeRequest(requestUrl, init, settings);
+    // Use the multiplexed WebSocket channel when it is enabled and open
+    const channel = await FsspecChannel.get(settings);
+    response = channel
+      ? await channel.fetch(endPoint, init)
+      : await ServerConnection.makeRequest(requestUrl, init, settings);
 
     logger.debug('Received API response', {
       status: response.status,
@@ -39,6 +44,11 @@ export async function requestAPI<T>(
       url: response.url
     });
   } catch (error) {
+    if (init.signal?.aborted) {
+      // The caller gave up on this request, the server cancels its work
+      logger.debug('API request aborted', { url: requestUrl });
+      throw error;
+    }
     logger.error('Network error during API request', {
       url: requestUrl,
       error
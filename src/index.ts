@@ -31,6 +31,12 @@ import { Widget } from '@lumino/widgets';
 
 import { Logger, LogConfig } from './logger';
 import { initializeLogger } from './loggerSettings';
+import { FsspecChannel } from './handler/channel';
+import {
+  FsspecEvents,
+  IDirectoryChanges,
+  IPathChange
+} from './handler/events';
 import {
   IElementHeap,
   ISourcesHeap,
@@ -106,6 +112,10 @@ class FsspecWidget extends Widget {
   queuedJupyterFileBrowserUploadInfo: IUploadInfo | null = null;
   fileBrowserFactory: IFileBrowserFactory;
   app: JupyterFrontEnd;
+  events: FsspecEvents;
+  rootListingVersion: { key: string; version: string } | null = null;
+  // Aborted when another filesystem is displayed, cancelling its listings
+  listingController = new AbortController();
   private readonly logger: Logger;
 
   constructor(
@@ -127,6 +137,10 @@ class FsspecWidget extends Widget {
     this.fileBrowserFactory = fileBrowserFactory;
     this.app = app;
 
+    // Keep the displayed directories in sync with server-side changes
+    this.events = new FsspecEvents();
+    this.events.changed.connect(this.handleDirectoryChanges.bind(this));
+
     this.title.icon = fsspecIcon;
     this.title.caption = 'FSSpec';
     this.node.classList.add('jfss-root');
@@ -419,6 +433,31 @@ class FsspecWidget extends Widget {
     return null;
   }
 
+  async removeKernelUserBytesTempfile(tempfilePath: string) {
+    // The server has read the tempfile, so the kernel can delete it
+    const kernel =
+      this.notebookTracker.currentWidget?.context?.sessionContext?.session
+        ?.kernel;
+    if (!kernel) {
+      this.logger.warn('No kernel to remove the bytes tempfile', {
+        path: tempfilePath
+      });
+      return;
+    }
+
+    const path = JSON.stringify(tempfilePath);
+    try {
+      await kernel.requestExecute({
+        code:
+          'from jupyter_fsspec import helper as _jupyter_fsshelper\n' +
+          `_jupyter_fsshelper._remove_user_data_tempfile(${path})`,
+        silent: true
+      }).done;
+    } catch (e) {
+      this.logger.error('Error removing the bytes tempfile', { error: e });
+    }
+  }
+
   async handleJupyterFileBrowserSetBytesTarget(
     userFile: IFileBrowserModel,
     fileBrowser: IFileBrowserFactory
@@ -528,7 +567,7 @@ class FsspecWidget extends Widget {
           filesystem: this.model.activeFilesystem
         });
 
-        this.fetchAndDisplayFileInfo(this.model.activeFilesystem);
+        this.refreshAfterChange();
       } catch (error) {
         this.logger.error('Error uploading file', {
           path: user_path,
@@ -600,7 +639,7 @@ class FsspecWidget extends Widget {
           filesystem: this.model.activeFilesystem
         });
 
-        this.fetchAndDisplayFileInfo(this.model.activeFilesystem);
+        this.refreshAfterChange();
       } catch (error) {
         this.logger.error('Error uploading file', {
           path: user_path,
@@ -665,7 +704,9 @@ class FsspecWidget extends Widget {
       });
     }
 
-    await this.fetchAndDisplayFileInfo(this.model.activeFilesystem);
+    await this.removeKernelUserBytesTempfile(tempfilePath);
+
+    await this.refreshAfterChange();
   }
 
   handleContextGetBytes(user_path: string) {
@@ -916,14 +957,20 @@ class FsspecWidget extends Widget {
     // Fetch files for a given folder and update the dir tree with the results
     this.logger.info('Lazy loading directory contents', { path: source_path });
 
+    const signal = this.listingController.signal;
     const response = await this.model.listDirectory(
-      this.model.userFilesystems[this.model.activeFilesystem]?.key ||
-        this.model.activeFilesystem,
+      this.activeSourceKey(),
       source_path,
       'default',
-      false
+      false,
+      undefined,
+      signal
     );
 
+    if (signal.aborted) {
+      return;
+    }
+
     // TODO: Check for status/description?
     if (!response?.content) {
       // TODO refactor validation
@@ -949,6 +996,7 @@ class FsspecWidget extends Widget {
       // Update the dir tree/data
       this.updateTree(nodeForPath, response['content'], source_path);
       nodeForPath.fetch = true;
+      this.events.watch(this.activeSourceKey(), source_path);
 
       this.logger.debug('Updated directory tree with new content', {
         path: source_path,
@@ -1145,15 +1193,30 @@ class FsspecWidget extends Widget {
     this.logger.info('Fetch/refresh file information display', {
       filesystem: fsname
     });
-    // Fetch files for this filesystem
+    // Fetch files for this filesystem, a refresh only fetches the changes
+    // since the displayed listing
+    const key = this.activeSourceKey();
+    const since =
+      refresh && this.rootListingVersion?.key === key
+        ? this.rootListingVersion.version
+        : undefined;
+    this.listingController.abort();
+    this.listingController = new AbortController();
+    const signal = this.listingController.signal;
     const response = await this.model.listDirectory(
-      this.model.userFilesystems[this.model.activeFilesystem]?.key ||
-        this.model.activeFilesystem,
+      key,
       '',
       'default',
-      refresh
+      refresh,
+      since,
+      signal
     );
 
+    if (signal.aborted) {
+      this.logger.debug('Listing superseded', { filesystem: fsname });
+      return;
+    }
+
     if (!response) {
       this.logger.error('Invalid response fetching files', {
         filesystem: fsname
@@ -1168,6 +1231,23 @@ class FsspecWidget extends Widget {
       return;
     }
 
+    this.rootListingVersion = response.version
+      ? { key, version: response.version }
+      : null;
+    if (response.delta) {
+      this.logger.debug('Applying listing changes', {
+        filesystem: fsname,
+        changeCount: response.content.length
+      });
+      this.applyDirectoryChanges(
+        this.dirTree,
+        this.model.userFilesystems[fsname].path,
+        response.content
+      );
+      await this.updateFileBrowserView();
+      return;
+    }
+
     const pathInfos = response['content'].sort((a: IPathInfo, b: IPathInfo) => {
       return a.name.localeCompare(b.name);
     });
@@ -1186,6 +1266,76 @@ class FsspecWidget extends Widget {
       this.model.userFilesystems[fsname].path
     );
     await this.updateFileBrowserView();
+
+    // Only the displayed directories of the selected filesystem are watched
+    this.events.unwatchAll();
+    this.events.watch(this.activeSourceKey(), '');
+  }
+
+  dispose(): void {
+    // Stop pending listings and change notifications with the widget
+    this.listingController.abort();
+    this.events.dispose();
+    super.dispose();
+  }
+
+  activeSourceKey(): string {
+    return (
+      this.model.userFilesystems[this.model.activeFilesystem]?.key ||
+      this.model.activeFilesystem
+    );
+  }
+
+  async refreshAfterChange() {
+    // Changes made through the server are pushed to watched directories,
+    // only list the filesystem again when the events socket is down
+    if (!this.events.connected) {
+      await this.fetchAndDisplayFileInfo(this.model.activeFilesystem);
+    }
+  }
+
+  async handleDirectoryChanges(_sender: unknown, update: IDirectoryChanges) {
+    if (update.key !== this.activeSourceKey()) {
+      return;
+    }
+    const nodeForPath = update.item_path
+      ? this.getNodeForPath(update.item_path)
+      : this.dirTree;
+    if (!nodeForPath) {
+      this.logger.debug('Ignoring changes of a directory not displayed', {
+        path: update.item_path
+      });
+      return;
+    }
+
+    this.logger.debug('Applying directory changes', {
+      path: update.item_path,
+      changeCount: update.changes.length
+    });
+    this.applyDirectoryChanges(
+      nodeForPath,
+      update.item_path || this.model.getActiveFilesystemInfo().path,
+      update.changes
+    );
+    await this.updateFileBrowserView();
+  }
+
+  applyDirectoryChanges(
+    nodeForPath: ITreeNode,
+    rootPath: string,
+    changes: IPathChange[]
+  ) {
+    // Update the children of a directory node in place from listing changes
+    for (const { change, ...pathInfo } of changes) {
+      const segment = path.basename(pathInfo.name);
+      if (change === 'removed') {
+        delete nodeForPath.children[segment];
+      } else if (change === 'modified' && segment in nodeForPath.children) {
+        nodeForPath.children[segment].metadata = { ...pathInfo };
+      } else {
+        this.updateTree(nodeForPath, [pathInfo], rootPath);
+      }
+    }
   }
 
   updateTree(tree: ITreeNode, pathInfoList: IPathInfo[], rootPath: string) {
@@ -1409,11 +1559,13 @@ const plugin: JupyterFrontEndPlugin<void> = {
         });
 
         await initializeLogger(settingRegistry);
+        FsspecChannel.setEnabled(settings.composite.useWebSocket as boolean);
 
         settings.changed.connect(() => {
           logger.debug('Settings changed', {
             newSettings: settings.composite
           });
+          FsspecChannel.setEnabled(settings.composite.useWebSocket as boolean);
         });
       } catch (error) {
         logger.error('Failed to load settings', {
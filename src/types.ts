@@ -220,7 +220,9 @@ export interface IFsspecModel {
     key: string,
     item_path?: string,
     type?: string,
-    refresh?: boolean
+    refresh?: boolean,
+    since?: string,
+    signal?: AbortSignal
   ): Promise<IApiResponse<IPathInfo[]> | null>;
   upload?(
     key: string,